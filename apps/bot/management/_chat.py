@@ -2,6 +2,7 @@
 from apps.bot.management._state import BaseTgUserState, NewUserState, UnverifiedUserState, VerifiedUserState
 from apps.bot.models import TgUser
 from apps.bot.tg.client import TgClient
+from apps.bot.tg.sender import MessageQueue
 
 
 class Chat:
@@ -16,7 +17,7 @@ class Chat:
         else:
             raise RuntimeError('''State doesn't exist.''')
 
-    def set_state(self, tg_client: TgClient):
+    def set_state(self, tg_client: TgClient | MessageQueue):
         # Проверка наличия юзера в базе данных
         tg_user, create = TgUser.objects.get_or_create(telegram_chat_id=self.message.chat.id,
                                                        defaults={'telegram_user_ud': self.message.from_.id})
@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from django.db import close_old_connections
+
+from apps.bot.management._chat import Chat
+from apps.bot.tg.client import TgClient
+from apps.bot.tg.dc import UpdateObj
+from apps.bot.tg.sender import MessageQueue
+from apps.bot.webhook import mark_processed
+from apps.core import metrics
+
+logger = logging.getLogger('main')
+
+
+def process_update(item: UpdateObj, tg_client: TgClient | MessageQueue) -> None:
+    """Обработка одного обновления: определение состояния пользователя и ответ ему"""
+    metrics.BOT_UPDATE_LAG.set(max(time.time() - item.message.date, 0))
+    # Состояние чата и TgUser, записанные предыдущим обновлением, читаются с мастера,
+    # на реплику идут только списки целей и категорий (VerifiedUserState)
+    chat = Chat(message=item.message)
+    chat.set_state(tg_client)
+    chat.state.run()
+
+
+def process_stored_update(item: UpdateObj, tg_client: TgClient | MessageQueue) -> None:
+    """Обработка обновления из очереди webhook, после нее (в том числе неудачной) оно отмечается обработанным"""
+    try:
+        process_update(item, tg_client)
+    finally:
+        mark_processed(item.update_id)
+
+
+class UpdateDispatcher:
+    """
+    Параллельная обработка обновлений в пуле потоков.
+    Обновления разных чатов обрабатываются одновременно, обновления одного чата - строго по очереди
+    """
+
+    def __init__(self, handler: Callable[[UpdateObj], None], max_workers: int, max_pending: int | None = None):
+        self.handler = handler
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tg-update')
+        self._queues: dict[int, deque[UpdateObj]] = {}
+        self._lock = threading.Lock()
+        # Ограничение числа принятых, но не обработанных обновлений, чтобы цикл опроса не убегал вперед
+        self._pending = threading.BoundedSemaphore(max_pending or max_workers * 10)
+
+    def submit(self, item: UpdateObj) -> None:
+        self._pending.acquire()
+        metrics.BOT_QUEUE_DEPTH.labels('updates').inc()
+        chat_id = item.message.chat.id
+        with self._lock:
+            if chat_id in self._queues:
+                self._queues[chat_id].append(item)
+                return
+            self._queues[chat_id] = deque([item])
+        self._executor.submit(self._drain, chat_id)
+
+    def shutdown(self) -> None:
+        """Дожидаемся обработки всех принятых обновлений"""
+        self._executor.shutdown(wait=True)
+
+    def _drain(self, chat_id: int) -> None:
+        while True:
+            with self._lock:
+                queue = self._queues[chat_id]
+                if not queue:
+                    del self._queues[chat_id]
+                    return
+                item = queue.popleft()
+            self._handle(item)
+
+    def _handle(self, item: UpdateObj) -> None:
+        try:
+            self.handler(item)
+        except Exception:
+            logger.exception('Failed to process update %s', item.update_id)
+        finally:
+            close_old_connections()
+            self._pending.release()
+            metrics.BOT_QUEUE_DEPTH.labels('updates').dec()
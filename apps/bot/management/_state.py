@@ -1,8 +1,11 @@
 from typing import Optional
 
 from apps.bot.models import TgUser
+from apps.bot.state_store import get_state_store
 from apps.bot.tg.client import TgClient
 from apps.bot.tg.dc import Message
+from apps.bot.tg.sender import MessageQueue
+from apps.core.routers import replica_scope
 from apps.goals.models import Goal, GoalCategory
 from todolist.settings import env
 
@@ -12,10 +15,26 @@ URL_LOGIN = env('URL_LOGIN')
 
 class BaseTgUserState:
 
-    def __init__(self, tg_user: TgUser, tg_client: TgClient):
+    def __init__(self, tg_user: TgUser, tg_client: TgClient | MessageQueue):
         self.tg_user = tg_user
         self.tg_client = tg_client
         self._text: str | None = None
+        self._chat_state: dict | None = None
+
+    @property
+    def chat_state(self) -> dict:
+        """Состояние диалога в чате пользователя"""
+        if self._chat_state is None:
+            self._chat_state = get_state_store().get(self.tg_user.telegram_chat_id)
+        return self._chat_state
+
+    def set_chat_state(self, **state) -> None:
+        self._chat_state = state
+        get_state_store().set(self.tg_user.telegram_chat_id, state)
+
+    def clear_chat_state(self) -> None:
+        self._chat_state = {}
+        get_state_store().delete(self.tg_user.telegram_chat_id)
 
     def get_verification_code(self) -> str:
         """Получение кода верификации"""
@@ -34,7 +53,7 @@ class BaseTgUserState:
 
 class NewUserState(BaseTgUserState):
     """Класс юзера впервые активировавшего бота"""
-    def __init__(self, tg_user: TgUser, tg_client: TgClient):
+    def __init__(self, tg_user: TgUser, tg_client: TgClient | MessageQueue):
         super().__init__(tg_user, tg_client)
         self._text = f'Добро пожаловать в TaskTG бот\n\nЕсли вы не зарегистрированы, пройдите регистрацию ' \
                      f'<a href="{URL_SIGNUP}">по ссылке</a>' \
@@ -45,7 +64,7 @@ class NewUserState(BaseTgUserState):
 
 class UnverifiedUserState(BaseTgUserState):
     """Класс юзера активировавшего бота, но не прошедшего верификацию"""
-    def __init__(self, tg_user: TgUser, tg_client: TgClient):
+    def __init__(self, tg_user: TgUser, tg_client: TgClient | MessageQueue):
         super().__init__(tg_user, tg_client)
         self._text = 'Если вы не зарегистрированы, пройдите регистрацию ' \
                      f'<a href="{URL_SIGNUP}">по ссылке</a>' \
@@ -55,18 +74,19 @@ class UnverifiedUserState(BaseTgUserState):
 
 
 class VerifiedUserState(BaseTgUserState):
-    """Класс юзера прошедшего верификацию"""
-    user_state_create: bool = False  # Состояние пользователя, создает ли он Цель
-    category_for_create_goal: GoalCategory | None = None  # Категория в которой будет создаваться Цель
+    """
+    Класс юзера прошедшего верификацию.
+    Пока пользователь создает цель, в состоянии чата хранится id выбранной категории (category_id)
+    """
 
-    def __init__(self, tg_user: TgUser, tg_client: TgClient, message: Message):
+    def __init__(self, tg_user: TgUser, tg_client: TgClient | MessageQueue, message: Message):
         self.message = message
         super().__init__(tg_user, tg_client)
 
     def run(self):
         if self.message.text.startswith('/'):
             self._command_execution()
-        elif VerifiedUserState.user_state_create:
+        elif self.chat_state.get('category_id'):
             self._create_goal()
         else:
             text = 'Команда должна начинаться с "/"'
@@ -83,7 +103,7 @@ class VerifiedUserState(BaseTgUserState):
             case '/create':
                 self._choices_category()
             case '/cancel':
-                VerifiedUserState.user_state_create = False
+                self.clear_chat_state()
             case value if value in [f'/{cat.title}' for cat in list_categories]:
                 self._get_data_from_category(value)
             case _:
@@ -91,20 +111,23 @@ class VerifiedUserState(BaseTgUserState):
 
     def _get_data_from_category(self, mes_text: str):
         """Получение данных выбранной категории для создания цели"""
-        VerifiedUserState.category_for_create_goal = GoalCategory.objects.select_related('user').filter(
-            title=mes_text[1:], is_deleted=False).first()
-        VerifiedUserState.user_state_create = True
+        category = GoalCategory.objects.filter(title=mes_text[1:], is_deleted=False,
+                                               board__participants__user_id=self.tg_user.user_id).first()
+        self.set_chat_state(category_id=category.id)
         self.send_message(text='Введите название цели\nДля отмены введите /cancel')
 
     def _create_goal(self):
         """Создание новой цели"""
-        category = VerifiedUserState.category_for_create_goal
-        Goal.objects.create(user_id=self.tg_user.user.id,
+        category = GoalCategory.objects.filter(id=self.chat_state['category_id'], is_deleted=False).first()
+        self.clear_chat_state()
+        if not category:
+            self.send_message(text='Категория не найдена')
+            return
+        Goal.objects.create(user_id=self.tg_user.user_id,
                             category_id=category.id,
                             title=self.message.text)
         self.tg_client.send_message(self.message.chat.id, text=f'Вы создали цель - {self.message.text}\n в категории -'
                                                                f' {category.title}')
-        VerifiedUserState.user_state_create = False
 
     def _message_execution(self, text: str | None = None):
         """Вывод сообщения пользователю"""
@@ -117,9 +140,11 @@ class VerifiedUserState(BaseTgUserState):
     def _get_goals(self):
         """Получение целей пользователя"""
         user_id = self.tg_user.user_id
-        list_goals = list(Goal.objects.select_related('user').filter(user_id=user_id,
-                                                                     category__is_deleted=False).exclude(
-            status=Goal.Status.archived).values_list('title', flat=True))
+        # Списки только для чтения идут на реплику, состояние чата и TgUser - с мастера
+        with replica_scope():
+            list_goals = list(Goal.objects.select_related('user').filter(user_id=user_id,
+                                                                         category__is_deleted=False).exclude(
+                status=Goal.Status.archived).values_list('title', flat=True))
         if list_goals:
             self.tg_client.send_message(self.message.chat.id, text='\n\n'.join(list_goals))
         else:
@@ -128,8 +153,9 @@ class VerifiedUserState(BaseTgUserState):
     def _choices_category(self):
         """Выбор категории из списка"""
         user_id = self.tg_user.user_id
-        list_category = list(GoalCategory.objects.select_related('user').filter(board__participants__user_id=user_id,
-                                                                                is_deleted=False))
+        with replica_scope():
+            list_category = list(GoalCategory.objects.select_related('user').filter(
+                board__participants__user_id=user_id, is_deleted=False))
         categories = [f'/{cat.title}' for cat in list_category]
         if list_category:
             self.tg_client.send_message(self.message.chat.id, text='Выберете категорию для создания цели')
@@ -1,7 +1,17 @@
+import time
+from functools import partial
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from prometheus_client import start_http_server
 
-from apps.bot.management._chat import Chat
+from apps.bot.management._dispatcher import UpdateDispatcher, process_stored_update, process_update
 from apps.bot.tg.client import TgClient
+from apps.bot.tg.dc import UpdateObj
+from apps.bot.tg.sender import MessageQueue
+from apps.bot.webhook import pending_updates
+from apps.core import metrics
 from todolist.settings import BOT_TOKEN
 
 
@@ -10,18 +20,59 @@ class Command(BaseCommand):
         super().__init__()
         self.tg_client: TgClient = TgClient(BOT_TOKEN)
 
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--workers', type=int, default=settings.BOT_WORKERS,
+                            help='Количество потоков обработки обновлений (1 - последовательная обработка)')
+        parser.add_argument('--source', choices=('poll', 'webhook'),
+                            default='webhook' if settings.BOT_WEBHOOK_SECRET else 'poll',
+                            help='Источник обновлений: long polling или очередь, сохраненная webhook '
+                                 '(по умолчанию webhook, если задан BOT_WEBHOOK_SECRET)')
+        parser.add_argument('--metrics-port', type=int, default=settings.BOT_METRICS_PORT,
+                            help='Порт HTTP-сервера метрик Prometheus (0 - не запускать)')
+
     def handle(self, *args, **options):
+        if options['metrics_port']:
+            start_http_server(options['metrics_port'], registry=metrics.get_registry())
+        # Состояния отправляют ответы через очередь и не ждут сетевых запросов к Telegram
+        sender = MessageQueue(self.tg_client).start() if settings.BOT_SEND_QUEUE else self.tg_client
+        webhook = options['source'] == 'webhook'
+        handler = partial(process_stored_update if webhook else process_update, tg_client=sender)
+        dispatcher = UpdateDispatcher(handler, max_workers=options['workers']) if options['workers'] > 1 else None
+        handle_update = dispatcher.submit if dispatcher else handler
+        try:
+            if webhook:
+                self._consume(handle_update)
+            else:
+                self._poll(handle_update)
+        finally:
+            if dispatcher:
+                dispatcher.shutdown()
+            if isinstance(sender, MessageQueue):
+                sender.stop()
+
+    def _poll(self, handle_update) -> None:
         offset = 0
         while True:
             res = self.tg_client.get_updates(offset=offset)
+            metrics.BOT_UPDATES.labels('poll').inc(len(res.result))
             for item in res.result:
                 offset = item.update_id + 1
+                handle_update(item)
+            # Как в начале и конце HTTP-запроса: соединение основного потока закрывается по CONN_MAX_AGE
+            # или после ошибки, потоки диспетчера делают то же после каждого обновления
+            close_old_connections()
 
-                # Создаем экземпляр чата
-                chat = Chat(message=item.message)
-                chat.set_state(self.tg_client)
-                chat.state.run()
-                # if item.message.photo:
-                #     photo = item.message.photo[-1]
-                #     self.tg_client.send_photo(chat_id=item.message.chat.id, photo=photo.file_id)
-                # self.tg_client.send_message(chat_id=item.message.chat.id, text=item.message.text)
+    def _consume(self, handle_update) -> None:
+        """
+        Обработка обновлений, сохраненных webhook. Потребитель очереди должен быть один: иначе порядок
+        сообщений чата не гарантируется. После перезапуска необработанные обновления обрабатываются заново
+        """
+        after_id = None
+        while True:
+            updates = pending_updates(after_id)
+            for update in updates:
+                after_id = update.update_id
+                handle_update(UpdateObj.parse_obj(update.payload))
+            close_old_connections()
+            if not updates:
+                time.sleep(settings.BOT_WEBHOOK_POLL_INTERVAL)
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.bot.tg.client import TgClient
+from todolist.settings import BOT_TOKEN
+
+
+class Command(BaseCommand):
+    help = 'Регистрация webhook бота в Telegram (вместо long polling через runbot)'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('url', nargs='?', help='Публичный адрес эндпоинта, например https://example.com/bot/webhook')
+        parser.add_argument('--delete', action='store_true', help='Удалить webhook и вернуться к long polling')
+        parser.add_argument('--max-connections', type=int, default=40,
+                            help='Количество одновременных соединений Telegram к webhook')
+
+    def handle(self, *args, **options):
+        tg_client = TgClient(BOT_TOKEN)
+        if options['delete']:
+            response = tg_client.delete_webhook()
+        else:
+            if not options['url']:
+                raise CommandError('url is required')
+            if not settings.BOT_WEBHOOK_SECRET:
+                raise CommandError('BOT_WEBHOOK_SECRET is not set')
+            response = tg_client.set_webhook(options['url'], secret_token=settings.BOT_WEBHOOK_SECRET,
+                                             max_connections=options['max_connections'])
+        if not response.ok:
+            raise CommandError(response.description)
+        self.stdout.write(self.style.SUCCESS(response.description or 'OK'))
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.3 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0004_create_model_TgChatState'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tgupdate',
+            name='payload',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tgupdate',
+            name='processed',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        # Обновления, принятые до появления очереди, уже обработаны
+        migrations.RunSQL(
+            sql='UPDATE bot_tgupdate SET processed = created',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='tgupdate',
+            index=models.Index(condition=models.Q(('processed__isnull', True)), fields=['update_id'], name='bot_tgupdate_pending_idx'),
+        ),
+    ]
@@ -19,3 +19,27 @@ class TgUser(models.Model):
         self.verification_code = self.__gen_code()
         self.save(update_fields=('verification_code',))
         return self.verification_code
+
+
+class TgUpdate(models.Model):
+    """
+    Принятые через webhook обновления: очередь обработки для runbot (processed пустое - не обработано)
+    и отбрасывание повторных доставок
+    """
+    update_id: int = models.BigIntegerField(unique=True)
+    payload: dict = models.JSONField(null=True, blank=True)
+    processed = models.DateTimeField(null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['update_id'], condition=models.Q(processed__isnull=True),
+                         name='bot_tgupdate_pending_idx'),
+        ]
+
+
+class TgChatState(models.Model):
+    """Состояние диалога с ботом в чате (например, выбранная категория при создании цели)"""
+    chat_id: int = models.BigIntegerField(unique=True)
+    data: str = models.TextField()
+    expires_at = models.DateTimeField(db_index=True)
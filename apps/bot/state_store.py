@@ -0,0 +1,81 @@
+import json
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from apps.bot.models import TgChatState
+
+
+class ChatStateStore(ABC):
+    """Хранилище состояния диалога по чатам с ограниченным временем жизни"""
+
+    def __init__(self, ttl: int | None = None):
+        self.ttl = ttl or settings.BOT_STATE_TTL
+
+    @staticmethod
+    def dumps(state: dict) -> str:
+        return json.dumps(state, separators=(',', ':'), ensure_ascii=False)
+
+    @staticmethod
+    def loads(data: str) -> dict:
+        return json.loads(data)
+
+    @abstractmethod
+    def get(self, chat_id: int) -> dict:
+        ...
+
+    @abstractmethod
+    def set(self, chat_id: int, state: dict) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, chat_id: int) -> None:
+        ...
+
+
+class DatabaseChatStateStore(ChatStateStore):
+    """Состояние хранится в таблице TgChatState, общей для всех процессов бота"""
+
+    def get(self, chat_id: int) -> dict:
+        row = TgChatState.objects.filter(chat_id=chat_id, expires_at__gt=timezone.now()).first()
+        return self.loads(row.data) if row else {}
+
+    def set(self, chat_id: int, state: dict) -> None:
+        now = timezone.now()
+        TgChatState.objects.update_or_create(
+            chat_id=chat_id, defaults={'data': self.dumps(state), 'expires_at': now + timedelta(seconds=self.ttl)}
+        )
+        TgChatState.objects.filter(expires_at__lte=now).delete()
+
+    def delete(self, chat_id: int) -> None:
+        TgChatState.objects.filter(chat_id=chat_id).delete()
+
+
+class CacheChatStateStore(ChatStateStore):
+    """Состояние хранится в кеше Django (BOT_STATE_CACHE), для нескольких процессов нужен общий бэкенд"""
+    key_prefix = 'bot:chat_state:'
+
+    def __init__(self, ttl: int | None = None, alias: str | None = None):
+        super().__init__(ttl)
+        self.cache = caches[alias or settings.BOT_STATE_CACHE]
+
+    def get(self, chat_id: int) -> dict:
+        data = self.cache.get(f'{self.key_prefix}{chat_id}')
+        return self.loads(data) if data else {}
+
+    def set(self, chat_id: int, state: dict) -> None:
+        self.cache.set(f'{self.key_prefix}{chat_id}', self.dumps(state), self.ttl)
+
+    def delete(self, chat_id: int) -> None:
+        self.cache.delete(f'{self.key_prefix}{chat_id}')
+
+
+@lru_cache(maxsize=None)
+def get_state_store() -> ChatStateStore:
+    """Хранилище состояний, класс задается настройкой BOT_STATE_STORE"""
+    return import_string(settings.BOT_STATE_STORE)()
@@ -1,31 +1,125 @@
+import logging
+import threading
+import time
+
 import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from apps.bot.tg.dc import GetUpdatesResponse, SendMessageResponse, SendPhotoResponse, WebhookResponse
+from apps.core import metrics
+
+logger = logging.getLogger('main')
+
+
+class ApiLatencyStats:
+    """Статистика задержек запросов к API Telegram по методам"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict[str, float]] = {}
+
+    def observe(self, method: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(method, {'count': 0, 'errors': 0, 'total': 0.0, 'max': 0.0})
+            stats['count'] += 1
+            stats['errors'] += error
+            stats['total'] += seconds
+            stats['max'] = max(stats['max'], seconds)
 
-from apps.bot.tg.dc import GetUpdatesResponse, SendMessageResponse, SendPhotoResponse
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                method: {**stats, 'avg': stats['total'] / stats['count']}
+                for method, stats in self._stats.items()
+            }
 
 
 class TgClient:
     """Взаимодействие с API Telegram"""
-    def __init__(self, token):
+    # Повторы при ошибках соединения (запрос не отправлен) для всех методов и при 5xx только для GET (getUpdates):
+    # повтор POST sendMessage после 5xx или таймаута чтения может доставить сообщение дважды.
+    # 429 обрабатывается отдельно по retry_after из ответа
+    retry_statuses = (500, 502, 503, 504)
+    retry_methods = frozenset({'GET'})
+    max_retry_after = 60
+
+    def __init__(self, token, connect_timeout: float | None = None, read_timeout: float | None = None,
+                 max_retries: int | None = None, pool_size: int | None = None):
         self.token = token
+        self.connect_timeout = connect_timeout or settings.TG_CONNECT_TIMEOUT
+        self.read_timeout = read_timeout or settings.TG_READ_TIMEOUT
+        self.max_retries = settings.TG_MAX_RETRIES if max_retries is None else max_retries
+        self.stats = ApiLatencyStats()
+        self.session = self._create_session(pool_size or settings.TG_POOL_SIZE)
+
+    def _create_session(self, pool_size: int) -> requests.Session:
+        """Сессия с пулом keep-alive соединений к api.telegram.org"""
+        retry = Retry(
+            total=self.max_retries,
+            read=0,
+            status_forcelist=self.retry_statuses,
+            allowed_methods=self.retry_methods,
+            backoff_factor=0.5,
+            raise_on_status=False,
+        )
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry))
+        return session
 
     def get_url(self, method: str) -> str:
         """Создание url"""
         return f'https://api.telegram.org/bot{self.token}/{method}'
 
+    def _request(self, http_method: str, api_method: str, read_timeout: float | None = None, **kwargs) -> dict:
+        """Запрос к API с таймаутами, повтором по retry_after при 429 и учетом задержки"""
+        timeout = (self.connect_timeout, read_timeout or self.read_timeout)
+        for attempt in range(self.max_retries + 1):
+            started = time.monotonic()
+            try:
+                response = self.session.request(http_method, self.get_url(api_method), timeout=timeout, **kwargs)
+                data = response.json()
+            except ValueError:  # В том числе requests.JSONDecodeError
+                self._observe(api_method, time.monotonic() - started, error='invalid_response')
+                raise
+            except requests.RequestException:
+                self._observe(api_method, time.monotonic() - started, error='network')
+                raise
+            error = None if data.get('ok', False) else str(data.get('error_code', 'unknown'))
+            self._observe(api_method, time.monotonic() - started, error=error)
+
+            retry_after = data.get('parameters', {}).get('retry_after')
+            if response.status_code != 429 or retry_after is None or attempt == self.max_retries:
+                return data
+            logger.warning('Telegram %s rate limited, retry after %s s', api_method, retry_after)
+            time.sleep(min(retry_after, self.max_retry_after))
+        return data
+
+    def _observe(self, api_method: str, seconds: float, error: str | None) -> None:
+        """Учет задержки и ошибки (тип сети/ответа или error_code Telegram) в статистике и метриках"""
+        self.stats.observe(api_method, seconds, error=error is not None)
+        metrics.TG_API_DURATION.labels(api_method).observe(seconds)
+        if error is not None:
+            metrics.TG_API_ERRORS.labels(api_method, error).inc()
+
     def get_updates(self, offset: int = 0, timeout: int = 60) -> GetUpdatesResponse:
-        url = self.get_url('getUpdates')
         params = {'offset': offset, 'timeout': timeout}
-        response = requests.get(url, params)
-        return GetUpdatesResponse(**response.json())
+        data = self._request('GET', 'getUpdates', params=params, read_timeout=timeout + self.read_timeout)
+        return GetUpdatesResponse(**data)
 
     def send_message(self, chat_id: int, text: str, parse_mode='HTML') -> SendMessageResponse:
-        url = self.get_url('sendMessage')
         data = {'chat_id': chat_id, 'text': text, 'parse_mode': parse_mode}
-        response = requests.post(url, data)
-        return SendMessageResponse(**response.json())
+        return SendMessageResponse(**self._request('POST', 'sendMessage', data=data))
 
     def send_photo(self, chat_id: int, photo) -> SendPhotoResponse:
-        url = self.get_url('sendPhoto')
         data = {'chat_id': chat_id, 'photo': photo}
-        response = requests.post(url, data)
-        return SendPhotoResponse(**response.json())
+        return SendPhotoResponse(**self._request('POST', 'sendPhoto', data=data))
+
+    def set_webhook(self, url: str, secret_token: str, max_connections: int = 40) -> WebhookResponse:
+        data = {'url': url, 'secret_token': secret_token, 'max_connections': max_connections,
+                'allowed_updates': '["message"]'}
+        return WebhookResponse(**self._request('POST', 'setWebhook', data=data))
+
+    def delete_webhook(self) -> WebhookResponse:
+        return WebhookResponse(**self._request('POST', 'deleteWebhook'))
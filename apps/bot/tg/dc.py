@@ -57,8 +57,16 @@ class GetUpdatesResponse(BaseModel):  # Представляет ответ на
 class SendMessageResponse(BaseModel):  # Представляет ответ на запрос метода sendMessage.
     ok: bool
     result: Message = None
+    error_code: int | None = None
+    description: str | None = None
 
 
 class SendPhotoResponse(BaseModel):  # Представляет ответ на запрос метода sendPhoto.
     ok: bool
     result: Message = None
+
+
+class WebhookResponse(BaseModel):  # Представляет ответ на запрос методов setWebhook и deleteWebhook.
+    ok: bool
+    result: bool = False
+    description: str | None = None
@@ -0,0 +1,177 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from apps.bot.tg.client import TgClient
+from apps.core import metrics
+
+logger = logging.getLogger('main')
+
+
+class TokenBucket:
+    """Ограничение частоты: rate токенов в секунду, не больше capacity накопленных"""
+
+    def __init__(self, rate: float, capacity: float, now: float | None = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Через сколько секунд будет доступен токен"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+@dataclass
+class OutboundMessage:
+    chat_id: int
+    text: str
+    parse_mode: str
+
+
+class MessageQueue:
+    """
+    Очередь исходящих сообщений бота.
+    send_message только ставит сообщение в очередь, отправка идет в фоновых потоках с соблюдением
+    лимитов Telegram на чат и на бота. Подряд идущие сообщения одному чату объединяются в одно.
+    Сообщения одного чата отправляются строго по порядку.
+    Лимиты действуют в пределах процесса: ответы бота отправляет единственный процесс runbot,
+    при нескольких отправляющих процессах лимит на бота - BOT_GLOBAL_RATE на каждый
+    """
+    max_length = 4096  # Максимальная длина сообщения Telegram
+    separator = '\n\n'
+    max_idle_buckets = 10000
+
+    def __init__(self, tg_client: TgClient, chat_rate: float | None = None, global_rate: float | None = None,
+                 senders: int = 4):
+        self.tg_client = tg_client
+        self.chat_rate = chat_rate or settings.BOT_CHAT_RATE
+        global_rate = global_rate or settings.BOT_GLOBAL_RATE
+        self._global_bucket = TokenBucket(rate=global_rate, capacity=global_rate)
+        self._chat_buckets: dict[int, TokenBucket] = {}
+        self._queues: OrderedDict[int, deque[OutboundMessage]] = OrderedDict()
+        self._in_flight: set[int] = set()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._executor = ThreadPoolExecutor(max_workers=senders, thread_name_prefix='tg-send')
+        self._thread = threading.Thread(target=self._run, name='tg-send-scheduler', daemon=True)
+
+    def start(self) -> 'MessageQueue':
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Остановка после отправки всех сообщений из очереди"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
+
+    def send_message(self, chat_id: int, text: str | None, parse_mode: str = 'HTML') -> None:
+        """Постановка сообщения в очередь (совместимо с TgClient.send_message)"""
+        if not text:
+            return
+        with self._cond:
+            self._queues.setdefault(chat_id, deque()).append(OutboundMessage(chat_id, text, parse_mode))
+            self._cond.notify_all()
+        metrics.BOT_QUEUE_DEPTH.labels('messages').inc()
+
+    def pending(self) -> int:
+        """Количество сообщений в очереди"""
+        with self._cond:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                message, delay = self._next_message(time.monotonic())
+                if message is None:
+                    if self._stopped and not self._queues and not self._in_flight:
+                        return
+                    self._cond.wait(delay)
+                    continue
+                self._in_flight.add(message.chat_id)
+            self._executor.submit(self._send, message)
+
+    def _next_message(self, now: float) -> tuple[OutboundMessage | None, float | None]:
+        """Следующее сообщение, которое можно отправить сейчас, либо время ожидания"""
+        if not self._queues:
+            return None, None
+        if global_delay := self._global_bucket.delay(now):
+            return None, global_delay
+
+        wait = None
+        for chat_id in list(self._queues):
+            if chat_id in self._in_flight:
+                continue
+            bucket = self._chat_buckets.get(chat_id)
+            if bucket is None:
+                bucket = self._chat_buckets[chat_id] = TokenBucket(rate=self.chat_rate, capacity=1, now=now)
+            if chat_delay := bucket.delay(now):
+                wait = chat_delay if wait is None else min(wait, chat_delay)
+                continue
+
+            queue = self._queues.pop(chat_id)
+            message = self._merge(queue)
+            if queue:
+                self._queues[chat_id] = queue  # В конец очереди чатов для равномерной отправки
+            bucket.consume(now)
+            self._global_bucket.consume(now)
+            self._prune_buckets(now)
+            return message, None
+        return None, wait
+
+    def _can_merge(self, message: OutboundMessage, following: OutboundMessage) -> bool:
+        if following.parse_mode != message.parse_mode:
+            return False
+        return len(message.text) + len(self.separator) + len(following.text) <= self.max_length
+
+    def _merge(self, queue: deque[OutboundMessage]) -> OutboundMessage:
+        message = queue.popleft()
+        merged = 1
+        while queue and self._can_merge(message, queue[0]):
+            message.text = f'{message.text}{self.separator}{queue.popleft().text}'
+            merged += 1
+        metrics.BOT_QUEUE_DEPTH.labels('messages').dec(merged)
+        return message
+
+    def _prune_buckets(self, now: float) -> None:
+        """Удаление лимитов простаивающих чатов, чтобы словарь не рос бесконечно"""
+        if len(self._chat_buckets) <= self.max_idle_buckets:
+            return
+        for chat_id, bucket in list(self._chat_buckets.items()):
+            if chat_id not in self._queues and chat_id not in self._in_flight and bucket.is_full(now):
+                del self._chat_buckets[chat_id]
+
+    def _send(self, message: OutboundMessage) -> None:
+        try:
+            response = self.tg_client.send_message(chat_id=message.chat_id, text=message.text,
+                                                   parse_mode=message.parse_mode)
+            if not response.ok:
+                logger.error('Telegram sendMessage to %s failed: %s %s',
+                             message.chat_id, response.error_code, response.description)
+        except Exception:
+            logger.exception('Telegram sendMessage to %s failed', message.chat_id)
+        finally:
+            with self._cond:
+                self._in_flight.discard(message.chat_id)
+                self._cond.notify_all()
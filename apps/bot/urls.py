@@ -3,4 +3,6 @@ from django.urls import path
 from apps.bot import views
 
 urlpatterns = [
-    path('verify', views.BotVerifyView.as_view(), name='bot_verify'), ]
+    path('verify', views.BotVerifyView.as_view(), name='bot_verify'),
+    path('webhook', views.BotWebhookView.as_view(), name='bot_webhook'),
+]
@@ -1,15 +1,26 @@
-from rest_framework import generics
-from rest_framework.permissions import IsAuthenticated
+import hmac
+
+from django.conf import settings
+from pydantic import ValidationError
+from rest_framework import generics, status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from apps.bot.serializer import TgUserSerializer
 from apps.bot.tg.client import TgClient
+from apps.bot.tg.dc import Update
+from apps.bot.webhook import store_update
+from apps.core import metrics
+from apps.core.profiling import SerializerTimingMixin
 from todolist.settings import BOT_TOKEN
 
 
-class BotVerifyView(generics.UpdateAPIView):
+class BotVerifyView(SerializerTimingMixin, generics.UpdateAPIView):
     serializer_class = TgUserSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 4
 
     def update(self, request, *args, **kwargs) -> Response:
         serializer: TgUserSerializer = self.get_serializer(data=request.data)
@@ -23,3 +34,29 @@ class BotVerifyView(generics.UpdateAPIView):
         tg_client.send_message(chat_id=tg_user.telegram_chat_id,
                                text='''Аккаунт успешно привязан!\n
     Доступные команды:\n"/goals" — получить список целей\n"/create" — создать новую цель''')
+
+
+class BotWebhookView(APIView):
+    """
+    Прием обновлений Telegram через webhook. Обновление сохраняется в БД до ответа 200, обрабатывает
+    его runbot (единственный потребитель очереди, порядок сообщений чата сохраняется). При ошибке
+    сохранения ответ 500, и Telegram доставит обновление повторно
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    secret_header = 'HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN'
+    query_budget = 4
+
+    def post(self, request, *args, **kwargs) -> Response:
+        secret = request.META.get(self.secret_header, '')
+        if not settings.BOT_WEBHOOK_SECRET or not hmac.compare_digest(secret, settings.BOT_WEBHOOK_SECRET):
+            raise PermissionDenied
+
+        try:
+            update = Update.parse_obj(request.data)
+        except ValidationError:
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        metrics.BOT_UPDATES.labels('webhook').inc()
+        if update.message:
+            store_update(update.update_id, request.data)
+        return Response(status=status.HTTP_200_OK)
@@ -0,0 +1,40 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.bot.models import TgUpdate
+
+logger = logging.getLogger('main')
+
+
+def store_update(update_id: int, payload: dict) -> bool:
+    """
+    Сохранение обновления до ответа Telegram: после подтверждения оно не теряется при перезапуске воркера.
+    False, если обновление уже принималось (повторная доставка Telegram)
+    """
+    try:
+        with transaction.atomic():
+            TgUpdate.objects.create(update_id=update_id, payload=payload)
+    except IntegrityError:
+        return False
+    if update_id % 1000 == 0:
+        TgUpdate.objects.filter(
+            processed__isnull=False,
+            created__lt=timezone.now() - timedelta(days=settings.BOT_WEBHOOK_DEDUP_DAYS),
+        ).delete()
+    return True
+
+
+def pending_updates(after_id: int | None = None, limit: int = 100) -> list[TgUpdate]:
+    """Необработанные обновления по порядку update_id (после after_id - уже переданных в обработку)"""
+    queryset = TgUpdate.objects.filter(processed__isnull=True, payload__isnull=False)
+    if after_id is not None:
+        queryset = queryset.filter(update_id__gt=after_id)
+    return list(queryset.order_by('update_id')[:limit])
+
+
+def mark_processed(update_id: int) -> None:
+    TgUpdate.objects.filter(update_id=update_id).update(processed=timezone.now())
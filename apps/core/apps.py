@@ -6,3 +6,9 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
+
+    def ready(self) -> None:
+        from django.db.backends.signals import connection_created
+
+        from apps.core.db import install_query_observer
+        connection_created.connect(install_query_observer)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Callable, Iterator
+
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+# Наблюдатели SQL текущего запроса. ContextVar, а не execute_wrapper соединения: в режиме ASGI запросы к БД
+# выполняются в синхронном потоке со своими соединениями, а контекст в него передается sync_to_async
+_observers: ContextVar[tuple[Callable, ...]] = ContextVar('sql_observers', default=())
+
+
+def _execute(execute, sql, params, many, context):
+    for observer in reversed(_observers.get()):
+        execute = partial(observer, execute)
+    return execute(sql, params, many, context)
+
+
+def install_query_observer(sender, connection: BaseDatabaseWrapper, **kwargs) -> None:
+    """Обработчик connection_created: подключение диспетчера наблюдателей к соединению"""
+    if _execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute)
+
+
+@contextmanager
+def observe_queries(observer: Callable) -> Iterator[None]:
+    """Наблюдатель с сигнатурой execute_wrapper видит все SQL-запросы контекста на всех соединениях"""
+    token = _observers.set((*_observers.get(), observer))
+    try:
+        yield
+    finally:
+        _observers.reset(token)
+
+
+@contextmanager
+def unobserved() -> Iterator[None]:
+    """Служебные запросы (проверка задержки реплик) вне замеров и бюджетов запроса"""
+    token = _observers.set(())
+    try:
+        yield
+    finally:
+        _observers.reset(token)
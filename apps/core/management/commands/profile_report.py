@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.profiling import aggregate, read_samples
+
+SORT_KEYS = {
+    'total': 'total_ms',
+    'p95': 'p95_ms',
+    'sql': 'sql_ms',
+    'queries': 'sql_count',
+    'serializer': 'serializer_ms',
+    'size': 'size',
+    'count': 'count',
+}
+# Колонка отчета: поле, выравнивание и ширина, формат значения
+COLUMNS = (
+    ('view', '<32', ''), ('method', '<6', ''), ('count', '>7', ''), ('total_ms', '>11', '.1f'),
+    ('p50_ms', '>9', '.1f'), ('p95_ms', '>9', '.1f'), ('sql_count', '>9', '.1f'), ('sql_ms', '>9', '.1f'),
+    ('serializer_ms', '>13', '.1f'), ('size', '>9', ''), ('duplicates', '>10', ''),
+)
+
+
+class Command(BaseCommand):
+    help = 'Рейтинг представлений по замерам профилирования (PROFILING_LOG): самые затратные эндпоинты первыми'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--file', default=settings.PROFILING_LOG, help='Лог замеров (ротированные копии тоже)')
+        parser.add_argument('--sort', choices=SORT_KEYS, default='total', help='Поле сортировки')
+        parser.add_argument('--limit', type=int, default=20, help='Количество строк отчета')
+
+    def handle(self, *args, **options) -> None:
+        rows = aggregate(read_samples(options['file']))
+        if not rows:
+            raise CommandError(f'No profiling samples in "{options["file"]}"')
+
+        rows.sort(key=lambda row: row[SORT_KEYS[options['sort']]], reverse=True)
+        self.stdout.write(' '.join(f'{name:{align}}' for name, align, _ in COLUMNS))
+        for row in rows[:options['limit']]:
+            self.stdout.write(' '.join(f'{row[name]:{align}{fmt}}' for name, align, fmt in COLUMNS))
+            if row['similar_sql']:
+                self.stdout.write(self.style.WARNING(f'    {row["similar"]}x {row["similar_sql"]}'))
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import os
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+
+# В режиме нескольких процессов (gunicorn -w 4) значения пишутся в файлы каталога PROMETHEUS_MULTIPROC_DIR
+# и суммируются при выдаче /metrics, иначе хранятся в памяти процесса
+
+REQUEST_LATENCY = Histogram(
+    'todolist_http_request_duration_seconds', 'Время обработки HTTP-запроса',
+    ['route', 'method', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_QUERIES = Counter('todolist_db_queries_total', 'SQL-запросы HTTP-запросов', ['route'])
+DB_QUERY_DURATION = Counter('todolist_db_query_duration_seconds_total', 'Время SQL-запросов HTTP-запросов', ['route'])
+DB_REPLICA_LAG = Gauge(
+    'todolist_db_replica_lag_seconds', 'Задержка реплики при последней проверке (-1 - недоступна)', ['alias'],
+    multiprocess_mode='livemax',
+)
+LIST_CACHE_REQUESTS = Counter(
+    'todolist_list_cache_requests_total', 'Обращения к кешу ответов списков (GOALS_LIST_CACHE)', ['view', 'result'],
+)
+
+BOT_UPDATES = Counter('todolist_bot_updates_total', 'Полученные обновления Telegram', ['source'])
+BOT_UPDATE_LAG = Gauge(
+    'todolist_bot_update_lag_seconds', 'Задержка начала обработки обновления от Message.date',
+    multiprocess_mode='livemax',
+)
+BOT_QUEUE_DEPTH = Gauge(
+    'todolist_bot_queue_depth', 'Обновления в обработке и сообщения в очереди отправки', ['queue'],
+    multiprocess_mode='livesum',
+)
+
+TG_API_DURATION = Histogram(
+    'todolist_telegram_api_duration_seconds', 'Время запросов к API Telegram', ['method'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 70),
+)
+TG_API_ERRORS = Counter('todolist_telegram_api_errors_total', 'Ошибки запросов к API Telegram', ['method', 'reason'])
+
+
+def is_multiprocess() -> bool:
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+def get_registry() -> CollectorRegistry:
+    """Реестр для выдачи метрик: сумма по файлам всех процессов в режиме multiprocess"""
+    if not is_multiprocess():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
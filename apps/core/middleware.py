@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Callable, ContextManager, Iterator
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+from apps.core import metrics, profiling
+from apps.core.db import observe_queries
+from apps.core.routers import ReplicaScope, replica_scope
+
+logger = logging.getLogger('main')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Cookie привязки клиента к мастеру после записи: следующие запросы читают свои изменения
+PRIMARY_PIN_COOKIE = 'db_primary'
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Представление выполнило больше SQL-запросов, чем объявлено в query_budget"""
+
+
+def get_query_budget(view_class: type | None, method: str) -> int | None:
+    """
+    Бюджет запросов представления: атрибут query_budget - число для всех методов
+    или словарь {'GET': 3, 'POST': 5} (ключ '*' - для остальных методов)
+    """
+    budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        return budget.get(method, budget.get('*'))
+    return budget
+
+
+class ObservingMiddleware(ABC):
+    """
+    Основа middleware замеров для WSGI и ASGI: observe - контекст вокруг обработки запроса,
+    finish - обработка ответа. В асинхронной цепочке __call__ возвращает корутину, без перехода в поток
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def enabled(self, request: HttpRequest) -> bool:
+        return True
+
+    @abstractmethod
+    def observe(self, request: HttpRequest) -> ContextManager[Any]:
+        ...
+
+    @abstractmethod
+    def finish(self, request: HttpRequest, response: HttpResponse, state: Any) -> HttpResponse:
+        ...
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled(request):
+            return self.get_response(request)
+        with self.observe(request) as state:
+            response = self.get_response(request)
+        return self.finish(request, response, state)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if not self.enabled(request):
+            return await self.get_response(request)
+        with self.observe(request) as state:
+            response = await self.get_response(request)
+        return self.finish(request, response, state)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMiddleware(ObservingMiddleware):
+    """
+    Подсчет SQL-запросов запроса и сравнение с бюджетом представления (query_budget).
+    Превышение пишется в лог, при QUERY_BUDGET_RAISE (в тестах) - исключение QueryBudgetExceeded.
+    При DEBUG количество и бюджет возвращаются в заголовках X-Query-Count и X-Query-Budget
+    """
+
+    @contextmanager
+    def observe(self, request: HttpRequest) -> Iterator[QueryCounter]:
+        counter = QueryCounter()
+        with observe_queries(counter):
+            yield counter
+
+    def finish(self, request: HttpRequest, response: HttpResponse, counter: QueryCounter) -> HttpResponse:
+        budget = getattr(request, '_query_budget', None)
+        if settings.DEBUG:
+            response['X-Query-Count'] = str(counter.count)
+            if budget is not None:
+                response['X-Query-Budget'] = str(budget)
+        if budget is not None and counter.count > budget:
+            message = f'{request.method} {request.path}: {counter.count} SQL queries, budget {budget}'
+            if settings.QUERY_BUDGET_RAISE:
+                raise QueryBudgetExceeded(message)
+            logger.warning('Query budget exceeded: %s', message)
+        return response
+
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs) -> None:
+        request._query_budget = get_query_budget(getattr(view_func, 'view_class', None), request.method)
+
+
+class ProfilingMiddleware(ObservingMiddleware):
+    """
+    Профилирование доли запросов (PROFILING_SAMPLE_RATE): время ответа, количество и время SQL,
+    повторяющиеся запросы, время сериализации и размер ответа пишутся в лог profiling.
+    Запросы вне выборки не замеряются, отчет - команда profile_report
+    """
+
+    def enabled(self, request: HttpRequest) -> bool:
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    @contextmanager
+    def observe(self, request: HttpRequest) -> Iterator[profiling.Profile]:
+        profile = profiling.Profile()
+        token = profiling.current_profile.set(profile)
+        try:
+            with observe_queries(profile):
+                yield profile
+        finally:
+            profiling.current_profile.reset(token)
+
+    def finish(self, request: HttpRequest, response: HttpResponse, profile: profiling.Profile) -> HttpResponse:
+        wall_time = time.perf_counter() - profile.started
+        similar, similar_sql = profile.similar()
+        view = getattr(request, '_profiled_view', None)
+        profiling.record({
+            'view': view.__name__ if view else 'unresolved',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'wall_ms': round(wall_time * 1000, 3),
+            'sql_count': profile.sql_count,
+            'sql_ms': round(profile.sql_time * 1000, 3),
+            'serializer_ms': round(profile.serializer_time * 1000, 3),
+            'size': 0 if response.streaming else len(response.content),
+            'duplicates': profile.duplicates(),
+            'similar': similar,
+            'similar_sql': similar_sql,
+        })
+        return response
+
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs) -> None:
+        request._profiled_view = getattr(view_func, 'view_class', view_func)
+
+
+class SqlTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class MetricsMiddleware(ObservingMiddleware):
+    """
+    Метрики Prometheus по маршрутам (шаблон URL, а не путь - чтобы не плодить серии):
+    гистограмма времени ответа, количество и время SQL-запросов (METRICS_ENABLED)
+    """
+
+    def enabled(self, request: HttpRequest) -> bool:
+        return settings.METRICS_ENABLED
+
+    @contextmanager
+    def observe(self, request: HttpRequest) -> Iterator[SqlTimer]:
+        timer = SqlTimer()
+        with observe_queries(timer):
+            yield timer
+
+    def finish(self, request: HttpRequest, response: HttpResponse, timer: SqlTimer) -> HttpResponse:
+        duration = time.perf_counter() - timer.started
+        match = request.resolver_match
+        route = match.route if match else 'unresolved'
+        metrics.REQUEST_LATENCY.labels(route, request.method, response.status_code).observe(duration)
+        if timer.count:
+            metrics.DB_QUERIES.labels(route).inc(timer.count)
+            metrics.DB_QUERY_DURATION.labels(route).inc(timer.duration)
+        return response
+
+
+class ReplicaMiddleware(ObservingMiddleware):
+    """
+    Чтения безопасных запросов идут на реплики (DATABASE_REPLICAS) до первой записи.
+    Изменяющие запросы и запросы в течение POSTGRES_REPLICA_PIN_SECONDS после записи читают с мастера
+    """
+
+    def enabled(self, request: HttpRequest) -> bool:
+        return bool(settings.DATABASE_REPLICAS)
+
+    @contextmanager
+    def observe(self, request: HttpRequest) -> Iterator[ReplicaScope]:
+        pinned = request.method not in SAFE_METHODS or PRIMARY_PIN_COOKIE in request.COOKIES
+        with replica_scope(pinned=pinned) as scope:
+            yield scope
+
+    def finish(self, request: HttpRequest, response: HttpResponse, scope: ReplicaScope) -> HttpResponse:
+        if scope.written:
+            response.set_cookie(PRIMARY_PIN_COOKIE, '1', max_age=settings.POSTGRES_REPLICA_PIN_SECONDS,
+                                httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+import logging
+import statistics
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from rest_framework import serializers
+
+logger = logging.getLogger('profiling')
+
+# Профиль текущего запроса, None - запрос не попал в выборку
+current_profile: ContextVar[Profile | None] = ContextVar('current_profile', default=None)
+
+SQL_PREVIEW_LENGTH = 200
+
+
+class Profile:
+    """Замеры одного запроса: SQL (количество, время, повторы) и время сериализации"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.statements: Counter[str] = Counter()
+        self.executions: Counter[tuple[str, str]] = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.sql_count += 1
+            self.statements[sql] += 1
+            self.executions[sql, repr(params)] += 1
+
+    def duplicates(self) -> int:
+        """Повторы запросов с теми же параметрами - кандидаты на кеширование в пределах запроса"""
+        return sum(count - 1 for count in self.executions.values())
+
+    def similar(self) -> tuple[int, str | None]:
+        """Самый частый SQL с разными параметрами (признак N+1) и число его выполнений"""
+        if not self.statements:
+            return 0, None
+        sql, count = self.statements.most_common(1)[0]
+        return count, sql[:SQL_PREVIEW_LENGTH] if count > 1 else None
+
+
+@contextmanager
+def timed_serializer() -> Iterator[None]:
+    profile = current_profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.serializer_time += time.perf_counter() - start
+
+
+@lru_cache
+def timed_serializer_class(serializer_class: type[serializers.BaseSerializer]) -> type[serializers.BaseSerializer]:
+    """
+    Подкласс сериализатора с замером to_representation. Для many=True замеряется каждый элемент,
+    выборка queryset в замер не входит, вложенные сериализаторы входят во внешний
+    """
+    def to_representation(self, instance):
+        with timed_serializer():
+            return super(timed, self).to_representation(instance)
+
+    timed = type(serializer_class.__name__, (serializer_class,), {
+        '__module__': serializer_class.__module__,
+        '__qualname__': serializer_class.__qualname__,
+        'to_representation': to_representation,
+    })
+    return timed
+
+
+class SerializerTimingMixin:
+    """
+    Время сериализации ответа представления в профиле запроса (ProfilingMiddleware).
+    Вне выборки профилирования стоимость - одно чтение ContextVar на объект
+    """
+
+    def get_serializer_class(self) -> type[serializers.BaseSerializer]:
+        return timed_serializer_class(super().get_serializer_class())
+
+
+def record(sample: dict) -> None:
+    """Запись замера в лог profiling одной JSON-строкой"""
+    logger.info(json.dumps(sample, ensure_ascii=False))
+
+
+def read_samples(path: str | Path) -> Iterator[dict]:
+    """Замеры из лога и его ротированных копий (log.1, log.2, ...)"""
+    path = Path(path)
+    for file in sorted(path.parent.glob(f'{path.name}*')):
+        with file.open(encoding='utf-8') as lines:
+            for line in lines:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def _percentile(values: list[float], percent: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1]
+
+
+def aggregate(samples: Iterable[dict]) -> list[dict]:
+    """
+    Сводка по представлениям (view + метод), отсортированная по суммарному времени:
+    эндпоинты, на которые уходит больше всего времени сервера, идут первыми
+    """
+    groups: dict[tuple[str, str], list[dict]] = {}
+    for sample in samples:
+        groups.setdefault((sample['view'], sample['method']), []).append(sample)
+
+    rows = []
+    for (view, method), group in groups.items():
+        wall = [sample['wall_ms'] for sample in group]
+        worst = max(group, key=lambda sample: sample['similar'])
+        rows.append({
+            'view': view,
+            'method': method,
+            'count': len(group),
+            'total_ms': round(sum(wall), 3),
+            'p50_ms': round(statistics.median(wall), 3),
+            'p95_ms': round(_percentile(wall, 95), 3),
+            'sql_count': round(statistics.fmean(sample['sql_count'] for sample in group), 1),
+            'sql_ms': round(statistics.fmean(sample['sql_ms'] for sample in group), 3),
+            'serializer_ms': round(statistics.fmean(sample['serializer_ms'] for sample in group), 3),
+            'size': round(statistics.fmean(sample['size'] for sample in group)),
+            'duplicates': max(sample['duplicates'] for sample in group),
+            'similar': worst['similar'],
+            'similar_sql': worst['similar_sql'],
+        })
+    return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
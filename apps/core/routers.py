@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from apps.core import metrics
+from apps.core.db import unobserved
+
+logger = logging.getLogger('main')
+
+# Задержка реплики: 0, если она воспроизвела все полученные WAL (иначе на простаивающем мастере
+# pg_last_xact_replay_timestamp стареет без реального отставания) или не находится в режиме восстановления
+LAG_SQL = '''
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+'''
+
+# Последняя проверка задержки реплик в процессе: алиас -> (время проверки, задержка или None)
+_lag_checks: dict[str, tuple[float, float | None]] = {}
+
+
+@dataclass
+class ReplicaScope:
+    """Чтения одного HTTP-запроса или обновления бота: выбранная реплика и привязка к мастеру"""
+    pinned: bool = False
+    written: bool = False
+    replica: str | None = None
+
+
+# Вне области (миграции, команды, фоновые задачи) все запросы идут на мастер
+_scope: ContextVar[ReplicaScope | None] = ContextVar('replica_scope', default=None)
+
+
+@contextmanager
+def replica_scope(pinned: bool = False) -> Iterator[ReplicaScope]:
+    """Область, в которой чтения идут на реплику до первой записи"""
+    scope = ReplicaScope(pinned=pinned)
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+def replica_lag(alias: str) -> float | None:
+    """Задержка реплики в секундах, None - реплика недоступна"""
+    try:
+        with unobserved(), connections[alias].cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            lag = float(cursor.fetchone()[0])
+    except DatabaseError:
+        logger.warning('Replica %s is unavailable', alias, exc_info=True)
+        lag = None
+    metrics.DB_REPLICA_LAG.labels(alias).set(-1 if lag is None else lag)
+    return lag
+
+
+def is_fresh(alias: str) -> bool:
+    """Реплика доступна и отстает не больше POSTGRES_REPLICA_MAX_LAG (проверка раз в интервал)"""
+    now = time.monotonic()
+    checked = _lag_checks.get(alias)
+    if checked is None or now - checked[0] >= settings.POSTGRES_REPLICA_LAG_CHECK_INTERVAL:
+        checked = _lag_checks[alias] = (now, replica_lag(alias))
+    lag = checked[1]
+    if lag is not None and lag > settings.POSTGRES_REPLICA_MAX_LAG:
+        logger.warning('Replica %s lags %.1f s behind, reading from primary', alias, lag)
+        return False
+    return lag is not None
+
+
+def choose_replica() -> str | None:
+    """Взвешенный случайный выбор среди актуальных реплик"""
+    fresh = [alias for alias in settings.DATABASE_REPLICAS if is_fresh(alias)]
+    if not fresh:
+        return None
+    return random.choices(fresh, weights=[settings.DATABASE_REPLICAS[alias] for alias in fresh])[0]
+
+
+class ReplicaRouter:
+    """
+    Чтения в области replica_scope идут на реплику, выбранную один раз на область, записи - на мастер.
+    После первой записи, внутри транзакции и при отстающих репликах чтения тоже идут на мастер
+    """
+
+    def db_for_read(self, model, **hints) -> str | None:
+        scope = _scope.get()
+        if scope is None or not settings.DATABASE_REPLICAS:
+            return None
+        if scope.pinned or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if scope.replica is None:
+            scope.replica = choose_replica() or DEFAULT_DB_ALIAS
+        return scope.replica
+
+    def db_for_write(self, model, **hints) -> str:
+        scope = _scope.get()
+        if scope is not None:
+            scope.pinned = scope.written = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool | None:
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db: str, app_label: str, model_name: str | None = None, **hints) -> bool | None:
+        return False if db in settings.DATABASE_REPLICAS else None
@@ -1,22 +1,32 @@
 from __future__ import annotations
 
+import ipaddress
+
+from django.conf import settings
 from django.contrib.auth import login, logout
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views import View
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from rest_framework.generics import CreateAPIView, RetrieveUpdateDestroyAPIView, UpdateAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.core import metrics
 from apps.core.models import User
+from apps.core.profiling import SerializerTimingMixin
 from apps.core.serializer import CreateUserSerializer, LoginSerializer, ProfileSerializer, UpdatePasswordSerializer
 
 
-class SingUpView(CreateAPIView):
+class SingUpView(SerializerTimingMixin, CreateAPIView):
     """Регистрация нового пользователя"""
     serializer_class = CreateUserSerializer
+    query_budget = 2
 
 
-class LoginView(CreateAPIView):
+class LoginView(SerializerTimingMixin, CreateAPIView):
     """Вход по имени и паролю"""
     serializer_class = LoginSerializer
+    query_budget = 9
 
     def create(self, request, *args, **kwargs) -> Response:
         serializer = self.get_serializer(data=request.data)
@@ -25,11 +35,12 @@ class LoginView(CreateAPIView):
         return Response(serializer.data)
 
 
-class ProfileView(RetrieveUpdateDestroyAPIView):
+class ProfileView(SerializerTimingMixin, RetrieveUpdateDestroyAPIView):
     """Редактирование данных пользователя"""
     queryset = User.objects.all()
     serializer_class = ProfileSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 2, 'PUT': 3, 'PATCH': 3, 'DELETE': 4}
 
     def get_object(self) -> User:
         return self.request.user
@@ -39,11 +50,33 @@ class ProfileView(RetrieveUpdateDestroyAPIView):
         logout(self.request)
 
 
-class UpdatePassword(UpdateAPIView):
+class UpdatePassword(SerializerTimingMixin, UpdateAPIView):
     """Обновление пароля"""
     queryset = User.objects.all()
     serializer_class = UpdatePasswordSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 3
 
     def get_object(self) -> User:
         return self.request.user
+
+
+class MetricsView(View):
+    """Метрики Prometheus (в режиме multiprocess - сумма по всем процессам gunicorn)"""
+    query_budget = 0
+
+    def get(self, request, *args, **kwargs) -> HttpResponse:
+        if not self.is_internal(request):
+            return HttpResponseForbidden()
+        return HttpResponse(generate_latest(metrics.get_registry()), content_type=CONTENT_TYPE_LATEST)
+
+    @staticmethod
+    def is_internal(request) -> bool:
+        """Запрос пришел напрямую (не через nginx) с адреса из METRICS_ALLOWED_IPS"""
+        if 'HTTP_X_FORWARDED_FOR' in request.META or 'HTTP_X_REAL_IP' in request.META:
+            return False
+        try:
+            address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+        except ValueError:
+            return False
+        return any(address in ipaddress.ip_network(network, strict=False) for network in settings.METRICS_ALLOWED_IPS)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from django.contrib import admin
 
-from apps.goals.models import Board, Goal, GoalCategory, GoalComment
+from apps.goals.models import ArchiveJob, Board, Goal, GoalCategory, GoalComment
 
 
 @admin.register(GoalCategory)
@@ -35,3 +35,10 @@ class BoardAdmin(admin.ModelAdmin):
     search_fields = ('title',)
     list_filter = ('title', 'is_deleted',)
     search_help_text = 'Поиск по названию доски'
+
+
+@admin.register(ArchiveJob)
+class ArchiveJobAdmin(admin.ModelAdmin):
+    list_display = ('board', 'category', 'status', 'goals_done', 'goals_total', 'created', 'updated',)
+    list_filter = ('status',)
+    readonly_fields = ('goals_total', 'goals_done', 'categories_done', 'last_goal_id', 'error',)
@@ -6,3 +6,6 @@ from django.apps import AppConfig
 class GoalsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.goals'
+
+    def ready(self) -> None:
+        from apps.goals import signals  # noqa: F401
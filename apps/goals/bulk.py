@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.utils import timezone
+from rest_framework.request import Request
+
+from apps.goals.membership import EDITOR_ROLES, get_board_roles
+from apps.goals.models import Goal, GoalCategory
+from apps.goals.response_cache import bump_board_version
+from apps.goals.serializer import GoalBatchCreateItemSerializer, GoalBatchUpdateItemSerializer
+
+NOT_FOUND = {'id': ['Not found.']}
+PERMISSION_DENIED = {'detail': ['You do not have permission to perform this action.']}
+
+
+def _ok(index: int, goal_id: int) -> dict:
+    return {'index': index, 'id': goal_id, 'ok': True}
+
+
+def _error(index: int, errors: dict, goal_id: int | None = None) -> dict:
+    return {'index': index, 'id': goal_id, 'ok': False, 'errors': errors}
+
+
+def _is_editor(roles: dict[int, int], board_id: int) -> bool:
+    return roles.get(board_id) in EDITOR_ROLES
+
+
+def _visible_goals(ids: Iterable[int]) -> dict[int, Goal]:
+    """Не архивные цели не удаленных категорий и досок одним запросом: {id: goal}"""
+    goals = (Goal.objects.filter(id__in=set(ids), category__is_deleted=False, board__is_deleted=False)
+             .exclude(status=Goal.Status.archived)
+             .only('id', 'status', 'priority', 'updated', 'board_id'))
+    return {goal.id: goal for goal in goals}
+
+
+def bulk_create_goals(request: Request, items: list[dict]) -> list[dict]:
+    """
+    Пакетное создание целей: валидация каждой цели без запросов к БД, категории загружаются одним
+    запросом, права проверяются по ролям пользователя на досках, запись одним bulk_create
+    """
+    results: list[dict | None] = [None] * len(items)
+    valid = {}
+    for index, item in enumerate(items):
+        serializer = GoalBatchCreateItemSerializer(data=item)
+        if serializer.is_valid():
+            valid[index] = serializer.validated_data
+        else:
+            results[index] = _error(index, serializer.errors)
+
+    categories = dict(
+        GoalCategory.objects.filter(id__in={data['category'] for data in valid.values()},
+                                    is_deleted=False, board__is_deleted=False).values_list('id', 'board_id')
+    )
+    roles = get_board_roles(request)
+    goals = {}
+    for index, data in valid.items():
+        board_id = categories.get(data['category'])
+        if board_id is None or board_id not in roles:
+            results[index] = _error(index, {'category': ['Not found.']})
+        elif not _is_editor(roles, board_id):
+            results[index] = _error(index, PERMISSION_DENIED)
+        else:
+            goals[index] = Goal(user=request.user, category_id=data.pop('category'), board_id=board_id, **data)
+
+    Goal.objects.bulk_create(goals.values())
+    # bulk-операции не отправляют сигналы, меняем версии досок для кеша ответов явно
+    bump_board_version(*{goal.board_id for goal in goals.values()})
+    for index, goal in goals.items():
+        results[index] = _ok(index, goal.id)
+    return results
+
+
+def bulk_update_goals(request: Request, items: list[dict]) -> list[dict]:
+    """Пакетное изменение статуса и приоритета целей одним bulk_update"""
+    results: list[dict | None] = [None] * len(items)
+    valid = {}
+    for index, item in enumerate(items):
+        serializer = GoalBatchUpdateItemSerializer(data=item)
+        if serializer.is_valid():
+            valid[index] = serializer.validated_data
+        else:
+            results[index] = _error(index, serializer.errors, item.get('id') if isinstance(item, dict) else None)
+
+    goals = _visible_goals(data['id'] for data in valid.values())
+    roles = get_board_roles(request)
+    now = timezone.now()
+    changed = {}
+    for index, data in valid.items():
+        goal = goals.get(data['id'])
+        if goal is None or goal.board_id not in roles:
+            results[index] = _error(index, NOT_FOUND, data['id'])
+            continue
+        if not _is_editor(roles, goal.board_id):
+            results[index] = _error(index, PERMISSION_DENIED, data['id'])
+            continue
+        goal.status = data.get('status', goal.status)
+        goal.priority = data.get('priority', goal.priority)
+        goal.updated = now
+        changed[goal.id] = goal
+        results[index] = _ok(index, goal.id)
+
+    if changed:
+        Goal.objects.bulk_update(changed.values(), fields=('status', 'priority', 'updated'))
+        bump_board_version(*{goal.board_id for goal in changed.values()})
+    return results
+
+
+def bulk_archive_goals(request: Request, ids: list[int]) -> list[dict]:
+    """Пакетное архивирование целей одним UPDATE"""
+    goals = _visible_goals(ids)
+    roles = get_board_roles(request)
+    results = []
+    archived = set()
+    for index, goal_id in enumerate(ids):
+        goal = goals.get(goal_id)
+        if goal is None or goal.board_id not in roles:
+            results.append(_error(index, NOT_FOUND, goal_id))
+        elif not _is_editor(roles, goal.board_id):
+            results.append(_error(index, PERMISSION_DENIED, goal_id))
+        else:
+            archived.add(goal_id)
+            results.append(_ok(index, goal_id))
+
+    if archived:
+        Goal.objects.filter(id__in=archived).update(status=Goal.Status.archived, updated=timezone.now())
+        bump_board_version(*{goals[goal_id].board_id for goal_id in archived})
+    return results
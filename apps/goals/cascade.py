@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from apps.core.models import User
+from apps.goals.models import ArchiveJob, Board, Goal, GoalCategory
+
+logger = logging.getLogger('main')
+
+
+def archive_board(board: Board, user: User) -> ArchiveJob | None:
+    """
+    Удаление доски: доска помечается удаленной сразу, категории и цели архивируются
+    синхронно или (GOALS_ARCHIVE_ASYNC) фоновой задачей пачками
+    """
+    with transaction.atomic():
+        board.is_deleted = True
+        board.save(update_fields=('is_deleted', 'updated'))
+        if not settings.GOALS_ARCHIVE_ASYNC:
+            board.categories.update(is_deleted=True)
+            Goal.objects.filter(board=board).update(status=Goal.Status.archived)
+            return None
+        return _create_job(board=board, user=user)
+
+
+def archive_category(category: GoalCategory, user: User) -> ArchiveJob | None:
+    """Удаление категории: категория помечается удаленной сразу, цели архивируются как и при удалении доски"""
+    with transaction.atomic():
+        category.is_deleted = True
+        category.save(update_fields=('is_deleted', 'updated'))
+        if not settings.GOALS_ARCHIVE_ASYNC:
+            category.goals.update(status=Goal.Status.archived)
+            return None
+        return _create_job(board_id=category.board_id, category=category, user=user)
+
+
+def _create_job(**fields) -> ArchiveJob:
+    job = ArchiveJob(**fields)
+    job.goals_total = _goals(job).count()
+    job.save()
+    transaction.on_commit(lambda: run_job_async(job.id))
+    return job
+
+
+def _goals(job: ArchiveJob) -> QuerySet:
+    """Еще не архивированные цели задачи"""
+    goals = Goal.objects.filter(board_id=job.board_id).exclude(status=Goal.Status.archived)
+    if job.category_id:
+        goals = goals.filter(category_id=job.category_id)
+    return goals
+
+
+def run_job_async(job_id: int) -> None:
+    """Выполнение задачи в фоновом потоке текущего процесса"""
+    def target() -> None:
+        try:
+            run_job(job_id)
+        finally:
+            # Соединение потока больше не понадобится, а при CONN_MAX_AGE оно не закрылось бы само
+            connection.close()
+
+    threading.Thread(target=target, name=f'archive-job-{job_id}', daemon=True).start()
+
+
+def claimable(retry_failed: bool = False) -> Q:
+    """
+    Задачи, которые можно взять в работу: ожидающие, зависшие (выполняются, но без прогресса
+    GOALS_ARCHIVE_STALE_AFTER секунд - исполнитель прерван) и, при retry_failed, завершившиеся ошибкой
+    """
+    stale_before = timezone.now() - timedelta(seconds=settings.GOALS_ARCHIVE_STALE_AFTER)
+    condition = Q(status=ArchiveJob.Status.pending) | Q(status=ArchiveJob.Status.running, updated__lt=stale_before)
+    if retry_failed:
+        condition |= Q(status=ArchiveJob.Status.failed)
+    return condition
+
+
+def claim_job(job_id: int, retry_failed: bool = False) -> bool:
+    """Захват задачи условным UPDATE: из одновременных исполнителей задачу получает только один"""
+    claimed = ArchiveJob.objects.filter(claimable(retry_failed), id=job_id).update(
+        status=ArchiveJob.Status.running, error='', updated=timezone.now()
+    )
+    return claimed == 1
+
+
+def run_job(job_id: int, retry_failed: bool = False) -> ArchiveJob | None:
+    """
+    Архивирование пачками по GOALS_ARCHIVE_BATCH_SIZE строк, каждая пачка в своей транзакции.
+    Прогресс сохраняется после каждой пачки, поэтому прерванную задачу можно просто запустить снова.
+    None - задачу выполняет другой исполнитель или она уже завершена
+    """
+    batch_size = settings.GOALS_ARCHIVE_BATCH_SIZE
+    if not claim_job(job_id, retry_failed):
+        return None
+    job = ArchiveJob.objects.get(id=job_id)
+
+    try:
+        if not job.category_id:
+            categories = GoalCategory.objects.filter(board_id=job.board_id, is_deleted=False)
+            while ids := list(categories.order_by('id').values_list('id', flat=True)[:batch_size]):
+                with transaction.atomic():
+                    GoalCategory.objects.filter(id__in=ids).update(is_deleted=True)
+                    job.categories_done += len(ids)
+                    job.save(update_fields=('categories_done', 'updated'))
+
+        goals = _goals(job).order_by('id').values_list('id', flat=True)
+        while ids := list(goals.filter(id__gt=job.last_goal_id)[:batch_size]):
+            with transaction.atomic():
+                archived = Goal.objects.filter(id__in=ids).exclude(status=Goal.Status.archived).update(
+                    status=Goal.Status.archived
+                )
+                job.goals_done += archived
+                job.last_goal_id = ids[-1]
+                job.save(update_fields=('goals_done', 'last_goal_id', 'updated'))
+    except Exception as error:
+        logger.exception('Archive job %s failed', job_id)
+        job.status = ArchiveJob.Status.failed
+        job.error = str(error)
+        job.save(update_fields=('status', 'error', 'updated'))
+        return job
+
+    job.status = ArchiveJob.Status.done
+    job.save(update_fields=('status', 'updated'))
+    return job
@@ -1,18 +1,32 @@
 from __future__ import annotations
 
 import django_filters
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
 from django.db import models
+from django.db.models import F, QuerySet
 from django_filters import rest_framework
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
 
-from apps.goals.models import Goal
+from apps.goals.models import Goal, GoalComment
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    pass
 
 
 class GoalDateFilter(rest_framework.FilterSet):
+    # Фильтр по id без ModelChoiceFilter: без запроса проверки категории при каждом построении фильтра,
+    # видимость категорий ограничивает queryset представления
+    category = django_filters.NumberFilter(field_name='category_id')
+    category__in = NumberInFilter(field_name='category_id')
+
     class Meta:
         model = Goal
         fields = {
             'due_date': ('lte', 'gte'),
-            'category': ('exact', 'in'),
             'status': ('exact', 'in'),
             'priority': ('exact', 'in'),
         }
@@ -21,3 +35,45 @@ class GoalDateFilter(rest_framework.FilterSet):
         models.DateTimeField: {'filter_class': django_filters.IsoDateTimeFilter},
         models.DateField: {'filter_class': django_filters.IsoDateTimeFilter},
     }
+
+
+class CommentFilter(rest_framework.FilterSet):
+    goal = django_filters.NumberFilter(field_name='goal_id')
+
+    class Meta:
+        model = GoalComment
+        fields = ('goal',)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Полнотекстовый поиск по полю search_vector (tsvector + GIN индекс) вместо ILIKE у SearchFilter.
+    Поддерживает синтаксис websearch: "фраза", or, -исключение.
+    Если клиент не передал ordering, результаты сортируются по релевантности
+    """
+    search_param = api_settings.SEARCH_PARAM
+    vector_field = 'search_vector'
+
+    def filter_queryset(self, request: Request, queryset: QuerySet, view) -> QuerySet:
+        term = request.query_params.get(self.search_param, '').strip()
+        if not term:
+            return queryset
+
+        query = SearchQuery(term, config=settings.SEARCH_CONFIG, search_type='websearch')
+        queryset = queryset.filter(**{self.vector_field: query}).annotate(
+            search_rank=SearchRank(F(self.vector_field), query)
+        )
+        if OrderingFilter.ordering_param not in request.query_params:
+            queryset = queryset.order_by('-search_rank', *queryset.query.order_by)
+        return queryset
+
+    def get_schema_operation_parameters(self, view) -> list:
+        return [
+            {
+                'name': self.search_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Полнотекстовый поиск',
+                'schema': {'type': 'string'},
+            },
+        ]
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Callable, Iterable
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+from apps.core.profiling import timed_serializer
+
+# Поля, значение которых из .values() уже совпадает с результатом to_representation
+IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+Plan = list[tuple[str, Any, Callable | None]]
+
+
+class LeanSerializer:
+    """
+    Сериализация списка через queryset.values() без создания экземпляров моделей и полей на каждую строку.
+    План (поле ответа, выборка, преобразование) один раз строится по полям ModelSerializer,
+    поэтому JSON совпадает с ответом сериализатора, включая вложенные сериализаторы связей
+    """
+
+    def __init__(self, serializer_class: type[serializers.Serializer]):
+        self.serializer_class = serializer_class
+        self.plan = self._compile(serializer_class())
+        self.lookups = tuple(self._lookups(self.plan))
+
+    def _compile(self, serializer: serializers.Serializer, prefix: str = '') -> Plan:
+        plan = []
+        for field in serializer._readable_fields:
+            if isinstance(field, serializers.ListSerializer) or field.source == '*' or '.' in field.source:
+                raise ImproperlyConfigured(
+                    f'{self.serializer_class.__name__}.{field.field_name} is not supported by LeanSerializer'
+                )
+            if isinstance(field, serializers.BaseSerializer):
+                plan.append((field.field_name, self._compile(field, f'{prefix}{field.source}__'), None))
+            else:
+                convert = None if isinstance(field, IDENTITY_FIELDS) else field.to_representation
+                plan.append((field.field_name, prefix + field.source, convert))
+        return plan
+
+    def _lookups(self, plan: Plan) -> Iterable[str]:
+        for _, lookup, _ in plan:
+            if isinstance(lookup, list):
+                yield from self._lookups(lookup)
+            else:
+                yield lookup
+
+    def values(self, queryset: QuerySet) -> QuerySet:
+        """Выборка только нужных колонок, аннотации (например, ранг поиска для сортировки) сохраняются"""
+        return queryset.values(*self.lookups, *queryset.query.annotations)
+
+    def _render(self, row: dict, plan: Plan) -> dict:
+        data = {}
+        for name, lookup, convert in plan:
+            if isinstance(lookup, list):
+                nested = self._render(row, lookup)
+                # Пустая необязательная связь: все колонки NULL
+                data[name] = None if all(value is None for value in nested.values()) else nested
+                continue
+            value = row[lookup]
+            data[name] = convert(value) if convert is not None and value is not None else value
+        return data
+
+    def to_representation(self, rows: Iterable[dict]) -> list[dict]:
+        with timed_serializer():
+            return [self._render(row, self.plan) for row in rows]
+
+
+@lru_cache
+def get_lean_serializer(serializer_class: type[serializers.Serializer]) -> LeanSerializer:
+    return LeanSerializer(serializer_class)
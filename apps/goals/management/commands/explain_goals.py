@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import QuerySet
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.core.models import User
+from apps.goals import views
+
+LIST_VIEWS = (
+    ('goals/board/list', views.BoardListView),
+    ('goals/goal_category/list', views.GoalCategoryListView),
+    ('goals/goal/list', views.GoalListView),
+    ('goals/goal_comment/list', views.GoalCommentListView),
+)
+
+
+class Command(BaseCommand):
+    help = 'Вывод EXPLAIN ANALYZE для запросов списков досок, категорий, целей и комментариев'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('username', help='Пользователь, от имени которого строятся запросы')
+        parser.add_argument('--params', default='', help='Query string запроса, например "status=1&priority=4" или "due_date__lte=2026-12-31"')
+        parser.add_argument('--limit', type=int, default=50, help='Размер страницы')
+
+    def handle(self, *args, **options) -> None:
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["username"]}" does not exist')
+
+        for path, view_class in LIST_VIEWS:
+            queryset = self._get_queryset(view_class, f'/{path}?{options["params"]}', user)[:options['limit']]
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{view_class.__name__} ({path})'))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(analyze=True, buffers=True))
+            self.stdout.write('')
+
+    @staticmethod
+    def _get_queryset(view_class, url: str, user: User) -> QuerySet:
+        """Queryset списка так, как его строит представление: get_queryset + filter_backends"""
+        http_request = APIRequestFactory().get(url)
+        force_authenticate(http_request, user=user)
+        view = view_class()
+        view.setup(http_request)
+        view.request = view.initialize_request(http_request)
+        view.format_kwarg = None
+        return view.filter_queryset(view.get_queryset())
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from apps.goals.summary import rebuild_goal_counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчет счетчиков целей для сводки по доске по таблице целей'
+
+    def handle(self, *args, **options) -> None:
+        rebuild_goal_counters()
+        self.stdout.write(self.style.SUCCESS('Счетчики целей пересчитаны'))
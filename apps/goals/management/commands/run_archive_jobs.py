@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.goals.cascade import claimable, run_job
+from apps.goals.models import ArchiveJob
+
+
+class Command(BaseCommand):
+    help = 'Выполнение незавершенных задач архивирования (например, прерванных перезапуском воркера)'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно, проверяя новые задачи')
+        parser.add_argument('--interval', type=int, default=10, help='Пауза между проверками в секундах')
+        parser.add_argument('--failed', action='store_true', help='Повторить также задачи, завершившиеся ошибкой')
+
+    def handle(self, *args, **options) -> None:
+        while True:
+            jobs = ArchiveJob.objects.filter(claimable(options['failed'])).order_by('id')
+            for job_id in jobs.values_list('id', flat=True):
+                # Задачу мог взять поток веб-процесса или другой запуск команды
+                if (job := run_job(job_id, retry_failed=options['failed'])) is None:
+                    continue
+                self.stdout.write(f'Job {job.id}: {job.get_status_display()}, '
+                                  f'goals {job.goals_done}/{job.goals_total}, categories {job.categories_done}')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
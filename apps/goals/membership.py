@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.request import Request
+
+from apps.goals.models import BoardParticipant
+
+EDITOR_ROLES = (BoardParticipant.Role.owner, BoardParticipant.Role.writer)
+
+_REQUEST_ATTR = '_board_roles'
+_CACHE_KEY = 'goals:board_roles:{user_id}'
+
+
+def _cache_key(user_id: int) -> str:
+    return _CACHE_KEY.format(user_id=user_id)
+
+
+def _load_board_roles(user_id: int) -> dict[int, int]:
+    """Загрузка ролей пользователя на всех досках: {board_id: role}"""
+    timeout = settings.BOARD_ROLES_CACHE_TIMEOUT
+    if timeout:
+        roles = cache.get(_cache_key(user_id))
+        if roles is not None:
+            return roles
+    roles = dict(BoardParticipant.objects.filter(user_id=user_id).values_list('board_id', 'role'))
+    if timeout:
+        cache.set(_cache_key(user_id), roles, timeout)
+    return roles
+
+
+def get_board_roles(request: Request) -> dict[int, int]:
+    """Роли текущего пользователя на досках, загружаются один раз за запрос"""
+    http_request = getattr(request, '_request', request)
+    roles = getattr(http_request, _REQUEST_ATTR, None)
+    if roles is None:
+        roles = _load_board_roles(request.user.id) if request.user.is_authenticated else {}
+        setattr(http_request, _REQUEST_ATTR, roles)
+    return roles
+
+
+def has_board_role(request: Request, board_id: int, roles: Iterable[int] | None = None) -> bool:
+    """Проверка что пользователь участник доски (и при необходимости имеет одну из ролей)"""
+    role = get_board_roles(request).get(board_id)
+    if role is None:
+        return False
+    return roles is None or role in roles
+
+
+def invalidate_board_roles(*user_ids: int) -> None:
+    """Сброс межзапросного кеша ролей (вызывается при изменении участников досок)"""
+    if settings.BOARD_ROLES_CACHE_TIMEOUT:
+        cache.delete_many([_cache_key(user_id) for user_id in user_ids])
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+# Копирование одним запросом: bulk_create перезаписал бы created/updated через auto_now_add/auto_now.
+# Даты участника хранятся в строке его "фантомной" доски (board_ptr)
+COPY_PARTICIPANTS_SQL = '''
+INSERT INTO goals_boardmembership (board_id, user_id, role, created, updated)
+SELECT goals_boardparticipant.board_id, goals_boardparticipant.user_id, goals_boardparticipant.role,
+       goals_board.created, goals_board.updated
+FROM goals_boardparticipant JOIN goals_board ON goals_board.id = goals_boardparticipant.board_ptr_id
+ORDER BY goals_boardparticipant.board_ptr_id
+'''
+
+
+def move_participants(apps, schema_editor):
+    """
+    Перенос участников из наследника Board в отдельную таблицу и удаление "фантомных" досок,
+    которые создавались для каждой записи участника при multi-table inheritance
+    """
+    Board = apps.get_model('goals', 'Board')
+    BoardParticipant = apps.get_model('goals', 'BoardParticipant')
+
+    phantom_ids = list(BoardParticipant.objects.order_by('pk').values_list('pk', flat=True))
+    schema_editor.execute(COPY_PARTICIPANTS_SQL)
+
+    for start in range(0, len(phantom_ids), BATCH_SIZE):
+        # Фантомная доска удаляется вместе со старой записью участника (board_ptr, CASCADE).
+        # Доски, на которые кто-то ссылается как на настоящие, не трогаем
+        Board.objects.filter(
+            id__in=phantom_ids[start:start + BATCH_SIZE],
+            categories__isnull=True,
+            participants__isnull=True,
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals', '0008_added_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата последнего обновления')),
+                ('role', models.PositiveSmallIntegerField(choices=[(1, 'Владелец'), (2, 'Редактор'), (3, 'Читатель')], default=1, verbose_name='Роль')),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='goals.board', verbose_name='Доска')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'unique_together': {('board', 'user')},
+            },
+        ),
+        migrations.RunPython(move_participants),
+    ]
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals', '0009_create_board_membership'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='BoardParticipant',
+        ),
+        migrations.RenameModel(
+            old_name='BoardMembership',
+            new_name='BoardParticipant',
+        ),
+        migrations.AlterModelOptions(
+            name='boardparticipant',
+            options={'verbose_name': 'Участник', 'verbose_name_plural': 'Участники'},
+        ),
+        migrations.AlterField(
+            model_name='boardparticipant',
+            name='board',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='participants', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AlterField(
+            model_name='boardparticipant',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='participants', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.3 on 2026-10-18 14:20
+from __future__ import annotations
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+GOAL_VECTOR = (
+    "setweight(to_tsvector('pg_catalog.russian', coalesce({row}.title, '')), 'A') || "
+    "setweight(to_tsvector('pg_catalog.russian', coalesce({row}.description, '')), 'B')"
+)
+COMMENT_VECTOR = "to_tsvector('pg_catalog.russian', coalesce({row}.text, ''))"
+
+TRIGGER_SQL = '''
+CREATE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {vector};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER {table}_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update();
+
+UPDATE {table} SET search_vector = {backfill};
+'''
+
+DROP_TRIGGER_SQL = '''
+DROP TRIGGER {table}_search_vector_trigger ON {table};
+DROP FUNCTION {table}_search_vector_update();
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0011_added_goal_visibility_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='goalcomment',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='goal_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcomment',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='comment_search_vector_idx'),
+        ),
+        migrations.RunSQL(
+            sql=TRIGGER_SQL.format(table='goals_goal', vector=GOAL_VECTOR.format(row='NEW'),
+                                   backfill=GOAL_VECTOR.format(row='goals_goal')),
+            reverse_sql=DROP_TRIGGER_SQL.format(table='goals_goal'),
+        ),
+        migrations.RunSQL(
+            sql=TRIGGER_SQL.format(table='goals_goalcomment', vector=COMMENT_VECTOR.format(row='NEW'),
+                                   backfill=COMMENT_VECTOR.format(row='goals_goalcomment')),
+            reverse_sql=DROP_TRIGGER_SQL.format(table='goals_goalcomment'),
+        ),
+    ]
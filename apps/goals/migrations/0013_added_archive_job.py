@@ -0,0 +1,39 @@
+# Generated by Django 4.2.3 on 2026-10-18 14:27
+from __future__ import annotations
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals', '0012_added_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата последнего обновления')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Ожидает'), (2, 'Выполняется'), (3, 'Завершено'), (4, 'Ошибка')], default=1, verbose_name='Статус')),
+                ('goals_total', models.PositiveIntegerField(default=0, verbose_name='Всего целей')),
+                ('goals_done', models.PositiveIntegerField(default=0, verbose_name='Архивировано целей')),
+                ('categories_done', models.PositiveIntegerField(default=0, verbose_name='Удалено категорий')),
+                ('last_goal_id', models.BigIntegerField(default=0, verbose_name='Последняя обработанная цель')),
+                ('error', models.TextField(blank=True, default='', verbose_name='Ошибка')),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archive_jobs', to='goals.board', verbose_name='Доска')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='archive_jobs', to='goals.goalcategory', verbose_name='Категория')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archive_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+            options={
+                'verbose_name': 'Задача архивирования',
+                'verbose_name_plural': 'Задачи архивирования',
+                'indexes': [models.Index(condition=models.Q(('status__in', (1, 2))), fields=['status'], name='archive_job_active_idx')],
+            },
+        ),
+    ]
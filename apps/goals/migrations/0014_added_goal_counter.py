@@ -0,0 +1,82 @@
+# Generated by Django 4.2.3 on 2026-10-18 14:30
+from __future__ import annotations
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+TRIGGER_SQL = '''
+CREATE FUNCTION goals_goalcounter_apply(p_category bigint, p_status integer, p_priority integer, p_due_date date,
+                                        p_delta integer) RETURNS void AS $$
+BEGIN
+    UPDATE goals_goalcounter SET count = count + p_delta
+    WHERE ctid = (
+        SELECT ctid FROM goals_goalcounter
+        WHERE category_id = p_category AND status = p_status AND priority = p_priority
+          AND due_date IS NOT DISTINCT FROM p_due_date
+        LIMIT 1
+        FOR UPDATE
+    );
+    IF NOT FOUND THEN
+        INSERT INTO goals_goalcounter (category_id, status, priority, due_date, count)
+        VALUES (p_category, p_status, p_priority, p_due_date, p_delta);
+    END IF;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION goals_goal_counter_update() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.category_id = NEW.category_id AND OLD.status = NEW.status
+       AND OLD.priority = NEW.priority AND OLD.due_date IS NOT DISTINCT FROM NEW.due_date THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM goals_goalcounter_apply(OLD.category_id, OLD.status, OLD.priority, OLD.due_date, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM goals_goalcounter_apply(NEW.category_id, NEW.status, NEW.priority, NEW.due_date, 1);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goal_counter_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON goals_goal
+    FOR EACH ROW EXECUTE FUNCTION goals_goal_counter_update();
+
+INSERT INTO goals_goalcounter (category_id, status, priority, due_date, count)
+SELECT category_id, status, priority, due_date, count(*) FROM goals_goal
+GROUP BY category_id, status, priority, due_date;
+'''
+
+DROP_TRIGGER_SQL = '''
+DROP TRIGGER goals_goal_counter_trigger ON goals_goal;
+DROP FUNCTION goals_goal_counter_update();
+DROP FUNCTION goals_goalcounter_apply(bigint, integer, integer, date, integer);
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0013_added_archive_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoalCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'К выполнению'), (2, 'В процессе'), (3, 'Выполнено'), (4, 'Архив')], verbose_name='Статус')),
+                ('priority', models.PositiveSmallIntegerField(choices=[(1, 'Низкий'), (2, 'Средний'), (3, 'Высокий'), (4, 'Критичный')], verbose_name='Приоритет')),
+                ('due_date', models.DateField(blank=True, null=True, verbose_name='Дата выполнения')),
+                ('count', models.IntegerField(default=0, verbose_name='Количество целей')),
+                ('category', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='goal_counters', to='goals.goalcategory', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Счетчик целей',
+                'verbose_name_plural': 'Счетчики целей',
+                'indexes': [models.Index(fields=['category', 'status', 'priority', 'due_date'], name='goal_counter_key_idx')],
+            },
+        ),
+        migrations.RunSQL(sql=TRIGGER_SQL, reverse_sql=DROP_TRIGGER_SQL),
+    ]
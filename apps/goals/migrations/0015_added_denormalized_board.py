@@ -0,0 +1,96 @@
+# Generated by Django 4.2.3 on 2026-10-18 14:37
+from __future__ import annotations
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+BACKFILL_SQL = '''
+UPDATE goals_goal SET board_id = goals_goalcategory.board_id
+FROM goals_goalcategory WHERE goals_goalcategory.id = goals_goal.category_id;
+
+UPDATE goals_goalcomment SET board_id = goals_goal.board_id
+FROM goals_goal WHERE goals_goal.id = goals_goalcomment.goal_id;
+'''
+
+TRIGGER_SQL = '''
+CREATE FUNCTION goals_goal_set_board() RETURNS trigger AS $$
+BEGIN
+    SELECT board_id INTO NEW.board_id FROM goals_goalcategory WHERE id = NEW.category_id;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goal_set_board_trigger
+    BEFORE INSERT OR UPDATE OF category_id ON goals_goal
+    FOR EACH ROW EXECUTE FUNCTION goals_goal_set_board();
+
+CREATE FUNCTION goals_goalcomment_set_board() RETURNS trigger AS $$
+BEGIN
+    SELECT board_id INTO NEW.board_id FROM goals_goal WHERE id = NEW.goal_id;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goalcomment_set_board_trigger
+    BEFORE INSERT OR UPDATE OF goal_id ON goals_goalcomment
+    FOR EACH ROW EXECUTE FUNCTION goals_goalcomment_set_board();
+
+-- Перенос категории на другую доску меняет доску ее целей, смена доски цели - доску комментариев
+CREATE FUNCTION goals_goalcategory_board_changed() RETURNS trigger AS $$
+BEGIN
+    UPDATE goals_goal SET board_id = NEW.board_id WHERE category_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goalcategory_board_changed_trigger
+    AFTER UPDATE ON goals_goalcategory
+    FOR EACH ROW WHEN (OLD.board_id IS DISTINCT FROM NEW.board_id)
+    EXECUTE FUNCTION goals_goalcategory_board_changed();
+
+CREATE FUNCTION goals_goal_board_changed() RETURNS trigger AS $$
+BEGIN
+    UPDATE goals_goalcomment SET board_id = NEW.board_id WHERE goal_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goal_board_changed_trigger
+    AFTER UPDATE ON goals_goal
+    FOR EACH ROW WHEN (OLD.board_id IS DISTINCT FROM NEW.board_id)
+    EXECUTE FUNCTION goals_goal_board_changed();
+'''
+
+DROP_TRIGGER_SQL = '''
+DROP TRIGGER goals_goal_board_changed_trigger ON goals_goal;
+DROP FUNCTION goals_goal_board_changed();
+DROP TRIGGER goals_goalcategory_board_changed_trigger ON goals_goalcategory;
+DROP FUNCTION goals_goalcategory_board_changed();
+DROP TRIGGER goals_goalcomment_set_board_trigger ON goals_goalcomment;
+DROP FUNCTION goals_goalcomment_set_board();
+DROP TRIGGER goals_goal_set_board_trigger ON goals_goal;
+DROP FUNCTION goals_goal_set_board();
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0014_added_goal_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='board',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='goals', to='goals.board'),
+        ),
+        migrations.AddField(
+            model_name='goalcomment',
+            name='board',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='comments', to='goals.board'),
+        ),
+        # Заполнение до создания триггеров, чтобы не обновлять комментарии построчно
+        migrations.RunSQL(sql=BACKFILL_SQL, reverse_sql=migrations.RunSQL.noop),
+        migrations.RunSQL(sql=TRIGGER_SQL, reverse_sql=DROP_TRIGGER_SQL),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.3 on 2026-10-18 15:10
+from __future__ import annotations
+
+from django.db import migrations
+
+# Вектор пересчитывается только при изменении текстовых полей: массовые обновления статуса,
+# приоритета и архивирование не перестраивают tsvector
+RECREATE_TRIGGER_SQL = '''
+DROP TRIGGER {table}_search_vector_trigger ON {table};
+
+CREATE TRIGGER {table}_search_vector_trigger
+    BEFORE INSERT OR UPDATE {columns}ON {table}
+    FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update();
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0016_denormalized_board_not_null'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=RECREATE_TRIGGER_SQL.format(table='goals_goal', columns='OF title, description '),
+            reverse_sql=RECREATE_TRIGGER_SQL.format(table='goals_goal', columns=''),
+        ),
+        migrations.RunSQL(
+            sql=RECREATE_TRIGGER_SQL.format(table='goals_goalcomment', columns='OF text '),
+            reverse_sql=RECREATE_TRIGGER_SQL.format(table='goals_goalcomment', columns=''),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 4.2.3 on 2026-10-18 15:24
+from __future__ import annotations
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+initial = import_module('apps.goals.migrations.0014_added_goal_counter')
+
+# Срок убран из ключа счетчика: просроченные цели считаются запросом по индексу goal_active_due_date_idx.
+# Ключ уникальный, конкурентные вставки сходятся в одну строку через ON CONFLICT, нулевые строки удаляются
+TRIGGER_SQL = '''
+CREATE FUNCTION goals_goalcounter_apply(p_category bigint, p_status integer, p_priority integer,
+                                        p_delta integer) RETURNS void AS $$
+DECLARE
+    v_count integer;
+BEGIN
+    INSERT INTO goals_goalcounter (category_id, status, priority, count)
+    VALUES (p_category, p_status, p_priority, p_delta)
+    ON CONFLICT (category_id, status, priority) DO UPDATE SET count = goals_goalcounter.count + EXCLUDED.count
+    RETURNING count INTO v_count;
+    IF v_count = 0 THEN
+        DELETE FROM goals_goalcounter
+        WHERE category_id = p_category AND status = p_status AND priority = p_priority AND count = 0;
+    END IF;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION goals_goal_counter_update() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.category_id = NEW.category_id AND OLD.status = NEW.status
+       AND OLD.priority = NEW.priority THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM goals_goalcounter_apply(OLD.category_id, OLD.status, OLD.priority, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM goals_goalcounter_apply(NEW.category_id, NEW.status, NEW.priority, 1);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goal_counter_trigger
+    AFTER INSERT OR UPDATE OF category_id, status, priority OR DELETE ON goals_goal
+    FOR EACH ROW EXECUTE FUNCTION goals_goal_counter_update();
+
+INSERT INTO goals_goalcounter (category_id, status, priority, count)
+SELECT category_id, status, priority, count(*) FROM goals_goal
+GROUP BY category_id, status, priority;
+'''
+
+DROP_TRIGGER_SQL = '''
+DROP TRIGGER goals_goal_counter_trigger ON goals_goal;
+DROP FUNCTION goals_goal_counter_update();
+DROP FUNCTION goals_goalcounter_apply(bigint, integer, integer, integer);
+DELETE FROM goals_goalcounter;
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0017_search_vector_trigger_columns'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=initial.DROP_TRIGGER_SQL + 'DELETE FROM goals_goalcounter;',
+            reverse_sql=initial.TRIGGER_SQL,
+        ),
+        migrations.RemoveIndex(
+            model_name='goalcounter',
+            name='goal_counter_key_idx',
+        ),
+        migrations.RemoveField(
+            model_name='goalcounter',
+            name='due_date',
+        ),
+        migrations.AddConstraint(
+            model_name='goalcounter',
+            constraint=models.UniqueConstraint(fields=('category', 'status', 'priority'), name='goal_counter_key'),
+        ),
+        migrations.RunSQL(sql=TRIGGER_SQL, reverse_sql=DROP_TRIGGER_SQL),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.3 on 2026-10-18 15:52
+from __future__ import annotations
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0018_goal_counter_unique_key'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='goal',
+            name='goal_active_category_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='goal',
+            name='goal_active_due_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4), _negated=True), fields=['board', 'status', 'priority'], name='goal_active_board_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(condition=models.Q(models.Q(('status', 4), _negated=True), ('due_date__isnull', False)), fields=['board', 'due_date'], name='goal_active_board_due_date_idx'),
+        ),
+    ]
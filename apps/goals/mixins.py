@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max, QuerySet
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from apps.core import metrics
+from apps.goals import response_cache
+from apps.goals.lean import get_lean_serializer
+from apps.goals.membership import get_board_roles
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET-запросы (If-None-Match / If-Modified-Since) для списков и детальных представлений.
+    Валидатор списка - ETag по количеству и max(updated) видимых пользователю строк (один агрегатный запрос),
+    детального представления - ETag и Last-Modified по updated объекта. При совпадении отдается 304 без сериализации.
+    Last-Modified для списка не отдается: строка может пропасть из списка без изменения max(updated)
+    (удаление категории), и If-Modified-Since вернул бы устаревший список
+    """
+    last_modified_field = 'updated'
+
+    def get_etag(self, request: Request, *parts) -> str:
+        key = ':'.join(str(part) for part in (request.user.id, request.get_full_path(), *parts))
+        return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+    def list_validators(self, request: Request, queryset: QuerySet) -> tuple[str, None]:
+        return self._list_validators(request, queryset.order_by().aggregate(**self._list_state()))
+
+    async def alist_validators(self, request: Request, queryset: QuerySet) -> tuple[str, None]:
+        return self._list_validators(request, await queryset.order_by().aaggregate(**self._list_state()))
+
+    def _list_state(self) -> dict:
+        return {'last_modified': Max(self.last_modified_field), 'count': Count('pk')}
+
+    def _list_validators(self, request: Request, state: dict) -> tuple[str, None]:
+        last_modified = state['last_modified']
+        return self.get_etag(request, state['count'], last_modified and last_modified.isoformat()), None
+
+    def object_validators(self, request: Request, instance) -> tuple[str, datetime | None]:
+        last_modified = getattr(instance, self.last_modified_field)
+        return self.get_etag(request, instance.pk, last_modified.isoformat()), last_modified
+
+    def not_modified(self, request: Request, etag: str, last_modified: datetime | None) -> HttpResponseBase | None:
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+    @staticmethod
+    def set_validators(response: HttpResponseBase, etag: str, last_modified: datetime | None) -> HttpResponseBase:
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        # Ответ зависит от пользователя, клиент должен проверять актуальность при каждом запросе
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
+
+    def list(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        etag, last_modified = self.list_validators(request, self.filter_queryset(self.get_queryset()))
+        if response := self.not_modified(request, etag, last_modified):
+            return self.set_validators(response, etag, last_modified)
+        return self.set_validators(super().list(request, *args, **kwargs), etag, last_modified)
+
+    def retrieve(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        instance = self.get_object()
+        etag, last_modified = self.object_validators(request, instance)
+        if response := self.not_modified(request, etag, last_modified):
+            return self.set_validators(response, etag, last_modified)
+        return self.set_validators(Response(self.get_serializer(instance).data), etag, last_modified)
+
+
+class CachedListMixin:
+    """
+    Кеш ответов списка по пользователю, параметрам запроса и версиям его досок (GOALS_LIST_CACHE).
+    Любая запись на доске меняет ее версию, и старые ответы больше не используются.
+    При попадании условный запрос проверяется по сохраненному ETag без обращения к БД
+    """
+    cached_headers = ('ETag', 'Last-Modified', 'Cache-Control', 'Vary')
+
+    def list(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        cache = response_cache.get_response_cache()
+        if cache is None:
+            return super().list(request, *args, **kwargs)
+
+        key = self.cache_key(request, response_cache.get_board_versions(get_board_roles(request)))
+        if (entry := cache.get(key)) is not None:
+            return self.cached_response(request, entry)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, self.cache_entry(response), settings.GOALS_LIST_CACHE_TIMEOUT)
+        return self.cache_miss(response)
+
+    def cache_key(self, request: Request, versions: dict[int, int]) -> str:
+        return response_cache.make_key(type(self).__name__, request.user.id, request.get_full_path(), versions)
+
+    def cache_entry(self, response: HttpResponseBase) -> dict:
+        headers = {name: response[name] for name in self.cached_headers if response.has_header(name)}
+        return {'data': response.data, 'headers': headers}
+
+    def cache_miss(self, response: HttpResponseBase) -> HttpResponseBase:
+        metrics.LIST_CACHE_REQUESTS.labels(view=type(self).__name__, result='miss').inc()
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def cached_response(self, request: Request, entry: dict) -> HttpResponseBase:
+        metrics.LIST_CACHE_REQUESTS.labels(view=type(self).__name__, result='hit').inc()
+        headers = entry['headers']
+        response = None
+        if etag := headers.get('ETag'):
+            last_modified = parse_http_date_safe(headers.get('Last-Modified', ''))
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        response = response or Response(entry['data'])
+        for name, value in headers.items():
+            response[name] = value
+        response['X-Cache'] = 'HIT'
+        return response
+
+
+class LeanListMixin:
+    """
+    Список сериализуется через LeanSerializer по serializer_class представления:
+    выборка .values() только нужных колонок без экземпляров моделей, JSON тот же (GOALS_LEAN_LISTS)
+    """
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        if not settings.GOALS_LEAN_LISTS:
+            return super().list(request, *args, **kwargs)
+
+        serializer = get_lean_serializer(self.get_serializer_class())
+        queryset = serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+        return Response(serializer.to_representation(queryset))
+
+
+class AsyncListMixin:
+    """
+    Асинхронный GET списка для режима ASGI (GOALS_ASYNC_LISTS).
+    Аутентификация, права, роли и queryset с фильтрами строятся одним переходом в синхронный поток
+    (SessionAuthentication и фильтры django-filter обращаются к БД синхронно), дальше - async ORM:
+    агрегат условного GET, количество и строки страницы через .values() и LeanSerializer.
+    Кеш ответов и условный GET работают так же, как в синхронном представлении
+    """
+    list_queryset: QuerySet | None = None
+
+    async def dispatch(self, request, *args, **kwargs) -> HttpResponseBase:
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    def initial(self, request: Request, *args, **kwargs) -> None:
+        super().initial(request, *args, **kwargs)
+        if request.method in ('GET', 'HEAD'):
+            if isinstance(self, CachedListMixin):
+                get_board_roles(request)
+            self.list_queryset = self.filter_queryset(self.get_queryset())
+
+    async def get(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        cache = response_cache.get_response_cache() if isinstance(self, CachedListMixin) else None
+        if cache is not None:
+            key = self.cache_key(request, await response_cache.aget_board_versions(get_board_roles(request)))
+            if (entry := await cache.aget(key)) is not None:
+                return self.cached_response(request, entry)
+
+        validators = None
+        if isinstance(self, ConditionalGetMixin):
+            validators = await self.alist_validators(request, self.list_queryset)
+            if response := self.not_modified(request, *validators):
+                return self.set_validators(response, *validators)
+
+        response = await self.alist(self.list_queryset)
+        if validators is not None:
+            self.set_validators(response, *validators)
+        if cache is not None:
+            if response.status_code == 200:
+                await cache.aset(key, self.cache_entry(response), settings.GOALS_LIST_CACHE_TIMEOUT)
+            response = self.cache_miss(response)
+        return response
+
+    async def alist(self, queryset: QuerySet) -> Response:
+        serializer = get_lean_serializer(self.get_serializer_class())
+        queryset = serializer.values(queryset)
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+        return Response(serializer.to_representation([row async for row in queryset]))
+
+    async def apaginate_queryset(self, queryset: QuerySet) -> list | None:
+        paginator = self.paginator
+        if paginator is None:
+            return None
+        if hasattr(paginator, 'apaginate_queryset'):
+            return await paginator.apaginate_queryset(queryset, self.request, view=self)
+        return await sync_to_async(paginator.paginate_queryset)(queryset, self.request, view=self)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from apps.core.models import User
@@ -13,6 +15,16 @@ class BaseModel(models.Model):
         abstract = True
 
 
+class LoadedBoardMixin:
+    """Доска, с которой объект загружен из БД: при переносе на другую доску меняются версии обеих"""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_board_id = instance.__dict__.get('board_id')
+        return instance
+
+
 class Board(BaseModel):
     class Meta:
         verbose_name = 'Доска'
@@ -25,11 +37,15 @@ class Board(BaseModel):
         return self.title
 
 
-class BoardParticipant(Board):
+class BoardParticipant(LoadedBoardMixin, BaseModel):
     class Meta:
         unique_together = ('board', 'user')
         verbose_name = 'Участник'
         verbose_name_plural = 'Участники'
+        indexes = [
+            # Роли пользователя по всем доскам читаются index-only scan
+            models.Index(fields=('user', 'board', 'role'), name='participant_user_board_idx'),
+        ]
 
     class Role(models.IntegerChoices):
         owner = 1, 'Владелец'
@@ -44,11 +60,19 @@ class BoardParticipant(Board):
         return f'{self.user}'
 
 
-class GoalCategory(BaseModel):
+class GoalCategory(LoadedBoardMixin, BaseModel):
 
     class Meta:
         verbose_name = 'Категория'
         verbose_name_plural = 'Категории'
+        indexes = [
+            # Ключи keyset-пагинации списка категорий
+            models.Index(fields=('title', 'id'), name='category_title_id_idx'),
+            models.Index(fields=('created', 'id'), name='category_created_id_idx'),
+            # Видимые категории доски
+            models.Index(fields=('board', 'title'), name='category_active_board_idx',
+                         condition=models.Q(is_deleted=False)),
+        ]
 
     board = models.ForeignKey(Board, verbose_name='Доска', on_delete=models.PROTECT, related_name='categories')
     title = models.CharField(verbose_name='Название', max_length=255)
@@ -59,7 +83,7 @@ class GoalCategory(BaseModel):
         return self.title
 
 
-class Goal(BaseModel):
+class Goal(LoadedBoardMixin, BaseModel):
     class Status(models.IntegerChoices):
         to_do = 1, 'К выполнению'
         in_progress = 2, 'В процессе'
@@ -75,25 +99,117 @@ class Goal(BaseModel):
     title = models.CharField(max_length=255)
     description = models.TextField(null=True, blank=True)
     category = models.ForeignKey(GoalCategory, on_delete=models.PROTECT, related_name='goals')
+    # Доска категории, поддерживается триггерами БД (в т.ч. при смене категории или доски категории)
+    board = models.ForeignKey(Board, on_delete=models.PROTECT, related_name='goals', editable=False)
     due_date = models.DateField(null=True, blank=True)
     user = models.ForeignKey(User, on_delete=models.PROTECT, related_name='goals')
     status = models.PositiveSmallIntegerField(choices=Status.choices, default=Status.to_do)
     priority = models.PositiveSmallIntegerField(choices=Priority.choices, default=Priority.medium)
+    # Заполняется триггером БД из title (вес A) и description (вес B)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         verbose_name = 'Цель'
         verbose_name_plural = 'Цели'
+        indexes = [
+            # Ключи keyset-пагинации списка целей
+            models.Index(fields=('title', 'id'), name='goal_title_id_idx'),
+            models.Index(fields=('created', 'id'), name='goal_created_id_idx'),
+            # Видимые (не архивные, status != 4) цели досок пользователя (board_id IN (...)) и фильтры GoalDateFilter
+            models.Index(fields=('board', 'status', 'priority'), name='goal_active_board_idx',
+                         condition=~models.Q(status=4)),
+            models.Index(fields=('board', 'due_date'), name='goal_active_board_due_date_idx',
+                         condition=~models.Q(status=4) & models.Q(due_date__isnull=False)),
+            GinIndex(fields=('search_vector',), name='goal_search_vector_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs) -> None:
+        """Доска в памяти совпадает с той, что запишет триггер"""
+        if self.board_id is None or self._meta.get_field('category').is_cached(self):
+            self.board_id = self.category.board_id
+        super().save(*args, **kwargs)
+
 
-class GoalComment(BaseModel):
+class GoalComment(LoadedBoardMixin, BaseModel):
 
     text = models.TextField(null=True, blank=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comment')
     goal = models.ForeignKey(Goal, on_delete=models.CASCADE, related_name='comment')
+    # Доска цели, поддерживается триггерами БД
+    board = models.ForeignKey(Board, on_delete=models.PROTECT, related_name='comments', editable=False)
+    # Заполняется триггером БД из text
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            # Ключ keyset-пагинации списка комментариев (сортировка -created)
+            models.Index(fields=('goal', '-created', '-id'), name='comment_goal_created_id_idx'),
+            models.Index(fields=('-created', '-id'), name='comment_created_id_idx'),
+            GinIndex(fields=('search_vector',), name='comment_search_vector_idx'),
+        ]
+
+    def save(self, *args, **kwargs) -> None:
+        """Доска в памяти совпадает с той, что запишет триггер"""
+        if self.board_id is None or self._meta.get_field('goal').is_cached(self):
+            self.board_id = self.goal.board_id
+        super().save(*args, **kwargs)
+
+
+class ArchiveJob(BaseModel):
+    """Фоновое архивирование категорий и целей удаленной доски или категории"""
+    class Status(models.IntegerChoices):
+        pending = 1, 'Ожидает'
+        running = 2, 'Выполняется'
+        done = 3, 'Завершено'
+        failed = 4, 'Ошибка'
+
+    board = models.ForeignKey(Board, verbose_name='Доска', on_delete=models.PROTECT, related_name='archive_jobs')
+    category = models.ForeignKey(GoalCategory, verbose_name='Категория', on_delete=models.PROTECT,
+                                 related_name='archive_jobs', null=True, blank=True)
+    user = models.ForeignKey(User, verbose_name='Автор', on_delete=models.PROTECT, related_name='archive_jobs')
+    status = models.PositiveSmallIntegerField(verbose_name='Статус', choices=Status.choices, default=Status.pending)
+    goals_total = models.PositiveIntegerField(verbose_name='Всего целей', default=0)
+    goals_done = models.PositiveIntegerField(verbose_name='Архивировано целей', default=0)
+    categories_done = models.PositiveIntegerField(verbose_name='Удалено категорий', default=0)
+    last_goal_id = models.BigIntegerField(verbose_name='Последняя обработанная цель', default=0)
+    error = models.TextField(verbose_name='Ошибка', blank=True, default='')
+
+    class Meta:
+        verbose_name = 'Задача архивирования'
+        verbose_name_plural = 'Задачи архивирования'
+        indexes = [
+            models.Index(fields=('status',), name='archive_job_active_idx',
+                         condition=models.Q(status__in=(1, 2))),
+        ]
+
+    def __str__(self):
+        return f'{self.board} ({self.get_status_display()})'
+
+
+class GoalCounter(models.Model):
+    """
+    Количество целей категории с одинаковыми статусом и приоритетом.
+    Поддерживается триггером БД при любом изменении целей (в т.ч. bulk-операциях и update()):
+    вставка через ON CONFLICT по уникальному ключу, строки с нулевым количеством удаляются
+    """
+    category = models.ForeignKey(GoalCategory, verbose_name='Категория', on_delete=models.CASCADE,
+                                 related_name='goal_counters', db_index=False)
+    status = models.PositiveSmallIntegerField(verbose_name='Статус', choices=Goal.Status.choices)
+    priority = models.PositiveSmallIntegerField(verbose_name='Приоритет', choices=Goal.Priority.choices)
+    count = models.IntegerField(verbose_name='Количество целей', default=0)
+
+    class Meta:
+        verbose_name = 'Счетчик целей'
+        verbose_name_plural = 'Счетчики целей'
+        constraints = [
+            # Заменяет индекс внешнего ключа category
+            models.UniqueConstraint(fields=('category', 'status', 'priority'), name='goal_counter_key'),
+        ]
+
+    def __str__(self):
+        return f'{self.category_id}: {self.count}'
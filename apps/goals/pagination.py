@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+class KeysetPagination(CursorPagination):
+    """Keyset-пагинация по полям сортировки представления (без OFFSET по всей выборке)"""
+    page_size = 50
+    page_size_query_param = 'limit'
+    max_page_size = 1000
+    ordering = '-created'
+
+    def get_ordering(self, request: Request, queryset: QuerySet, view) -> tuple[str, ...]:
+        """Добавляем id в конец сортировки, чтобы порядок строк с одинаковым ключом был стабильным"""
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+        return ordering
+
+
+class LimitOffsetOrKeysetPagination(LimitOffsetPagination):
+    """
+    LimitOffset по умолчанию, keyset-пагинация по запросу клиента:
+    ?pagination=cursor для первой страницы, далее по ссылкам next/previous с параметром cursor
+    """
+    mode_query_param = 'pagination'
+    keyset_mode = 'cursor'
+    keyset_pagination_class = KeysetPagination
+
+    keyset_paginator: KeysetPagination | None = None
+
+    def use_keyset(self, request: Request) -> bool:
+        if request.query_params.get(self.mode_query_param) == self.keyset_mode:
+            return True
+        return self.keyset_pagination_class.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view=None) -> list | None:
+        if self.use_keyset(request):
+            self.keyset_paginator = self.keyset_pagination_class()
+            return self.keyset_paginator.paginate_queryset(queryset, request, view)
+        self.keyset_paginator = None
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset: QuerySet, request: Request, view=None) -> list | None:
+        """Асинхронный вариант: limit/offset через async ORM, keyset - синхронная пагинация в потоке"""
+        if self.use_keyset(request):
+            return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+        self.keyset_paginator = None
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [row async for row in queryset[self.offset:self.offset + self.limit]]
+
+    def get_paginated_response(self, data) -> Response:
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view) -> list:
+        parameters = super().get_schema_operation_parameters(view)
+        return parameters + [
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Режим пагинации: "cursor" включает keyset-пагинацию',
+                'schema': {'type': 'string', 'enum': [self.keyset_mode]},
+            },
+            *(parameter for parameter in self.keyset_pagination_class().get_schema_operation_parameters(view)
+              if parameter['name'] != self.limit_query_param),
+        ]
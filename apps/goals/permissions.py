@@ -1,30 +1,26 @@
 from __future__ import annotations
 
-from typing import Any
-
 from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.request import Request
 
+from apps.goals.membership import EDITOR_ROLES, has_board_role
 from apps.goals.models import Board, BoardParticipant, Goal, GoalCategory
 
 
 class BoardPermission(IsAuthenticated):
 
     def has_object_permission(self, request: Request, view, obj: Board) -> bool:
-        _filters: dict[str: Any] = {'user_id': request.user.id, 'board_id': obj.id}
         if request.method not in SAFE_METHODS:
-            _filters['role'] = BoardParticipant.Role.owner
-        return BoardParticipant.objects.filter(**_filters).exists()
+            return has_board_role(request, obj.id, (BoardParticipant.Role.owner,))
+        return has_board_role(request, obj.id)
 
 
 class GoalCategoryPermission(IsAuthenticated):
 
     def has_object_permission(self, request: Request, view, goal_category: GoalCategory) -> bool:
         """Permission автор или редактор доски"""
-        _filters: dict[str: Any] = {'user_id': request.user.id, 'board_id': goal_category.board_id}
         if request.method not in SAFE_METHODS:
-            return BoardParticipant.objects.filter(**_filters, role__in=(BoardParticipant.Role.owner,
-                                                                         BoardParticipant.Role.writer)).exists()
+            return has_board_role(request, goal_category.board_id, EDITOR_ROLES)
         return True
 
 
@@ -32,8 +28,6 @@ class GoalPermission(IsAuthenticated):
 
     def has_object_permission(self, request: Request, view, goal: Goal) -> bool:
         """Permission автор или редактор доски"""
-        _filters: dict[str: Any] = {'user_id': request.user.id, 'board_id': goal.category.board.id}
         if request.method not in SAFE_METHODS:
-            return BoardParticipant.objects.filter(**_filters, role__in=(BoardParticipant.Role.owner,
-                                                                         BoardParticipant.Role.writer)).exists()
+            return has_board_role(request, goal.board_id, EDITOR_ROLES)
         return True
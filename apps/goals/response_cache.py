@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+
+_VERSION_KEY = 'goals:board_version:{board_id}'
+
+
+def is_enabled() -> bool:
+    return bool(settings.GOALS_LIST_CACHE)
+
+
+def get_response_cache() -> BaseCache | None:
+    """Бэкенд кеша ответов (алиас из CACHES), None если кеш отключен"""
+    return caches[settings.GOALS_LIST_CACHE] if is_enabled() else None
+
+
+def _version_cache() -> BaseCache:
+    return caches[settings.GOALS_BOARD_VERSION_CACHE]
+
+
+def get_board_versions(board_ids: Iterable[int]) -> dict[int, int]:
+    """
+    Текущие версии досок одним обращением к кешу. Отсутствующая версия создается из текущего времени,
+    поэтому вытесненный ключ не может вернуть версию, под которой уже сохранены устаревшие ответы
+    """
+    keys = {_VERSION_KEY.format(board_id=board_id): board_id for board_id in board_ids}
+    found = _version_cache().get_many(keys)
+    if missing := keys.keys() - found.keys():
+        version = time.time_ns()
+        _version_cache().set_many(dict.fromkeys(missing, version), timeout=None)
+        found.update(dict.fromkeys(missing, version))
+    return {keys[key]: version for key, version in found.items()}
+
+
+async def aget_board_versions(board_ids: Iterable[int]) -> dict[int, int]:
+    """Асинхронный вариант get_board_versions"""
+    keys = {_VERSION_KEY.format(board_id=board_id): board_id for board_id in board_ids}
+    found = await _version_cache().aget_many(keys)
+    if missing := keys.keys() - found.keys():
+        version = time.time_ns()
+        await _version_cache().aset_many(dict.fromkeys(missing, version), timeout=None)
+        found.update(dict.fromkeys(missing, version))
+    return {keys[key]: version for key, version in found.items()}
+
+
+def bump_board_version(*board_ids: int) -> None:
+    """Смена версии досок после фиксации транзакции: закешированные ответы по ним перестают использоваться"""
+    if not is_enabled() or not board_ids:
+        return
+    keys = {_VERSION_KEY.format(board_id=board_id) for board_id in board_ids}
+    transaction.on_commit(lambda: _version_cache().set_many(dict.fromkeys(keys, time.time_ns()), timeout=None))
+
+
+def make_key(view: str, user_id: int, path: str, versions: dict[int, int]) -> str:
+    """Ключ ответа: представление, пользователь, параметры запроса и версии всех его досок"""
+    raw = ':'.join((view, str(user_id), path, *(f'{board}.{version}' for board, version in sorted(versions.items()))))
+    return f'goals:response:{hashlib.md5(raw.encode()).hexdigest()}'
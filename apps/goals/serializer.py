@@ -2,13 +2,17 @@ from __future__ import annotations
 
 import logging
 
+from django.conf import settings
 from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.exceptions import PermissionDenied, ValidationError
 
 from apps.core.models import User
 from apps.core.serializer import ProfileSerializer
-from apps.goals.models import Board, BoardParticipant, Goal, GoalCategory, GoalComment
+from apps.goals.membership import EDITOR_ROLES, has_board_role, invalidate_board_roles
+from apps.goals.models import ArchiveJob, Board, BoardParticipant, Goal, GoalCategory, GoalComment
 
 logger = logging.getLogger('main')
 
@@ -45,39 +49,57 @@ class BoardSerializer(serializers.ModelSerializer):
         """Добавление новых участников и изменение названия доски """
         participants_data = validated_data.pop('participants', None)
         owner_id = self.context['request'].user.id
-        if participants_data:
-            new_participants = {part['user'].id: part for part in participants_data}
-            with transaction.atomic():
-                for old_participant in instance.participants.exclude(user=owner_id):
-                    if old_participant.user_id not in new_participants:
-                        old_participant.delete()
-                    else:
-                        new_part = new_participants[old_participant.user_id]
-                        if old_participant.role != new_part['role']:
-                            old_participant.role = new_part['role']
-                            old_participant.save()
-                        new_participants.pop(old_participant.user_id)
-
-                for new_part in new_participants.values():
-                    BoardParticipant.objects.create(
-                        board=instance,
-                        user=new_part['user'],
-                        role=new_part['role']
-                    )
-
-        else:
-            BoardParticipant.objects.filter(board=instance).delete()
-            BoardParticipant.objects.update_or_create(board=instance,
-                                                      user=self.context['request'].user,
-                                                      role=1)
-
-        if title := validated_data.get('title'):
-            instance.title = title
-
-        instance.save()
+        with transaction.atomic():
+            self._sync_participants(instance, owner_id, participants_data or [])
+            if not participants_data:
+                BoardParticipant.objects.update_or_create(board=instance, user_id=owner_id,
+                                                          defaults={'role': BoardParticipant.Role.owner})
+
+            if title := validated_data.get('title'):
+                instance.title = title
+
+            instance.save()
 
         return instance
 
+    def to_representation(self, instance: Board) -> dict:
+        """После изменения DRF сбрасывает prefetch: участники с пользователями загружаются заново двумя запросами"""
+        prefetch_related_objects([instance], 'participants__user')
+        return super().to_representation(instance)
+
+    @staticmethod
+    def _sync_participants(board: Board, owner_id: int, participants_data: list[dict]) -> None:
+        """
+        Приведение участников доски (кроме владельца) к переданному списку:
+        разница считается в памяти и применяется одним delete, bulk_update и bulk_create
+        """
+        new_roles = {part['user'].id: part['role'] for part in participants_data if part['user'].id != owner_id}
+        old_participants = {
+            participant.user_id: participant
+            for participant in BoardParticipant.objects.filter(board=board).exclude(user_id=owner_id)
+        }
+
+        now = timezone.now()
+        changed = []
+        for user_id, participant in old_participants.items():
+            if user_id in new_roles and participant.role != new_roles[user_id]:
+                participant.role = new_roles[user_id]
+                participant.updated = now
+                changed.append(participant)
+        created = [
+            BoardParticipant(board=board, user_id=user_id, role=role)
+            for user_id, role in new_roles.items() if user_id not in old_participants
+        ]
+
+        if removed := old_participants.keys() - new_roles.keys():
+            BoardParticipant.objects.filter(board=board, user_id__in=removed).delete()
+        if changed:
+            BoardParticipant.objects.bulk_update(changed, fields=('role', 'updated'))
+        if created:
+            BoardParticipant.objects.bulk_create(created)
+        # bulk-операции не отправляют сигналы, сбрасываем кеш ролей явно
+        invalidate_board_roles(*(participant.user_id for participant in changed + created))
+
 
 class BoardListSerializer(serializers.ModelSerializer):
     """Сериализатор списка досок пользователя"""
@@ -94,11 +116,7 @@ class GoalCategoryCreateSerializer(serializers.ModelSerializer):
         """Валидация на создание категории только для не удаленных досок и на то что юзер автор или редактор доски"""
         if board.is_deleted:
             raise serializers.ValidationError('board is delete')
-        if not BoardParticipant.objects.filter(
-                board_id=board.id,
-                user_id=self.context['request'].user.id,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer]
-        ).exists():
+        if not has_board_role(self.context['request'], board.id, EDITOR_ROLES):
             raise PermissionDenied
         return board
 
@@ -124,7 +142,7 @@ class GoalCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Goal
-        fields = '__all__'
+        exclude = ('search_vector', 'board')
         read_only_fields = ('id', 'created', 'updated', 'user')
 
     def validate_category(self, category: GoalCategory) -> GoalCategory:
@@ -132,11 +150,7 @@ class GoalCreateSerializer(serializers.ModelSerializer):
         if category.is_deleted:
             raise serializers.ValidationError('not allowed in deleted category')
 
-        if not BoardParticipant.objects.filter(
-                board_id=category.board_id,
-                user_id=self.context['request'].user.id,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer]
-        ).exists():
+        if not has_board_role(self.context['request'], category.board_id, EDITOR_ROLES):
             raise PermissionDenied
 
         return category
@@ -149,7 +163,7 @@ class GoalSerializer(serializers.ModelSerializer):
     class Meta:
         model = Goal
         read_only_fields = ('id', 'created', 'updated', 'user')
-        fields = '__all__'
+        exclude = ('search_vector', 'board')
 
     def validate_category(self, value: GoalCategory) -> GoalCategory:
         if value.is_deleted:
@@ -161,6 +175,49 @@ class GoalSerializer(serializers.ModelSerializer):
         return value
 
 
+class GoalBatchCreateItemSerializer(serializers.ModelSerializer):
+    """Цель пакетного создания, категория и права проверяются для всего пакета сразу"""
+    category = serializers.IntegerField()
+
+    class Meta:
+        model = Goal
+        fields = ('title', 'description', 'category', 'due_date', 'status', 'priority')
+
+
+class GoalBatchUpdateItemSerializer(serializers.Serializer):
+    """Изменение статуса и приоритета цели в пакете"""
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=Goal.Status.choices[:-1], required=False)
+    priority = serializers.ChoiceField(choices=Goal.Priority.choices, required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        if 'status' not in attrs and 'priority' not in attrs:
+            raise ValidationError('status or priority is required')
+        return attrs
+
+
+def validate_batch_size(items: list) -> list:
+    if len(items) > settings.GOALS_BATCH_MAX_SIZE:
+        raise ValidationError(f'Ensure this field has no more than {settings.GOALS_BATCH_MAX_SIZE} elements.')
+    return items
+
+
+class GoalBatchCreateSerializer(serializers.Serializer):
+    """Сериализатор пакетного создания целей"""
+    goals = serializers.ListField(child=serializers.DictField(), allow_empty=False, validators=[validate_batch_size])
+
+
+class GoalBatchUpdateSerializer(serializers.Serializer):
+    """Сериализатор пакетного изменения статуса и приоритета целей"""
+    goals = serializers.ListField(child=serializers.DictField(), allow_empty=False, validators=[validate_batch_size])
+
+
+class GoalBatchArchiveSerializer(serializers.Serializer):
+    """Сериализатор пакетного архивирования целей"""
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False,
+                                validators=[validate_batch_size])
+
+
 class CommentCreateSerializer(serializers.ModelSerializer):
     """Сериализатор для создания комментариев"""
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
@@ -173,13 +230,7 @@ class CommentCreateSerializer(serializers.ModelSerializer):
     def validate_goal(self, value: Goal) -> Goal:
         if value.status == Goal.Status.archived:
             raise ValidationError('Goal not found')
-        if not BoardParticipant.objects.filter(
-                board_id=value.category.board_id,
-                role__in=[
-                    BoardParticipant.Role.owner, BoardParticipant.Role.writer
-                ],
-                user=self.context['request'].user,
-        ).exists():
+        if not has_board_role(self.context['request'], value.board_id, EDITOR_ROLES):
             raise PermissionDenied
         return value
 
@@ -189,10 +240,19 @@ class CommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = GoalComment
-        fields = '__all__'
+        exclude = ('search_vector', 'board')
         read_only_fields = ('id', 'created', 'updated', 'goal', 'user')
 
     def validate_comment(self, value: GoalComment) -> GoalComment:
         if value.user != self.context['request'].user:
             raise PermissionDenied
         return value
+
+
+class ArchiveJobSerializer(serializers.ModelSerializer):
+    """Сериализатор прогресса фонового архивирования доски или категории"""
+    class Meta:
+        model = ArchiveJob
+        fields = ('id', 'board', 'category', 'status', 'goals_total', 'goals_done', 'categories_done', 'error',
+                  'created', 'updated')
+        read_only_fields = fields
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.goals.membership import invalidate_board_roles
+from apps.goals.models import Board, BoardParticipant, Goal, GoalCategory, GoalComment
+from apps.goals.response_cache import bump_board_version, is_enabled
+
+
+@receiver([post_save, post_delete], sender=BoardParticipant)
+def reset_board_roles(sender, instance: BoardParticipant, **kwargs) -> None:
+    """Сброс кеша ролей участника при изменении состава доски"""
+    invalidate_board_roles(instance.user_id)
+
+
+def _board_ids(instance: Board | BoardParticipant | GoalCategory | Goal | GoalComment) -> set[int]:
+    """Текущая доска объекта и доска, с которой он загружен (при переносе категории или цели)"""
+    if isinstance(instance, Board):
+        return {instance.id}
+    return {instance.board_id, getattr(instance, 'loaded_board_id', None)} - {None}
+
+
+@receiver([post_save, post_delete], sender=Board)
+@receiver([post_save, post_delete], sender=BoardParticipant)
+@receiver([post_save, post_delete], sender=GoalCategory)
+@receiver([post_save, post_delete], sender=Goal)
+@receiver([post_save, post_delete], sender=GoalComment)
+def bump_board(sender, instance, **kwargs) -> None:
+    """Смена версии доски при любой записи на ней, закешированные ответы списков перестают использоваться"""
+    if is_enabled():
+        bump_board_version(*_board_ids(instance))
+    if not isinstance(instance, Board):
+        instance.loaded_board_id = instance.board_id
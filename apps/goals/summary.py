@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from apps.goals.models import Board, Goal, GoalCategory, GoalCounter
+
+VISIBLE_STATUSES = [status for status in Goal.Status.values if status != Goal.Status.archived]
+
+
+def board_summary(board: Board) -> dict:
+    """
+    Сводка по доске: количество не архивных целей по статусам, приоритетам и категориям из счетчиков
+    GoalCounter и количество просроченных (срок прошел, цель не выполнена) запросом по частичным
+    индексам доски (goal_active_board_idx, goal_active_board_due_date_idx): срок не входит в ключ счетчика,
+    просрочка зависит от текущей даты
+    """
+    categories = {
+        category['id']: {**category, 'total': 0, 'overdue': 0, 'by_status': dict.fromkeys(VISIBLE_STATUSES, 0)}
+        for category in (GoalCategory.objects.filter(board=board, is_deleted=False)
+                         .order_by('title').values('id', 'title'))
+    }
+    rows = (GoalCounter.objects
+            .filter(category_id__in=categories)
+            .exclude(status=Goal.Status.archived)
+            .values('category_id', 'status', 'priority')
+            .annotate(total=Sum('count')))
+    overdue = (Goal.objects
+               .filter(board=board, category_id__in=categories, due_date__lt=timezone.localdate(),
+                       status__in=(Goal.Status.to_do, Goal.Status.in_progress))
+               .values('category_id')
+               .annotate(overdue=Count('id')))
+
+    summary = {
+        'board': board.id,
+        'total': 0,
+        'overdue': 0,
+        'by_status': dict.fromkeys(VISIBLE_STATUSES, 0),
+        'by_priority': dict.fromkeys(Goal.Priority.values, 0),
+        'categories': list(categories.values()),
+    }
+    for row in rows:
+        category = categories[row['category_id']]
+        for target in (summary, category):
+            target['total'] += row['total']
+            target['by_status'][row['status']] += row['total']
+        summary['by_priority'][row['priority']] += row['total']
+    for row in overdue:
+        categories[row['category_id']]['overdue'] = row['overdue']
+        summary['overdue'] += row['overdue']
+    return summary
+
+
+def rebuild_goal_counters() -> None:
+    """Пересчет счетчиков по таблице целей (после ручных правок в БД)"""
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('LOCK TABLE goals_goal IN SHARE MODE')
+            cursor.execute('DELETE FROM goals_goalcounter')
+            cursor.execute(
+                'INSERT INTO goals_goalcounter (category_id, status, priority, count) '
+                'SELECT category_id, status, priority, count(*) FROM goals_goal '
+                'GROUP BY category_id, status, priority'
+            )
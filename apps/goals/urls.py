@@ -1,27 +1,41 @@
 from __future__ import annotations
 
+from django.conf import settings
 from django.urls import path
 
 from apps.goals import views
 
+
+def list_view(view_class: type, async_view_class: type):
+    """Асинхронный вариант списка в режиме ASGI (GOALS_ASYNC_LISTS)"""
+    return (async_view_class if settings.GOALS_ASYNC_LISTS else view_class).as_view()
+
+
 urlpatterns = [
     # Board
     path('board/create', views.BoardCreateView.as_view(), name='create_board'),
-    path('board/list', views.BoardListView.as_view(), name='board_list'),
+    path('board/list', list_view(views.BoardListView, views.AsyncBoardListView), name='board_list'),
     path('board/<int:pk>', views.BoardView.as_view(), name='board'),
+    path('board/<int:pk>/summary', views.BoardSummaryView.as_view(), name='board_summary'),
+    path('archive_job/<int:pk>', views.ArchiveJobView.as_view(), name='archive_job'),
 
     # Goal Category API
     path('goal_category/create', views.GoalCategoryCreateView.as_view(), name='create_category'),
-    path('goal_category/list', views.GoalCategoryListView.as_view(), name='category_list'),
+    path('goal_category/list', list_view(views.GoalCategoryListView, views.AsyncGoalCategoryListView),
+         name='category_list'),
     path('goal_category/<int:pk>', views.GoalCategoryView.as_view(), name='goal_category'),
 
     # Goals API
     path('goal/create', views.GoalCreateView.as_view(), name='create_goal'),
-    path('goal/list', views.GoalListView.as_view(), name='goal_list'),
+    path('goal/list', list_view(views.GoalListView, views.AsyncGoalListView), name='goal_list'),
     path('goal/<int:pk>', views.GoalView.as_view(), name='goal'),
+    path('goal/batch_create', views.GoalBatchCreateView.as_view(), name='batch_create_goal'),
+    path('goal/batch_update', views.GoalBatchUpdateView.as_view(), name='batch_update_goal'),
+    path('goal/batch_archive', views.GoalBatchArchiveView.as_view(), name='batch_archive_goal'),
 
     # Goal Comment API
     path('goal_comment/create', views.GoalCommentCreateView.as_view(), name='create_comment'),
-    path('goal_comment/list', views.GoalCommentListView.as_view(), name='goal_list'),
+    path('goal_comment/list', list_view(views.GoalCommentListView, views.AsyncGoalCommentListView),
+         name='comment_list'),
     path('goal_comment/<pk>', views.GoalCommentView.as_view(), name='comment'),
 ]
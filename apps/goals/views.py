@@ -1,76 +1,110 @@
 from __future__ import annotations
 
-from django.db import transaction
 from django.db.models import QuerySet
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, generics, permissions
+from rest_framework import filters, generics, permissions, status
 from rest_framework.filters import OrderingFilter, SearchFilter
-
-from apps.goals.filters import GoalDateFilter
-from apps.goals.models import Board, BoardParticipant, Goal, GoalCategory, GoalComment
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from apps.core.profiling import SerializerTimingMixin
+from apps.goals.bulk import bulk_archive_goals, bulk_create_goals, bulk_update_goals
+from apps.goals.cascade import archive_board, archive_category
+from apps.goals.filters import CommentFilter, FullTextSearchFilter, GoalDateFilter
+from apps.goals.membership import get_board_roles
+from apps.goals.mixins import AsyncListMixin, CachedListMixin, ConditionalGetMixin, LeanListMixin
+from apps.goals.models import ArchiveJob, Board, BoardParticipant, Goal, GoalCategory, GoalComment
+from apps.goals.pagination import LimitOffsetOrKeysetPagination
 from apps.goals.permissions import BoardPermission, GoalCategoryPermission, GoalPermission
-from apps.goals.serializer import (BoardCreateSerializer,
+from apps.goals.serializer import (ArchiveJobSerializer,
+                                   BoardCreateSerializer,
                                    BoardListSerializer,
                                    BoardSerializer,
                                    CommentCreateSerializer,
                                    CommentSerializer,
+                                   GoalBatchArchiveSerializer,
+                                   GoalBatchCreateSerializer,
+                                   GoalBatchUpdateSerializer,
                                    GoalCategoryCreateSerializer,
                                    GoalCategorySerializer,
                                    GoalCreateSerializer,
                                    GoalSerializer,)
+from apps.goals.summary import board_summary
+
+
+def archive_response(job: ArchiveJob | None) -> Response:
+    """204 если архивирование выполнено сразу, 202 с задачей если оно идет в фоне"""
+    if job is None:
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(ArchiveJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
 
-class BoardCreateView(generics.CreateAPIView):
+class BoardCreateView(SerializerTimingMixin, generics.CreateAPIView):
     """Создание новой доски"""
     serializer_class = BoardCreateSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 4
 
     def perform_create(self, serializer) -> None:
         """Делаем текущего пользователя владельцем доски"""
         BoardParticipant.objects.create(user=self.request.user, board=serializer.save())
 
 
-class BoardListView(generics.ListAPIView):
+class BoardListView(SerializerTimingMixin, ConditionalGetMixin, generics.ListAPIView):
     """Получение списка досок пользователя"""
     serializer_class = BoardListSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [OrderingFilter]
     ordering = ['title']
+    query_budget = 5
 
     def get_queryset(self) -> Board:
         return Board.objects.filter(participants__user_id=self.request.user.id, is_deleted=False)
 
 
-class BoardView(generics.RetrieveUpdateDestroyAPIView):
+class BoardView(SerializerTimingMixin, ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Редактирование и удаление досок пользователя"""
     permission_classes = [permissions.IsAuthenticated, BoardPermission]
     serializer_class = BoardSerializer
+    query_budget = {'GET': 6, 'PUT': 18, 'PATCH': 18, 'DELETE': 11}
 
     def get_queryset(self) -> Board:
         return Board.objects.prefetch_related('participants__user').filter(is_deleted=False)
 
-    def perform_destroy(self, instance: Board) -> Board:
-        """Удаление доски (перевод is_deleted в True)"""
-        with transaction.atomic():
-            instance.is_deleted = True
-            instance.save()
-            instance.categories.update(is_deleted=True)
-            Goal.objects.filter(category__board=instance).update(
-                status=Goal.Status.archived
-            )
-        return instance
+    def destroy(self, request: Request, *args, **kwargs) -> Response:
+        return archive_response(self.perform_destroy(self.get_object()))
+
+    def perform_destroy(self, instance: Board) -> ArchiveJob | None:
+        """Удаление доски (перевод is_deleted в True), категории и цели архивируются сразу или фоновой задачей"""
+        return archive_board(instance, self.request.user)
+
+
+class BoardSummaryView(generics.RetrieveAPIView):
+    """Сводка по доске: количество целей по статусам, приоритетам, категориям и просроченных"""
+    permission_classes = [permissions.IsAuthenticated, BoardPermission]
+    query_budget = 7
+
+    def get_queryset(self) -> Board:
+        return Board.objects.filter(is_deleted=False)
+
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        return Response(board_summary(self.get_object()))
 
 
-class GoalCategoryCreateView(generics.CreateAPIView):
+class GoalCategoryCreateView(SerializerTimingMixin, generics.CreateAPIView):
     """Создание новой категории"""
     permission_classes = [GoalCategoryPermission]
     serializer_class = GoalCategoryCreateSerializer
+    query_budget = 5
 
 
-class GoalCategoryListView(generics.ListAPIView):
+class GoalCategoryListView(SerializerTimingMixin, CachedListMixin, ConditionalGetMixin, LeanListMixin,
+                           generics.ListAPIView):
     """Получение списка категорий где текущий user является участником"""
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = GoalCategorySerializer
+    pagination_class = LimitOffsetOrKeysetPagination
+    query_budget = 6
 
     filter_backends = [OrderingFilter, SearchFilter, DjangoFilterBackend]
     ordering_fields = ('title', 'created')
@@ -80,95 +114,164 @@ class GoalCategoryListView(generics.ListAPIView):
 
     def get_queryset(self) -> GoalCategory:
         """Получение категорий в которых текущий пользователь является участником"""
-        user = self.request.user
-        return GoalCategory.objects.select_related('user').filter(board__participants__user_id=user.id,
+        return GoalCategory.objects.select_related('user').filter(board_id__in=get_board_roles(self.request),
+                                                                  board__is_deleted=False,
                                                                   is_deleted=False)
 
 
-class GoalCategoryView(generics.RetrieveUpdateDestroyAPIView):
+class GoalCategoryView(SerializerTimingMixin, ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Редактирование и удаление категории"""
     permission_classes = [GoalCategoryPermission]
     serializer_class = GoalCategorySerializer
+    query_budget = {'GET': 4, 'PUT': 5, 'PATCH': 5, 'DELETE': 9}
 
     def get_queryset(self) -> GoalCategory:
         """Получение категорий в которых текущий пользователь является автором или редактором"""
-        user = self.request.user
-        return GoalCategory.objects.select_related('user').filter(board__participants__user_id=user.id,
+        return GoalCategory.objects.select_related('user').filter(board_id__in=get_board_roles(self.request),
+                                                                  board__is_deleted=False,
                                                                   is_deleted=False)
 
-    def perform_destroy(self, instance: GoalCategory) -> None:
-        """Удаление категории (перевод is_deleted в True)"""
-        with transaction.atomic():
-            instance.is_deleted = True
-            instance.save(update_fields=('is_deleted',))
-            instance.goals.update(status=Goal.Status.archived)
+    def destroy(self, request: Request, *args, **kwargs) -> Response:
+        return archive_response(self.perform_destroy(self.get_object()))
+
+    def perform_destroy(self, instance: GoalCategory) -> ArchiveJob | None:
+        """Удаление категории (перевод is_deleted в True), цели архивируются сразу или фоновой задачей"""
+        return archive_category(instance, self.request.user)
 
 
-class GoalCreateView(generics.CreateAPIView):
+class GoalCreateView(SerializerTimingMixin, generics.CreateAPIView):
     """Создание цели у категории"""
     permission_classes = [GoalPermission]
     serializer_class = GoalCreateSerializer
+    query_budget = 5
 
 
-class GoalListView(generics.ListAPIView):
+class GoalListView(SerializerTimingMixin, CachedListMixin, ConditionalGetMixin, LeanListMixin,
+                   generics.ListAPIView):
     """Получение списка целей"""
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = GoalSerializer
+    pagination_class = LimitOffsetOrKeysetPagination
+    query_budget = 6
 
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, FullTextSearchFilter]
     filterset_class = GoalDateFilter
     ordering_fields = ('title', 'created')
     ordering = ['title']
-    search_fields = ('title', 'description')
 
     def get_queryset(self) -> Goal:
-        user = self.request.user
-        return Goal.objects.select_related('user').filter(category__board__participants__user_id=user.id,
-                                                          category__is_deleted=False
-                                                          ).exclude(status=Goal.Status.archived)
+        return (Goal.objects.select_related('user').defer('search_vector')
+                .filter(board_id__in=get_board_roles(self.request), board__is_deleted=False, category__is_deleted=False)
+                .exclude(status=Goal.Status.archived))
 
 
-class GoalView(generics.RetrieveUpdateDestroyAPIView):
+class GoalView(SerializerTimingMixin, ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Редактирование и удаление целей"""
     permission_classes = [GoalPermission]
     serializer_class = GoalSerializer
+    query_budget = 5
 
     def get_queryset(self) -> Goal:
-        user = self.request.user
-        return Goal.objects.select_related('user').filter(category__board__participants__user_id=user.id,
-                                                          category__is_deleted=False
-                                                          ).exclude(status=Goal.Status.archived)
+        return (Goal.objects.select_related('user').defer('search_vector')
+                .filter(board_id__in=get_board_roles(self.request), board__is_deleted=False, category__is_deleted=False)
+                .exclude(status=Goal.Status.archived))
 
     def perform_destroy(self, instance: Goal) -> None:
         instance.status = Goal.Status.archived
-        instance.save(update_fields=('status',))
+        instance.save(update_fields=('status', 'updated'))
+
+
+class GoalBatchCreateView(generics.GenericAPIView):
+    """Пакетное создание целей, результат по каждой цели"""
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GoalBatchCreateSerializer
+    query_budget = 5
+
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({'results': bulk_create_goals(request, serializer.validated_data['goals'])})
+
+
+class GoalBatchUpdateView(generics.GenericAPIView):
+    """Пакетное изменение статуса и приоритета целей, результат по каждой цели"""
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GoalBatchUpdateSerializer
+    query_budget = 5
 
+    def patch(self, request: Request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({'results': bulk_update_goals(request, serializer.validated_data['goals'])})
 
-class GoalCommentCreateView(generics.CreateAPIView):
+
+class GoalBatchArchiveView(generics.GenericAPIView):
+    """Пакетное архивирование целей, результат по каждой цели"""
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GoalBatchArchiveSerializer
+    query_budget = 5
+
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({'results': bulk_archive_goals(request, serializer.validated_data['ids'])})
+
+
+class GoalCommentCreateView(SerializerTimingMixin, generics.CreateAPIView):
     """Создание комментария у цели"""
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = CommentCreateSerializer
+    query_budget = 5
 
     def get_queryset(self) -> GoalComment:
-        return GoalComment.objects.select_related('user').filter(user=self.request.user)
+        return GoalComment.objects.select_related('user').defer('search_vector').filter(user=self.request.user)
 
 
-class GoalCommentView(generics.RetrieveUpdateDestroyAPIView):
+class GoalCommentView(SerializerTimingMixin, ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Редактирование и удаление комментария"""
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = CommentSerializer
+    query_budget = 4
 
     def get_queryset(self) -> GoalComment:
-        return GoalComment.objects.select_related('user').filter(user=self.request.user)
+        return GoalComment.objects.select_related('user').defer('search_vector').filter(user=self.request.user)
 
 
-class GoalCommentListView(generics.ListAPIView):
+class GoalCommentListView(SerializerTimingMixin, CachedListMixin, ConditionalGetMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = CommentSerializer
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ['goal']
+    pagination_class = LimitOffsetOrKeysetPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
+    filterset_class = CommentFilter
     ordering = ['-created', '-updated']
+    query_budget = 6
 
     def get_queryset(self) -> GoalComment:
-        user = self.request.user
-        return GoalComment.objects.select_related('user').filter(goal__category__board__participants__user_id=user.id)
+        return (GoalComment.objects.select_related('user').defer('search_vector')
+                .filter(board_id__in=get_board_roles(self.request), board__is_deleted=False))
+
+
+class ArchiveJobView(SerializerTimingMixin, generics.RetrieveAPIView):
+    """Прогресс фонового архивирования доски или категории"""
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ArchiveJobSerializer
+    query_budget = 3
+
+    def get_queryset(self) -> ArchiveJob:
+        return ArchiveJob.objects.filter(user=self.request.user)
+
+
+class AsyncBoardListView(AsyncListMixin, BoardListView):
+    """Список досок для режима ASGI: выборка через async ORM"""
+
+
+class AsyncGoalCategoryListView(AsyncListMixin, GoalCategoryListView):
+    """Список категорий для режима ASGI: выборка через async ORM"""
+
+
+class AsyncGoalListView(AsyncListMixin, GoalListView):
+    """Список целей для режима ASGI: выборка через async ORM"""
+
+
+class AsyncGoalCommentListView(AsyncListMixin, GoalCommentListView):
+    """Список комментариев для режима ASGI: выборка через async ORM"""
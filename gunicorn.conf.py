@@ -0,0 +1,24 @@
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+# SERVER_MODE=wsgi - синхронные воркеры, asgi - воркеры uvicorn и асинхронные представления списков
+_asgi = os.environ.get('SERVER_MODE', 'wsgi') == 'asgi'
+wsgi_app = 'todolist.asgi:application' if _asgi else 'todolist.wsgi:application'
+worker_class = 'uvicorn.workers.UvicornWorker' if _asgi else 'sync'
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+
+
+def on_starting(server):
+    """Очистка файлов метрик предыдущего запуска (режим multiprocess)"""
+    if path := os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Метрики-гейджи завершившегося воркера больше не учитываются"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,28 @@
+"""
+Сравнение результатов бенчмарков двух коммитов:
+python -m tests.benchmarks.compare benchmark-results/<old>.json benchmark-results/<new>.json
+"""
+import json
+import sys
+
+
+def flatten(data: dict, prefix: str = '') -> dict[str, float]:
+    values = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            values.update(flatten(value, f'{prefix}{key}.'))
+        elif isinstance(value, (int, float)):
+            values[f'{prefix}{key}'] = value
+    return values
+
+
+def main(old_path: str, new_path: str) -> None:
+    with open(old_path) as old_file, open(new_path) as new_file:
+        old, new = flatten(json.load(old_file)), flatten(json.load(new_file))
+    for key in sorted(old.keys() & new.keys()):
+        change = (new[key] - old[key]) / old[key] * 100 if old[key] else 0
+        print(f'{key:<70} {old[key]:>12} {new[key]:>12} {change:>+8.1f}%')
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:3])
@@ -0,0 +1,13 @@
+import os
+
+import pytest
+
+
+def pytest_collection_modifyitems(config, items):
+    """Бенчмарки долгие и запускаются только явно: BENCHMARK=1 pytest tests/benchmarks"""
+    if os.environ.get('BENCHMARK') == '1':
+        return
+    skip = pytest.mark.skip(reason='set BENCHMARK=1 to run benchmarks')
+    for item in items:
+        if 'benchmarks' in item.nodeid:
+            item.add_marker(skip)
@@ -0,0 +1,83 @@
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.db import connection
+
+from apps.core.models import User
+from apps.goals.models import Board, BoardParticipant, Goal, GoalCategory, GoalComment
+from tests.factories import (BoardFactory,
+                             BoardParticipantFactory,
+                             GoalCategoryFactory,
+                             GoalCommentFactory,
+                             GoalFactory,
+                             UserFactory,)
+
+
+@dataclass(frozen=True)
+class Scale:
+    users: int
+    boards_per_user: int
+    participants_per_board: int
+    categories_per_board: int
+    goals_per_category: int
+    comments_per_goal: int
+
+    @property
+    def goals(self) -> int:
+        return self.users * self.boards_per_user * self.categories_per_board * self.goals_per_category
+
+
+SCALES = {
+    'small': Scale(users=10, boards_per_user=2, participants_per_board=3, categories_per_board=3,
+                   goals_per_category=20, comments_per_goal=2),
+    'medium': Scale(users=50, boards_per_user=4, participants_per_board=5, categories_per_board=5,
+                    goals_per_category=40, comments_per_goal=1),
+    'large': Scale(users=200, boards_per_user=5, participants_per_board=8, categories_per_board=5,
+                   goals_per_category=100, comments_per_goal=1),
+}
+
+
+def _bulk(model, objects: list, batch_size: int = 2000) -> list:
+    return model.objects.bulk_create(objects, batch_size=batch_size)
+
+
+def generate(scale: Scale, seed: int = 0) -> User:
+    """
+    Синтетические данные заданного масштаба: значения полей из фабрик (build без записи),
+    запись bulk_create. Возвращает пользователя, от имени которого выполняются запросы бенчмарка
+    """
+    rnd = random.Random(seed)
+    users = _bulk(User, [UserFactory.build(username=f'bench_{seed}_{number}') for number in range(scale.users)])
+
+    boards = _bulk(Board, BoardFactory.build_batch(scale.users * scale.boards_per_user))
+    participants = []
+    for number, board in enumerate(boards):
+        owner = users[number // scale.boards_per_user]
+        members = rnd.sample([user for user in users if user != owner],
+                             min(scale.participants_per_board - 1, len(users) - 1))
+        participants.append(BoardParticipantFactory.build(board=board, user=owner, role=BoardParticipant.Role.owner))
+        participants += [BoardParticipantFactory.build(board=board, user=member) for member in members]
+    _bulk(BoardParticipant, participants)
+    # Пользователь бенчмарка: владелец досок первого блока и участник части чужих
+    bench_user = users[0]
+
+    categories = _bulk(GoalCategory, [
+        GoalCategoryFactory.build(board=board, user=bench_user)
+        for board in boards for _ in range(scale.categories_per_board)
+    ])
+    today = date.today()
+    goals = _bulk(Goal, [
+        GoalFactory.build(category=category, board_id=category.board_id, user=bench_user,
+                          status=rnd.choice(Goal.Status.values), priority=rnd.choice(Goal.Priority.values),
+                          due_date=rnd.choice((None, today + timedelta(days=rnd.randint(-30, 30)))))
+        for category in categories for _ in range(scale.goals_per_category)
+    ])
+    _bulk(GoalComment, [
+        GoalCommentFactory.build(goal=goal, board_id=goal.board_id, user=bench_user)
+        for goal in goals for _ in range(scale.comments_per_goal)
+    ])
+    # Статистика планировщика как на рабочей базе после autovacuum
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return bench_user
@@ -0,0 +1,39 @@
+import json
+import os
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+def percentiles(timings: list[float]) -> dict[str, float]:
+    """p50/p95/среднее в миллисекундах"""
+    cuts = statistics.quantiles(timings, n=20, method='inclusive')
+    return {
+        'p50_ms': round(statistics.median(timings) * 1000, 3),
+        'p95_ms': round(cuts[18] * 1000, 3),
+        'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+    }
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def output_path() -> Path:
+    return Path(os.environ.get('BENCHMARK_OUTPUT') or f'benchmark-results/{current_commit()}.json')
+
+
+def save(section: str, key: str, results: dict) -> Path:
+    """Добавление результатов в JSON-файл коммита: {section: {key: results}}"""
+    path = output_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = json.loads(path.read_text()) if path.exists() else {'commit': current_commit()}
+    data['updated'] = datetime.now(timezone.utc).isoformat()
+    data.setdefault(section, {})[key] = results
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False, sort_keys=True))
+    return path
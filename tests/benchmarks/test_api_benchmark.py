@@ -0,0 +1,72 @@
+import os
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.goals.models import BoardParticipant, Goal, GoalCategory
+from tests.benchmarks import report
+from tests.benchmarks.datagen import SCALES, generate
+
+REQUESTS = int(os.environ.get('BENCHMARK_REQUESTS', 30))
+WARMUP = 3
+BENCHMARK_SCALES = os.environ.get('BENCHMARK_SCALES', 'small,medium').split(',')
+
+
+def endpoints(user) -> dict[str, tuple[str, dict]]:
+    """Основные запросы фронтенда: (url, параметры)"""
+    board_id = BoardParticipant.objects.filter(user=user, role=BoardParticipant.Role.owner).values_list(
+        'board_id', flat=True).first()
+    category = GoalCategory.objects.filter(board_id=board_id).first()
+    goal = Goal.objects.filter(board_id=board_id).exclude(status=Goal.Status.archived).first()
+    return {
+        'board_list': (reverse('apps.goals:board_list'), {}),
+        'board_detail': (reverse('apps.goals:board', kwargs={'pk': board_id}), {}),
+        'board_summary': (reverse('apps.goals:board_summary', kwargs={'pk': board_id}), {}),
+        'category_list': (reverse('apps.goals:category_list'), {'limit': 50}),
+        'goal_list': (reverse('apps.goals:goal_list'), {'limit': 50}),
+        'goal_list_offset': (reverse('apps.goals:goal_list'), {'limit': 50, 'offset': 1000}),
+        'goal_list_cursor': (reverse('apps.goals:goal_list'), {'pagination': 'cursor', 'limit': 50}),
+        'goal_list_category': (reverse('apps.goals:goal_list'), {'category__in': category.id, 'limit': 50}),
+        'goal_search': (reverse('apps.goals:goal_list'), {'search': 'goal', 'limit': 50}),
+        'goal_detail': (reverse('apps.goals:goal', kwargs={'pk': goal.id}), {}),
+        'comment_list': (reverse('apps.goals:comment_list'), {'goal': goal.id, 'limit': 50}),
+    }
+
+
+def measure(client: APIClient, url: str, params: dict) -> dict:
+    for _ in range(WARMUP):
+        assert client.get(url, params).status_code == 200
+    timings = []
+    for _ in range(REQUESTS):
+        started = time.perf_counter()
+        client.get(url, params)
+        timings.append(time.perf_counter() - started)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params)
+    return {**report.percentiles(timings), 'queries': len(queries), 'response_bytes': len(response.content)}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('scale_name', BENCHMARK_SCALES)
+def test_api_latency(scale_name):
+    """Задержка p50/p95 и количество SQL-запросов основных эндпоинтов на данных заданного масштаба"""
+    scale = SCALES[scale_name]
+    started = time.perf_counter()
+    user = generate(scale)
+    generated = time.perf_counter() - started
+
+    client = APIClient()
+    client.force_authenticate(user)
+    results = {'goals': scale.goals, 'generate_s': round(generated, 1), 'endpoints': {}}
+    for name, (url, params) in endpoints(user).items():
+        results['endpoints'][name] = measure(client, url, params)
+
+    path = report.save('api', scale_name, results)
+    print(f'\n{scale_name} ({scale.goals} goals) -> {path}')
+    for name, result in results['endpoints'].items():
+        print(f'  {name:<22} p50 {result["p50_ms"]:>8.2f} ms  p95 {result["p95_ms"]:>8.2f} ms  '
+              f'queries {result["queries"]}')
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import time
+
+import pytest
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+
+from tests.benchmarks import report
+from tests.benchmarks.datagen import SCALES, generate
+from tests.benchmarks.test_server_benchmark import DURATION, SCALE, free_port, list_urls, load, start_server, wait_ready
+
+ROUNDS = int(os.environ.get('BENCHMARK_CONNECTION_ROUNDS', 200))
+CONCURRENCY = int(os.environ.get('BENCHMARK_CONNECTION_CONCURRENCY', 16))
+
+
+def time_queries(reuse: bool) -> list[float]:
+    """SELECT 1 ROUNDS раз: на одном соединении или на новом соединении для каждого запроса"""
+    wrapper = connections.create_connection('default')
+    timings = []
+    try:
+        for _ in range(ROUNDS):
+            started = time.perf_counter()
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not reuse:
+                wrapper.close()
+            timings.append(time.perf_counter() - started)
+    finally:
+        wrapper.close()
+    return timings
+
+
+@pytest.mark.django_db
+def test_connection_setup_cost():
+    """Цена установки соединения с PostgreSQL (TCP, аутентификация, инициализация) против переиспользования"""
+    results = {
+        'new_connection': report.percentiles(time_queries(reuse=False)),
+        'persistent': report.percentiles(time_queries(reuse=True)),
+    }
+    saving = results['new_connection']['mean_ms'] - results['persistent']['mean_ms']
+    path = report.save('connections', 'setup', {'rounds': ROUNDS, 'saving_ms': round(saving, 3), **results})
+    print(f'\n{ROUNDS} rounds -> {path}')
+    for name, stats in results.items():
+        print(f'  {name:>15}: p50 {stats["p50_ms"]:>7.3f} ms p95 {stats["p95_ms"]:>7.3f} ms')
+    print(f'  saving per request: {saving:.3f} ms')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_conn_max_age_throughput():
+    """Списки под нагрузкой в gunicorn (wsgi): новое соединение на запрос против постоянных соединений"""
+    user = generate(SCALES[SCALE])
+    client = Client()
+    client.force_login(user)
+    cookies = {settings.SESSION_COOKIE_NAME: client.cookies[settings.SESSION_COOKIE_NAME].value}
+    urls = list_urls()
+
+    results = {}
+    for conn_max_age in ('0', '60'):
+        port = free_port()
+        server = start_server('wsgi', port, POSTGRES_CONN_MAX_AGE=conn_max_age)
+        try:
+            base_url = f'http://127.0.0.1:{port}'
+            wait_ready(base_url)
+            asyncio.run(load(base_url, urls, cookies, concurrency=4, duration=1))  # Прогрев воркеров
+            results[conn_max_age] = asyncio.run(load(base_url, urls, cookies, CONCURRENCY, DURATION))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    path = report.save('connections', SCALE, {'concurrency': CONCURRENCY, 'duration_s': DURATION, **results})
+    print(f'\n{SCALE}, concurrency {CONCURRENCY} -> {path}')
+    for conn_max_age, stats in results.items():
+        print(f'  CONN_MAX_AGE {conn_max_age:>2}: {stats["rps"]:>7} rps p50 {stats["p50_ms"]:>8.1f} ms '
+              f'p95 {stats["p95_ms"]:>8.1f} ms ({stats["errors"]} errors)')
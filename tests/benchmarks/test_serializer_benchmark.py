@@ -0,0 +1,45 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.goals.lean import LeanSerializer
+from apps.goals.models import Goal
+from apps.goals.serializer import GoalSerializer
+from tests.benchmarks import report
+from tests.factories import GoalCategoryFactory, UserFactory
+
+ROWS = 2000
+ROUNDS = 5
+
+
+def measure(func) -> tuple[list, dict]:
+    """Результат и количество SQL-запросов одного вызова, затем p50/p95 по ROUNDS повторам"""
+    with CaptureQueriesContext(connection) as queries:
+        data = func()
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return data, {**report.percentiles(timings), 'queries': len(queries)}
+
+
+@pytest.mark.django_db
+def test_goal_list_serialization():
+    """Сериализация страницы целей: ModelSerializer против LeanSerializer (запрос + сериализация)"""
+    user = UserFactory()
+    category = GoalCategoryFactory(user=user)
+    Goal.objects.bulk_create(
+        Goal(title=f'Goal {number}', description='text' * 10, category=category, user=user) for number in range(ROWS)
+    )
+    queryset = Goal.objects.select_related('user').order_by('id')
+    lean = LeanSerializer(GoalSerializer)
+
+    full_data, full = measure(lambda: GoalSerializer(queryset.all(), many=True).data)
+    lean_data, lean = measure(lambda: lean.to_representation(lean.values(queryset.all())))
+
+    report.save('serializer', 'goal_list', {'rows': ROWS, 'model_serializer': full, 'lean_serializer': lean})
+    assert lean_data == full_data
+    assert full['queries'] == lean['queries'] == 1
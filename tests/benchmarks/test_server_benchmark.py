@@ -0,0 +1,129 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from tests.benchmarks import report
+from tests.benchmarks.datagen import SCALES, generate
+
+SCALE = os.environ.get('BENCHMARK_SERVER_SCALE', 'small')
+CONCURRENCY = [int(value) for value in os.environ.get('BENCHMARK_CONCURRENCY', '16,64,256').split(',')]
+DURATION = float(os.environ.get('BENCHMARK_DURATION', 10))
+WORKERS = os.environ.get('BENCHMARK_WORKERS', '4')
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def list_urls() -> list[str]:
+    """Частые запросы фронтенда: списки с пагинацией"""
+    return [
+        reverse('apps.goals:board_list'),
+        f'{reverse("apps.goals:category_list")}?limit=50',
+        f'{reverse("apps.goals:goal_list")}?limit=50',
+        f'{reverse("apps.goals:comment_list")}?limit=50',
+    ]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode: str, port: int, **overrides: str) -> subprocess.Popen:
+    """gunicorn из gunicorn.conf.py на тестовой БД: sync-воркеры (wsgi) или воркеры uvicorn (asgi)"""
+    env = {
+        **os.environ,
+        'SERVER_MODE': mode,
+        'BIND': f'127.0.0.1:{port}',
+        'WEB_CONCURRENCY': WORKERS,
+        'POSTGRES_DB': connection.settings_dict['NAME'],
+        'DEBUG': 'False',
+        'QUERY_BUDGET_RAISE': 'False',
+        **overrides,
+    }
+    env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+    return subprocess.Popen([sys.executable, '-m', 'gunicorn', '--log-level', 'warning'], cwd=ROOT, env=env)
+
+
+def wait_ready(base_url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f'{base_url}/metrics').status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f'{base_url} is not ready')
+
+
+async def load(base_url: str, urls: list[str], cookies: dict, concurrency: int, duration: float) -> dict:
+    """concurrency клиентов по кругу запрашивают списки в течение duration секунд"""
+    timings: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, cookies=cookies, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker(number: int) -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(urls[number % len(urls)])
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    timings.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+                number += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(number) for number in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return {'rps': round(len(timings) / elapsed, 1), 'requests': len(timings), 'errors': errors,
+            **report.percentiles(timings)}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_wsgi_vs_asgi_throughput():
+    """Пропускная способность списков под нагрузкой: gunicorn sync-воркеры против воркеров uvicorn"""
+    user = generate(SCALES[SCALE])
+    client = Client()
+    client.force_login(user)
+    cookies = {settings.SESSION_COOKIE_NAME: client.cookies[settings.SESSION_COOKIE_NAME].value}
+    urls = list_urls()
+
+    results = {}
+    for mode in ('wsgi', 'asgi'):
+        port = free_port()
+        server = start_server(mode, port)
+        try:
+            base_url = f'http://127.0.0.1:{port}'
+            wait_ready(base_url)
+            asyncio.run(load(base_url, urls, cookies, concurrency=4, duration=1))  # Прогрев воркеров
+            results[mode] = {str(concurrency): asyncio.run(load(base_url, urls, cookies, concurrency, DURATION))
+                             for concurrency in CONCURRENCY}
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    path = report.save('server', SCALE, {'workers': int(WORKERS), 'duration_s': DURATION, **results})
+    print(f'\n{SCALE}, {WORKERS} workers -> {path}')
+    for concurrency in map(str, CONCURRENCY):
+        wsgi, asgi = results['wsgi'][concurrency], results['asgi'][concurrency]
+        print(f'  concurrency {concurrency:>4}: wsgi {wsgi["rps"]:>7} rps p95 {wsgi["p95_ms"]:>8.1f} ms '
+              f'({wsgi["errors"]} errors) | asgi {asgi["rps"]:>7} rps p95 {asgi["p95_ms"]:>8.1f} ms '
+              f'({asgi["errors"]} errors)')
@@ -15,3 +15,9 @@ def client() -> APIClient:
 def get_auth_client(client: APIClient, user) -> APIClient:
     client.force_authenticate(user)
     return client
+
+
+@pytest.fixture(autouse=True)
+def query_budget(settings) -> None:
+    """Превышение бюджета SQL-запросов представления в тестах - ошибка"""
+    settings.QUERY_BUDGET_RAISE = True
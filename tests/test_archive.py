@@ -0,0 +1,109 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.goals.cascade import claim_job, run_job
+from apps.goals.models import ArchiveJob, Board, BoardParticipant, Goal, GoalCategory
+from tests.factories import GoalCategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestArchiveJob:
+
+    @pytest.fixture
+    def owner(self, user, board, board_participant_factory):
+        return board_participant_factory(board=board, user=user, role=BoardParticipant.Role.owner)
+
+    @pytest.fixture
+    def goals(self, user, board):
+        categories = GoalCategoryFactory.create_batch(3, board=board, user=user)
+        return [GoalFactory(category=category, user=user, status=Goal.Status.to_do)
+                for category in categories for _ in range(4)]
+
+    @pytest.fixture(autouse=True)
+    def async_mode(self, settings):
+        settings.GOALS_ARCHIVE_ASYNC = True
+        settings.GOALS_ARCHIVE_BATCH_SIZE = 5
+
+    def test_delete_board_async(self, get_auth_client, board, owner, goals, django_capture_on_commit_callbacks):
+        """Доска удаляется сразу, категории и цели архивируются фоновой задачей пачками"""
+        with patch('apps.goals.cascade.run_job_async', side_effect=run_job) as run_job_async:
+            with django_capture_on_commit_callbacks(execute=True):
+                response = get_auth_client.delete(f'/goals/board/{board.pk}')
+
+        assert response.status_code == 202
+        assert response.data['status'] == ArchiveJob.Status.pending
+        assert response.data['goals_total'] == len(goals)
+        run_job_async.assert_called_once_with(response.data['id'])
+
+        assert Board.objects.get(pk=board.pk).is_deleted
+        assert not GoalCategory.objects.filter(board=board, is_deleted=False).exists()
+        assert not Goal.objects.filter(category__board=board).exclude(status=Goal.Status.archived).exists()
+
+        progress = get_auth_client.get(f'/goals/archive_job/{response.data["id"]}')
+        assert progress.status_code == 200
+        assert progress.data['status'] == ArchiveJob.Status.done
+        assert progress.data['goals_done'] == len(goals)
+        assert progress.data['categories_done'] == 3
+
+    def test_board_content_hidden_until_archived(self, get_auth_client, board, owner, goals):
+        """Пока задача не выполнена, цели удаленной доски не видны в списках"""
+        with patch('apps.goals.cascade.run_job_async'):
+            get_auth_client.delete(f'/goals/board/{board.pk}')
+
+        assert get_auth_client.get('/goals/goal/list').data == []
+        assert get_auth_client.get('/goals/goal_category/list').data == []
+
+    def test_resume_interrupted_job(self, user, board, goals):
+        """Прерванная задача продолжается с сохраненной позиции"""
+        processed = sorted(goals, key=lambda goal: goal.id)[:5]
+        Goal.objects.filter(id__in=[goal.id for goal in processed]).update(status=Goal.Status.archived)
+        job = ArchiveJob.objects.create(board=board, user=user, status=ArchiveJob.Status.running,
+                                        goals_total=len(goals), goals_done=5, last_goal_id=processed[-1].id)
+        ArchiveJob.objects.filter(pk=job.pk).update(updated=timezone.now() - timedelta(hours=1))
+
+        job = run_job(job.id)
+
+        assert job.status == ArchiveJob.Status.done
+        assert job.goals_done == len(goals)
+        assert not Goal.objects.filter(category__board=board).exclude(status=Goal.Status.archived).exists()
+
+    def test_delete_category_async(self, get_auth_client, board, owner, goals, django_capture_on_commit_callbacks):
+        """Категория удаляется сразу, архивируются только ее цели"""
+        category = goals[0].category
+        with patch('apps.goals.cascade.run_job_async', side_effect=run_job):
+            with django_capture_on_commit_callbacks(execute=True):
+                response = get_auth_client.delete(f'/goals/goal_category/{category.pk}')
+
+        assert response.status_code == 202
+        assert GoalCategory.objects.get(pk=category.pk).is_deleted
+        assert Goal.objects.filter(status=Goal.Status.archived).count() == 4
+
+    def test_job_claimed_once(self, settings, user, board, goals):
+        """Задачу берет только один исполнитель, выполняющаяся задача с прогрессом не перехватывается"""
+        settings.GOALS_ARCHIVE_STALE_AFTER = 600
+        job = ArchiveJob.objects.create(board=board, user=user, goals_total=len(goals))
+
+        assert claim_job(job.id)
+        assert not claim_job(job.id)
+        assert run_job(job.id) is None
+
+        call_command('run_archive_jobs')
+        job.refresh_from_db()
+        assert job.status == ArchiveJob.Status.running
+        assert job.goals_done == 0
+
+    def test_command_retries_failed_jobs(self, user, board, goals):
+        job = ArchiveJob.objects.create(board=board, user=user, status=ArchiveJob.Status.failed,
+                                        goals_total=len(goals), error='error')
+        call_command('run_archive_jobs')
+        assert ArchiveJob.objects.get(pk=job.pk).status == ArchiveJob.Status.failed
+
+        call_command('run_archive_jobs', '--failed')
+        job.refresh_from_db()
+        assert job.status == ArchiveJob.Status.done
+        assert job.categories_done == 3
+        assert job.goals_done == len(goals)
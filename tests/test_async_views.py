@@ -0,0 +1,100 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.test import AsyncClient
+from django.urls import path, reverse
+
+from apps.core.middleware import QueryBudgetExceeded
+from apps.goals import views
+from apps.goals.models import BoardParticipant, Goal
+from tests.factories import GoalCommentFactory, GoalFactory
+
+# Асинхронные представления списков по тем же путям, что и в режиме ASGI (GOALS_ASYNC_LISTS)
+urlpatterns = [
+    path('goals/board/list', views.AsyncBoardListView.as_view()),
+    path('goals/goal_category/list', views.AsyncGoalCategoryListView.as_view()),
+    path('goals/goal/list', views.AsyncGoalListView.as_view()),
+    path('goals/goal_comment/list', views.AsyncGoalCommentListView.as_view()),
+]
+
+
+@pytest.mark.django_db
+class TestAsyncListViews:
+
+    @pytest.fixture
+    def data(self, user, board_participant, goal_category):
+        board_participant.user, board_participant.role = user, BoardParticipant.Role.owner
+        board_participant.save()
+        goal_category.board = board_participant.board
+        goal_category.save()
+        goals = GoalFactory.create_batch(5, user=user, category=goal_category, status=Goal.Status.to_do)
+        GoalCommentFactory.create_batch(3, goal=goals[0], user=user)
+        return goals
+
+    @pytest.fixture
+    def async_client(self, user) -> AsyncClient:
+        client = AsyncClient()
+        client.force_login(user)
+        return client
+
+    def async_get(self, settings, client: AsyncClient, url: str, params: dict | None = None, **extra):
+        async def get():
+            return await client.get(url, params or {}, **extra)
+
+        urls = settings.ROOT_URLCONF
+        settings.ROOT_URLCONF = __name__
+        try:
+            return async_to_sync(get)()
+        finally:
+            settings.ROOT_URLCONF = urls
+
+    @pytest.mark.parametrize('name, params', [
+        ('board_list', {}),
+        ('board_list', {'limit': 1}),
+        ('category_list', {'limit': 10}),
+        ('goal_list', {}),
+        ('goal_list', {'limit': 2, 'offset': 1}),
+        ('goal_list', {'pagination': 'cursor', 'limit': 2}),
+        ('goal_list', {'ordering': '-created', 'status': Goal.Status.to_do}),
+        ('comment_list', {'limit': 10}),
+    ])
+    def test_same_response(self, settings, get_auth_client, async_client, data, name, params):
+        """JSON асинхронного представления совпадает с синхронным"""
+        url = reverse(f'apps.goals:{name}')
+        expected = get_auth_client.get(url, params)
+        response = self.async_get(settings, async_client, url, params)
+
+        assert response.status_code == 200
+        assert response.json() == expected.json()
+        assert response['ETag'] == expected['ETag']
+
+    def test_not_modified(self, settings, async_client, data):
+        url = reverse('apps.goals:goal_list')
+        etag = self.async_get(settings, async_client, url)['ETag']
+
+        response = self.async_get(settings, async_client, url, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+
+    def test_response_cache(self, settings, async_client, data):
+        settings.GOALS_LIST_CACHE = 'local'
+        caches['local'].clear()
+        url = reverse('apps.goals:goal_list')
+
+        first = self.async_get(settings, async_client, url)
+        second = self.async_get(settings, async_client, url)
+        assert (first['X-Cache'], second['X-Cache']) == ('MISS', 'HIT')
+        assert second.json() == first.json()
+
+    def test_unauthenticated(self, settings, data):
+        response = self.async_get(settings, AsyncClient(), reverse('apps.goals:goal_list'))
+        assert response.status_code == 403
+
+    def test_query_budget(self, settings, monkeypatch, async_client, data):
+        """Запросы синхронной части и async ORM учитываются middleware в асинхронной цепочке"""
+        settings.DEBUG = True
+        response = self.async_get(settings, async_client, reverse('apps.goals:goal_list'))
+        assert int(response['X-Query-Count']) >= 3
+
+        monkeypatch.setattr(views.AsyncGoalListView, 'query_budget', 1)
+        with pytest.raises(QueryBudgetExceeded):
+            self.async_get(settings, async_client, reverse('apps.goals:goal_list'))
@@ -104,3 +104,48 @@ class TestBoardCreated:
             assert deleted_board.is_deleted
         else:
             assert response.status_code == 403
+
+
+@pytest.mark.django_db
+class TestBoardParticipantsSync:
+
+    @pytest.fixture
+    def owner(self, user, board, board_participant_factory):
+        return board_participant_factory(board=board, user=user, role=BoardParticipant.Role.owner)
+
+    def roles(self, board) -> dict[str, int]:
+        return dict(BoardParticipant.objects.filter(board=board).values_list('user__username', 'role'))
+
+    def test_update_participants(self, get_auth_client, board, owner, user_factory, board_participant_factory,
+                                 django_assert_max_num_queries):
+        """Роли меняются, лишние участники удаляются, новые добавляются, владелец не затрагивается"""
+        writer, reader, new_user = user_factory.create_batch(3)
+        board_participant_factory(board=board, user=writer, role=BoardParticipant.Role.writer)
+        board_participant_factory(board=board, user=reader, role=BoardParticipant.Role.reader)
+        board_participant_factory.create_batch(20, board=board, role=BoardParticipant.Role.reader)
+
+        data = {
+            'title': board.title,
+            'participants': [
+                {'user': writer.username, 'role': BoardParticipant.Role.reader},
+                {'user': new_user.username, 'role': BoardParticipant.Role.writer},
+            ],
+        }
+        with django_assert_max_num_queries(20):
+            response = get_auth_client.put(f'/goals/board/{board.pk}', data=data, format='json')
+
+        assert response.status_code == 200
+        assert self.roles(board) == {
+            owner.user.username: BoardParticipant.Role.owner,
+            writer.username: BoardParticipant.Role.reader,
+            new_user.username: BoardParticipant.Role.writer,
+        }
+
+    def test_empty_participants(self, get_auth_client, board, owner, board_participant_factory):
+        """Без участников в запросе на доске остается только владелец"""
+        board_participant_factory.create_batch(3, board=board, role=BoardParticipant.Role.writer)
+        response = get_auth_client.put(f'/goals/board/{board.pk}', data={'title': 'New title'}, format='json')
+
+        assert response.status_code == 200
+        assert self.roles(board) == {owner.user.username: BoardParticipant.Role.owner}
+        assert Board.objects.get(pk=board.pk).title == 'New title'
@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.goals.models import BoardParticipant, Goal, GoalCounter
+from apps.goals.summary import rebuild_goal_counters
+from tests.factories import GoalCategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestBoardSummary:
+
+    @pytest.fixture
+    def categories(self, user, board, board_participant_factory):
+        board_participant_factory(board=board, user=user, role=BoardParticipant.Role.reader)
+        return GoalCategoryFactory.create_batch(2, board=board, user=user)
+
+    def get_summary(self, client, board) -> dict:
+        response = client.get(reverse('apps.goals:board_summary', kwargs={'pk': board.pk}))
+        assert response.status_code == 200
+        return response.json()
+
+    def test_summary(self, get_auth_client, board, categories):
+        """Сводка считается по счетчикам, которые обновляются при любых изменениях целей"""
+        first, second = categories
+        yesterday = date.today() - timedelta(days=1)
+        GoalFactory.create_batch(3, category=first, status=Goal.Status.to_do, priority=Goal.Priority.low)
+        overdue = GoalFactory(category=first, status=Goal.Status.in_progress, priority=Goal.Priority.hight,
+                              due_date=yesterday)
+        GoalFactory(category=second, status=Goal.Status.done, priority=Goal.Priority.low, due_date=yesterday)
+        GoalFactory(category=second, status=Goal.Status.archived, priority=Goal.Priority.low)
+        moved = GoalFactory(category=second, status=Goal.Status.to_do, priority=Goal.Priority.critical)
+
+        moved.category = first
+        moved.save()
+        Goal.objects.filter(id=overdue.id).update(status=Goal.Status.done)
+        Goal.objects.filter(category=first, priority=Goal.Priority.low).first().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            summary = self.get_summary(get_auth_client, board)
+
+        assert summary['total'] == 5
+        assert summary['overdue'] == 0
+        assert summary['by_status'] == {'1': 3, '2': 0, '3': 2}
+        assert summary['by_priority'] == {'1': 3, '2': 0, '3': 1, '4': 1}
+        assert sorted((category['id'], category['total']) for category in summary['categories']) == [
+            (first.id, 4), (second.id, 1)]
+        # Доска, роли, категории, счетчики и просроченные цели
+        assert len(queries) == 5
+
+    def test_overdue(self, get_auth_client, board, categories):
+        """Просроченные - не выполненные цели со сроком в прошлом"""
+        GoalFactory(category=categories[0], status=Goal.Status.to_do, due_date=date.today() - timedelta(days=1))
+        GoalFactory(category=categories[0], status=Goal.Status.to_do, due_date=date.today())
+        GoalFactory(category=categories[1], status=Goal.Status.archived, due_date=date.today() - timedelta(days=1))
+
+        summary = self.get_summary(get_auth_client, board)
+
+        assert summary['overdue'] == 1
+        assert {category['id']: category['overdue'] for category in summary['categories']} == {
+            categories[0].id: 1, categories[1].id: 0}
+
+    def test_rebuild(self, categories):
+        """Пересчет счетчиков совпадает с агрегатом по целям"""
+        GoalFactory.create_batch(8, category=categories[0])
+        Goal.objects.filter(status=Goal.Status.to_do).delete()
+        rebuild_goal_counters()
+
+        assert not GoalCounter.objects.filter(count=0).exists()
+        expected = dict(Goal.objects.values_list('status').annotate(Count('id')))
+        assert {status: GoalCounter.objects.filter(status=status).get().count for status in expected} == expected
+
+    def test_counter_rows(self, categories):
+        """Одна строка на ключ счетчика, строки с нулевым количеством удаляются"""
+        goals = GoalFactory.create_batch(3, category=categories[0], status=Goal.Status.to_do,
+                                         priority=Goal.Priority.low, due_date=date.today())
+        Goal.objects.filter(id=goals[0].id).update(due_date=None)
+        assert list(GoalCounter.objects.values_list('status', 'count')) == [(Goal.Status.to_do, 3)]
+
+        Goal.objects.filter(category=categories[0]).update(status=Goal.Status.done)
+        assert list(GoalCounter.objects.values_list('status', 'count')) == [(Goal.Status.done, 3)]
+
+        Goal.objects.all().delete()
+        assert not GoalCounter.objects.exists()
+
+    def test_not_participant(self, get_auth_client, board):
+        response = get_auth_client.get(reverse('apps.goals:board_summary', kwargs={'pk': board.pk}))
+        assert response.status_code == 403
@@ -0,0 +1,72 @@
+import threading
+import time
+
+from apps.bot.management._dispatcher import UpdateDispatcher
+from apps.bot.tg.dc import UpdateObj
+
+
+def make_update(update_id: int, chat_id: int) -> UpdateObj:
+    return UpdateObj.parse_obj({
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Test'},
+            'chat': {'id': chat_id, 'type': 'private'},
+            'date': 0,
+            'text': f'/goals {update_id}',
+        },
+    })
+
+
+class TestUpdateDispatcher:
+
+    def test_chat_updates_processed_in_order(self):
+        """Обновления одного чата обрабатываются в порядке поступления"""
+        processed: dict[int, list[int]] = {}
+        lock = threading.Lock()
+
+        def handler(item: UpdateObj) -> None:
+            time.sleep(0.001)
+            with lock:
+                processed.setdefault(item.message.chat.id, []).append(item.update_id)
+
+        dispatcher = UpdateDispatcher(handler, max_workers=4)
+        for update_id in range(60):
+            dispatcher.submit(make_update(update_id, chat_id=update_id % 3))
+        dispatcher.shutdown()
+
+        assert processed == {chat_id: list(range(chat_id, 60, 3)) for chat_id in range(3)}
+
+    def test_slow_chat_does_not_block_others(self):
+        """Медленная обработка одного чата не задерживает остальные"""
+        release = threading.Event()
+        fast_done = threading.Event()
+
+        def handler(item: UpdateObj) -> None:
+            if item.message.chat.id == 1:
+                release.wait(timeout=5)
+            else:
+                fast_done.set()
+
+        dispatcher = UpdateDispatcher(handler, max_workers=2)
+        dispatcher.submit(make_update(1, chat_id=1))
+        dispatcher.submit(make_update(2, chat_id=2))
+        assert fast_done.wait(timeout=5)
+        release.set()
+        dispatcher.shutdown()
+
+    def test_handler_errors_are_isolated(self):
+        """Ошибка обработки одного обновления не останавливает очередь чата"""
+        processed = []
+
+        def handler(item: UpdateObj) -> None:
+            if item.update_id == 1:
+                raise RuntimeError('boom')
+            processed.append(item.update_id)
+
+        dispatcher = UpdateDispatcher(handler, max_workers=1)
+        for update_id in range(3):
+            dispatcher.submit(make_update(update_id, chat_id=1))
+        dispatcher.shutdown()
+
+        assert processed == [0, 2]
@@ -0,0 +1,71 @@
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from django.utils import timezone
+
+from apps.bot.management._state import VerifiedUserState
+from apps.bot.models import TgChatState, TgUser
+from apps.bot.state_store import CacheChatStateStore, DatabaseChatStateStore
+from apps.bot.tg.dc import Message
+from apps.goals.models import Goal
+
+
+def make_message(chat_id: int, text: str) -> Message:
+    return Message.parse_obj({
+        'message_id': 1,
+        'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Test'},
+        'chat': {'id': chat_id, 'type': 'private'},
+        'date': 0,
+        'text': text,
+    })
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('store_class', [DatabaseChatStateStore, CacheChatStateStore])
+def test_state_store(store_class):
+    """Состояние сохраняется по чату и удаляется"""
+    store = store_class(ttl=60)
+    store.set(1, {'category_id': 5})
+    assert store.get(1) == {'category_id': 5}
+    assert store.get(2) == {}
+    store.delete(1)
+    assert store.get(1) == {}
+
+
+@pytest.mark.django_db
+def test_database_state_expires():
+    """Просроченное состояние не возвращается"""
+    store = DatabaseChatStateStore(ttl=60)
+    store.set(1, {'category_id': 5})
+    TgChatState.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+    assert store.get(1) == {}
+
+
+@pytest.mark.django_db
+class TestVerifiedUserState:
+
+    @pytest.fixture
+    def tg_user(self, user, board_participant, goal_category):
+        return TgUser.objects.create(telegram_chat_id=10, telegram_user_ud='10', user=user)
+
+    def run(self, tg_user: TgUser, text: str) -> MagicMock:
+        tg_client = MagicMock()
+        VerifiedUserState(tg_user=tg_user, tg_client=tg_client, message=make_message(10, text)).run()
+        return tg_client
+
+    def test_create_goal_flow(self, tg_user, goal_category):
+        """Выбор категории и создание цели в ней, состояние хранится между сообщениями"""
+        self.run(tg_user, f'/{goal_category.title}')
+        assert DatabaseChatStateStore().get(10) == {'category_id': goal_category.id}
+
+        self.run(tg_user, 'Новая цель')
+        assert Goal.objects.filter(title='Новая цель', category=goal_category, user=tg_user.user).exists()
+        assert DatabaseChatStateStore().get(10) == {}
+
+    def test_cancel(self, tg_user, goal_category):
+        """Команда /cancel сбрасывает создание цели"""
+        self.run(tg_user, f'/{goal_category.title}')
+        self.run(tg_user, '/cancel')
+        self.run(tg_user, 'Новая цель')
+        assert not Goal.objects.filter(title='Новая цель').exists()
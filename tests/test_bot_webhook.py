@@ -0,0 +1,79 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.db import DatabaseError
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.bot.management._dispatcher import process_stored_update
+from apps.bot.models import TgUpdate
+from apps.bot.tg.dc import UpdateObj
+from apps.bot.webhook import pending_updates
+
+
+@pytest.mark.django_db
+class TestBotWebhook:
+    url = reverse('apps.bot:bot_webhook')
+
+    @staticmethod
+    def make_update(update_id: int = 100, chat_id: int = 1) -> dict:
+        return {
+            'update_id': update_id,
+            'message': {
+                'message_id': update_id,
+                'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Test'},
+                'chat': {'id': chat_id, 'type': 'private'},
+                'date': 0,
+                'text': '/goals',
+            },
+        }
+
+    @pytest.fixture(autouse=True)
+    def secret(self, settings):
+        settings.BOT_WEBHOOK_SECRET = 'secret'
+
+    def post(self, client, data: dict, secret: str = 'secret'):
+        return client.post(self.url, data=data, format='json', HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN=secret)
+
+    def test_wrong_secret(self, client):
+        """Обновления без верного секрета отклоняются"""
+        response = self.post(client, self.make_update(), secret='wrong')
+        assert response.status_code == 403
+        assert not TgUpdate.objects.exists()
+
+    def test_update_stored_once(self, client):
+        """Обновление сохраняется в очередь до ответа, повторная доставка отбрасывается"""
+        assert self.post(client, self.make_update()).status_code == 200
+        assert self.post(client, self.make_update()).status_code == 200
+
+        [update] = pending_updates()
+        assert update.update_id == 100
+        assert UpdateObj.parse_obj(update.payload).message.text == '/goals'
+
+    def test_store_error_is_not_acknowledged(self):
+        """Если обновление не сохранено, Telegram получает ошибку и доставит его повторно"""
+        client = APIClient(raise_request_exception=False)
+        with patch('apps.bot.views.store_update', side_effect=DatabaseError):
+            assert self.post(client, self.make_update()).status_code == 500
+
+    def test_update_without_message(self, client):
+        """Обновления без сообщения принимаются, но не сохраняются"""
+        response = self.post(client, {'update_id': 101, 'edited_message': {}})
+        assert response.status_code == 200
+        assert not TgUpdate.objects.exists()
+
+    def test_invalid_update(self, client):
+        response = self.post(client, {'message': 'invalid'})
+        assert response.status_code == 400
+
+    def test_pending_updates_in_order(self, client):
+        """runbot получает необработанные обновления по порядку, обработанные исключаются"""
+        for update_id in (103, 101, 102):
+            self.post(client, self.make_update(update_id))
+        assert [update.update_id for update in pending_updates()] == [101, 102, 103]
+        assert [update.update_id for update in pending_updates(after_id=101)] == [102, 103]
+
+        with patch('apps.bot.management._dispatcher.process_update', side_effect=RuntimeError):
+            with pytest.raises(RuntimeError):
+                process_stored_update(UpdateObj.parse_obj(self.make_update(101)), tg_client=MagicMock())
+        assert [update.update_id for update in pending_updates()] == [102, 103]
@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.goals.models import BoardParticipant, Goal
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    @pytest.fixture
+    def goals(self, user, board_participant, goal_category, goal_factory):
+        board_participant.role = BoardParticipant.Role.owner
+        board_participant.save()
+        return goal_factory.create_batch(3, category=goal_category, user=user, status=Goal.Status.to_do)
+
+    def test_list_not_modified(self, get_auth_client, goals):
+        """Повторный запрос списка с ETag возвращает 304 по агрегатному запросу без сериализации"""
+        url = reverse('apps.goals:goal_list')
+        response = get_auth_client.get(url)
+        assert response.status_code == 200
+        assert response['Cache-Control'] == 'private, no-cache'
+        assert not response.has_header('Last-Modified')
+
+        with CaptureQueriesContext(connection) as queries:
+            not_modified = get_auth_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert not_modified.status_code == 304
+        assert not_modified['ETag'] == response['ETag']
+        # Роли пользователя на досках и агрегат
+        assert len(queries) == 2
+
+    @pytest.mark.parametrize('change', ['update', 'archive', 'create'])
+    def test_list_modified(self, get_auth_client, goals, goal_factory, change):
+        """Изменение, архивирование или создание цели меняет ETag списка"""
+        url = reverse('apps.goals:goal_list')
+        etag = get_auth_client.get(url)['ETag']
+        if change == 'update':
+            response = get_auth_client.patch(reverse('apps.goals:goal', kwargs={'pk': goals[0].pk}), data={'title': 'new'})
+            assert response.status_code == 200
+        elif change == 'archive':
+            response = get_auth_client.delete(reverse('apps.goals:goal', kwargs={'pk': goals[0].pk}))
+            assert response.status_code == 204
+        else:
+            goal_factory(category=goals[0].category, status=Goal.Status.to_do)
+
+        response = get_auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_archive_touches_goal(self, get_auth_client, goals):
+        """Архивирование через API обновляет updated цели"""
+        updated = goals[0].updated
+        get_auth_client.delete(reverse('apps.goals:goal', kwargs={'pk': goals[0].pk}))
+        goals[0].refresh_from_db()
+        assert goals[0].status == Goal.Status.archived
+        assert goals[0].updated > updated
+
+    def test_list_etag_depends_on_query(self, get_auth_client, goals):
+        url = reverse('apps.goals:goal_list')
+        etag = get_auth_client.get(url)['ETag']
+        assert get_auth_client.get(url, {'ordering': 'created'}, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_detail_not_modified(self, get_auth_client, goals):
+        """Детальное представление: 304 по ETag и по If-Modified-Since"""
+        url = reverse('apps.goals:goal', kwargs={'pk': goals[0].pk})
+        response = get_auth_client.get(url)
+        assert get_auth_client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 304
+        assert get_auth_client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code == 304
+
+        assert get_auth_client.patch(url, data={'title': 'new'}).status_code == 200
+        assert get_auth_client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 200
@@ -0,0 +1,50 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.goals.models import BoardParticipant, Goal, GoalComment
+from tests.factories import BoardFactory, GoalCategoryFactory, GoalCommentFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestDenormalizedBoard:
+
+    @pytest.fixture
+    def goal(self, user, board, goal_category):
+        goal = GoalFactory(category=goal_category, user=user, status=Goal.Status.to_do)
+        GoalCommentFactory.create_batch(2, goal=goal, user=user)
+        return goal
+
+    def test_created_with_board(self, goal, board):
+        assert Goal.objects.get(pk=goal.pk).board_id == board.id
+        assert set(GoalComment.objects.values_list('board_id', flat=True)) == {board.id}
+
+    def test_goal_moved_to_other_board(self, goal):
+        """Перенос цели в категорию другой доски меняет доску цели и ее комментариев"""
+        other_category = GoalCategoryFactory(board=BoardFactory())
+        goal.category = other_category
+        goal.save()
+
+        assert goal.board_id == other_category.board_id
+        assert Goal.objects.get(pk=goal.pk).board_id == other_category.board_id
+        assert set(GoalComment.objects.values_list('board_id', flat=True)) == {other_category.board_id}
+
+    def test_category_moved_to_other_board(self, goal, goal_category):
+        """Перенос категории на другую доску меняет доску ее целей и комментариев, в т.ч. через update()"""
+        other_board = BoardFactory()
+        type(goal_category).objects.filter(pk=goal_category.pk).update(board=other_board)
+
+        assert Goal.objects.get(pk=goal.pk).board_id == other_board.id
+        assert set(GoalComment.objects.values_list('board_id', flat=True)) == {other_board.id}
+
+    def test_goal_detail_queries(self, get_auth_client, user, board, board_participant_factory, goal):
+        """Проверка прав на цель не загружает категорию и доску"""
+        board_participant_factory(board=board, user=user, role=BoardParticipant.Role.owner)
+        url = reverse('apps.goals:goal', kwargs={'pk': goal.pk})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = get_auth_client.patch(url, data={'title': 'new'})
+
+        assert response.status_code == 200
+        assert not [query for query in queries if 'FROM "goals_goalcategory"' in query['sql']]
@@ -0,0 +1,90 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.goals.models import BoardParticipant, Goal
+from tests.factories import BoardFactory, BoardParticipantFactory, GoalCategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestGoalBatch:
+
+    @pytest.fixture
+    def categories(self, user):
+        """Категории на двух досках, где пользователь редактор, и на доске, где он читатель"""
+        categories = []
+        for role in (BoardParticipant.Role.owner, BoardParticipant.Role.writer, BoardParticipant.Role.reader):
+            board = BoardFactory()
+            BoardParticipantFactory(board=board, user=user, role=role)
+            categories.append(GoalCategoryFactory(board=board, user=user))
+        return categories
+
+    def test_batch_create(self, get_auth_client, categories):
+        """Цели создаются одним запросом, ошибки возвращаются по каждой цели"""
+        owner_category, writer_category, reader_category = categories
+        goals = [{'title': f'goal {number}', 'category': owner_category.id} for number in range(20)]
+        goals += [
+            {'title': 'writer goal', 'category': writer_category.id, 'priority': Goal.Priority.hight},
+            {'title': 'reader goal', 'category': reader_category.id},
+            {'title': 'missing category', 'category': 0},
+            {'category': owner_category.id},
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = get_auth_client.post(reverse('apps.goals:batch_create_goal'), data={'goals': goals},
+                                            format='json')
+
+        assert response.status_code == 200
+        results = response.data['results']
+        assert [result['ok'] for result in results] == [True] * 21 + [False] * 3
+        assert results[21]['errors'] == {'detail': ['You do not have permission to perform this action.']}
+        assert results[22]['errors'] == {'category': ['Not found.']}
+        assert 'title' in results[23]['errors']
+        assert Goal.objects.filter(category=owner_category).count() == 20
+        assert Goal.objects.get(id=results[20]['id']).priority == Goal.Priority.hight
+        # Категории, роли и один INSERT в транзакции
+        assert len(queries) <= 6
+
+    def test_batch_update(self, get_auth_client, user, categories):
+        """Статус и приоритет меняются одним bulk_update, только на досках где пользователь редактор"""
+        owner_category, _, reader_category = categories
+        goals = GoalFactory.create_batch(3, category=owner_category, user=user, status=Goal.Status.to_do)
+        reader_goal = GoalFactory(category=reader_category, user=user, status=Goal.Status.to_do)
+        archived_goal = GoalFactory(category=owner_category, user=user, status=Goal.Status.archived)
+        data = [{'id': goal.id, 'status': Goal.Status.done} for goal in goals]
+        data += [
+            {'id': reader_goal.id, 'status': Goal.Status.done},
+            {'id': archived_goal.id, 'priority': Goal.Priority.low},
+            {'id': goals[0].id},
+        ]
+
+        response = get_auth_client.patch(reverse('apps.goals:batch_update_goal'), data={'goals': data},
+                                         format='json')
+
+        assert response.status_code == 200
+        assert [result['ok'] for result in response.data['results']] == [True] * 3 + [False] * 3
+        assert set(Goal.objects.filter(id__in=[goal.id for goal in goals]).values_list('status', flat=True)) == {
+            Goal.Status.done}
+        assert Goal.objects.get(id=reader_goal.id).status == Goal.Status.to_do
+
+    def test_batch_archive(self, get_auth_client, user, categories):
+        """Цели архивируются одним UPDATE, чужие цели не найдены"""
+        owner_category = categories[0]
+        goals = GoalFactory.create_batch(3, category=owner_category, user=user, status=Goal.Status.to_do)
+        foreign_goal = GoalFactory(status=Goal.Status.to_do)
+        ids = [goal.id for goal in goals] + [foreign_goal.id]
+
+        response = get_auth_client.post(reverse('apps.goals:batch_archive_goal'), data={'ids': ids}, format='json')
+
+        assert response.status_code == 200
+        assert response.data['results'][3] == {'index': 3, 'id': foreign_goal.id, 'ok': False,
+                                               'errors': {'id': ['Not found.']}}
+        assert Goal.objects.filter(status=Goal.Status.archived).count() == 3
+
+    def test_batch_size_limit(self, get_auth_client, settings):
+        """Размер пакета ограничен GOALS_BATCH_MAX_SIZE"""
+        settings.GOALS_BATCH_MAX_SIZE = 2
+        response = get_auth_client.post(reverse('apps.goals:batch_archive_goal'), data={'ids': [1, 2, 3]},
+                                        format='json')
+        assert response.status_code == 400
@@ -0,0 +1,39 @@
+from datetime import date
+
+import pytest
+from django.urls import reverse
+
+from apps.goals.lean import LeanSerializer
+from apps.goals.models import Goal, GoalCategory
+from apps.goals.serializer import GoalCategorySerializer, GoalSerializer
+from tests.factories import GoalFactory
+
+
+@pytest.mark.django_db
+class TestLeanSerializer:
+
+    @pytest.fixture
+    def goals(self, user, board_participant, goal_category):
+        GoalFactory(user=user, category=goal_category, status=Goal.Status.to_do, due_date=date(2030, 1, 1),
+                    title='Купить билеты', description=None)
+        return GoalFactory.create_batch(5, user=user, category=goal_category, status=Goal.Status.in_progress)
+
+    @pytest.mark.parametrize('model, serializer_class', [(Goal, GoalSerializer),
+                                                         (GoalCategory, GoalCategorySerializer)])
+    def test_same_representation(self, goals, model, serializer_class):
+        """JSON совпадает с ModelSerializer, включая даты и вложенного пользователя"""
+        queryset = model.objects.select_related('user').order_by('id')
+        lean = LeanSerializer(serializer_class)
+        assert lean.to_representation(lean.values(queryset)) == serializer_class(queryset, many=True).data
+
+    @pytest.mark.parametrize('params', [{}, {'limit': 2, 'offset': 1}, {'pagination': 'cursor', 'limit': 2},
+                                        {'search': 'купить'}, {'ordering': '-created'}])
+    def test_same_response(self, get_auth_client, goals, settings, params):
+        """Ответ списка не зависит от способа сериализации"""
+        url = reverse('apps.goals:goal_list')
+        lean = get_auth_client.get(url, params)
+        settings.GOALS_LEAN_LISTS = False
+        full = get_auth_client.get(url, params)
+
+        assert lean.status_code == 200
+        assert lean.json() == full.json()
@@ -0,0 +1,57 @@
+import logging
+
+import pytest
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from apps.goals.membership import EDITOR_ROLES, get_board_roles, has_board_role
+from apps.goals.models import BoardParticipant
+
+logger = logging.getLogger('main')
+
+
+@pytest.fixture
+def roles_request(user):
+    request = RequestFactory().get('/')
+    request.user = user
+    return request
+
+
+@pytest.mark.django_db
+class TestBoardRoles:
+
+    def test_roles_loaded_once_per_request(self, roles_request, board_participant, django_assert_num_queries):
+        """Роли пользователя загружаются одним запросом и переиспользуются в рамках запроса"""
+        with django_assert_num_queries(1):
+            assert get_board_roles(roles_request) == {board_participant.board_id: board_participant.role}
+            assert has_board_role(roles_request, board_participant.board_id)
+            assert not has_board_role(roles_request, board_participant.board_id + 1)
+
+    @pytest.mark.parametrize('role', [1, 2, 3])
+    def test_editor_roles(self, roles_request, board_participant, role):
+        """Редактировать могут только владелец и редактор"""
+        board_participant.role = role
+        board_participant.save()
+        assert has_board_role(roles_request, board_participant.board_id, EDITOR_ROLES) == (role in EDITOR_ROLES)
+
+    def test_cross_request_cache_invalidation(self, settings, user, board_participant, board_factory,
+                                              django_assert_num_queries):
+        """Межзапросный кеш сбрасывается при изменении участников доски"""
+        settings.BOARD_ROLES_CACHE_TIMEOUT = 60
+        cache.clear()
+        request_factory = RequestFactory()
+
+        first = request_factory.get('/')
+        first.user = user
+        get_board_roles(first)
+
+        second = request_factory.get('/')
+        second.user = user
+        with django_assert_num_queries(0):
+            assert board_participant.board_id in get_board_roles(second)
+
+        new_board = board_factory()
+        BoardParticipant.objects.create(board=new_board, user=user, role=BoardParticipant.Role.reader)
+        third = request_factory.get('/')
+        third.user = user
+        assert get_board_roles(third)[new_board.id] == BoardParticipant.Role.reader
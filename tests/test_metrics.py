@@ -0,0 +1,127 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from django.urls import reverse
+from prometheus_client import REGISTRY, CollectorRegistry, Gauge
+
+from apps.bot.management._dispatcher import UpdateDispatcher, process_update
+from apps.bot.tg.client import TgClient
+from apps.bot.tg.sender import MessageQueue
+from apps.core import metrics
+from tests.test_bot_dispatcher import make_update
+from tests.test_tg_client import make_response
+from tests.test_tg_sender import make_client
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.django_db
+class TestRequestMetrics:
+    route = 'goals/goal/list'
+
+    def test_latency_and_queries_by_route(self, get_auth_client):
+        labels = {'route': self.route, 'method': 'GET', 'status': '200'}
+        requests_before = sample('todolist_http_request_duration_seconds_count', **labels)
+        queries_before = sample('todolist_db_queries_total', route=self.route)
+
+        get_auth_client.get(reverse('apps.goals:goal_list'))
+
+        assert sample('todolist_http_request_duration_seconds_count', **labels) == requests_before + 1
+        assert sample('todolist_db_queries_total', route=self.route) > queries_before
+
+    def test_disabled(self, settings, get_auth_client):
+        settings.METRICS_ENABLED = False
+        labels = {'route': self.route, 'method': 'GET', 'status': '200'}
+        before = sample('todolist_http_request_duration_seconds_count', **labels)
+
+        get_auth_client.get(reverse('apps.goals:goal_list'))
+
+        assert sample('todolist_http_request_duration_seconds_count', **labels) == before
+
+    def test_endpoint(self, client):
+        response = client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        assert b'todolist_http_request_duration_seconds' in response.content
+        assert b'todolist_telegram_api_errors_total' in response.content
+
+    def test_endpoint_rejects_external(self, client):
+        response = client.get('/metrics', REMOTE_ADDR='203.0.113.5')
+
+        assert response.status_code == 403
+
+    def test_endpoint_rejects_proxied(self, client):
+        response = client.get('/metrics', HTTP_X_FORWARDED_FOR='203.0.113.5', HTTP_X_REAL_IP='203.0.113.5')
+
+        assert response.status_code == 403
+
+    def test_endpoint_allows_network(self, client, settings):
+        settings.METRICS_ALLOWED_IPS = ['127.0.0.1', '172.16.0.0/12']
+
+        response = client.get('/metrics', REMOTE_ADDR='172.18.0.5')
+
+        assert response.status_code == 200
+
+
+class TestBotMetrics:
+    def test_telegram_api_errors(self):
+        tg_client = TgClient('token', max_retries=0)
+        tg_client.session = MagicMock()
+        tg_client.session.request.side_effect = [
+            make_response(400, {'ok': False, 'error_code': 400, 'description': 'Bad Request'}),
+            requests.ConnectionError(),
+        ]
+        before = {reason: sample('todolist_telegram_api_errors_total', method='sendMessage', reason=reason)
+                  for reason in ('400', 'network')}
+
+        tg_client.send_message(chat_id=1, text='Hi')
+        with pytest.raises(requests.ConnectionError):
+            tg_client.send_message(chat_id=1, text='Hi')
+
+        for reason, value in before.items():
+            assert sample('todolist_telegram_api_errors_total', method='sendMessage', reason=reason) == value + 1
+
+    def test_update_lag(self):
+        update = make_update(1, chat_id=1)
+        update.message.date = int(time.time()) - 30
+        with patch('apps.bot.management._dispatcher.Chat'):
+            process_update(update, tg_client=MagicMock())
+
+        assert 29 <= sample('todolist_bot_update_lag_seconds') <= 31
+
+    def test_queue_depth(self):
+        # Отдельный реестр: фоновые обработчики других тестов не меняют значения
+        registry = CollectorRegistry()
+        gauge = Gauge('todolist_bot_queue_depth', 'depth', ['queue'], registry=registry)
+
+        def depth(queue: str) -> float:
+            return registry.get_sample_value('todolist_bot_queue_depth', {'queue': queue}) or 0
+
+        with patch.object(metrics, 'BOT_QUEUE_DEPTH', gauge):
+            dispatcher = UpdateDispatcher(lambda item: time.sleep(0.05), max_workers=2)
+            dispatcher.submit(make_update(1, chat_id=1))
+            assert depth('updates') == 1
+            dispatcher.shutdown()
+            assert depth('updates') == 0
+
+            queue = MessageQueue(make_client(), chat_rate=100, global_rate=100)
+            for _ in range(3):
+                queue.send_message(chat_id=1, text='Hi')
+            assert depth('messages') == 3
+            queue.start().stop(timeout=5)
+            assert depth('messages') == 0
+
+
+def test_multiprocess_registry(monkeypatch, tmp_path):
+    """В режиме multiprocess /metrics собирает значения из файлов всех процессов"""
+    assert metrics.get_registry() is REGISTRY
+
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    registry = metrics.get_registry()
+    assert isinstance(registry, CollectorRegistry) and registry is not REGISTRY
+    assert list(registry.collect()) == []
@@ -0,0 +1,40 @@
+import logging
+
+import pytest
+from django.urls import reverse
+
+from apps.goals.models import Goal
+from tests.factories import GoalFactory
+
+logger = logging.getLogger('main')
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    url = reverse('apps.goals:goal_list')
+
+    @pytest.fixture
+    def goals(self, user, board_participant, goal_category):
+        return GoalFactory.create_batch(7, user=user, category=goal_category, status=Goal.Status.to_do)
+
+    def test_limit_offset_by_default(self, get_auth_client, goals):
+        """Без параметра pagination используется LimitOffset пагинация"""
+        response = get_auth_client.get(self.url, {'limit': 3, 'offset': 3})
+        assert response.status_code == 200
+        assert response.data['count'] == len(goals)
+        assert len(response.data['results']) == 3
+
+    def test_keyset_pages(self, get_auth_client, goals):
+        """Keyset-пагинация проходит все цели по порядку без пропусков и повторов"""
+        response = get_auth_client.get(self.url, {'pagination': 'cursor', 'limit': 3})
+        ids = []
+        while True:
+            assert response.status_code == 200
+            assert 'count' not in response.data
+            ids += [goal['id'] for goal in response.data['results']]
+            if not response.data['next']:
+                break
+            response = get_auth_client.get(response.data['next'])
+
+        expected = sorted(goals, key=lambda goal: (goal.title, goal.id))
+        assert ids == [goal.id for goal in expected]
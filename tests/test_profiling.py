@@ -0,0 +1,104 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework import serializers
+
+from apps.core.middleware import ProfilingMiddleware
+from apps.core.profiling import timed_serializer_class
+from apps.core.models import User
+from apps.goals.models import BoardParticipant
+from apps.goals.serializer import GoalSerializer
+
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+    url = reverse('apps.goals:goal_list')
+
+    @pytest.fixture
+    def record(self):
+        with patch('apps.core.profiling.record') as record:
+            yield record
+
+    def test_not_sampled(self, settings, get_auth_client, record):
+        settings.PROFILING_SAMPLE_RATE = 0
+        get_auth_client.get(self.url)
+
+        record.assert_not_called()
+
+    @pytest.mark.parametrize('lean', [True, False])
+    def test_sample(self, settings, get_auth_client, user, board_participant, goal_factory, record, lean):
+        settings.PROFILING_SAMPLE_RATE = 1
+        settings.GOALS_LEAN_LISTS = lean
+        board_participant.user, board_participant.role = user, BoardParticipant.Role.owner
+        board_participant.save()
+        goal_factory.create_batch(3, category__board=board_participant.board)
+        response = get_auth_client.get(self.url)
+
+        sample = record.call_args.args[0]
+        assert sample['view'] == 'GoalListView'
+        assert sample['method'] == 'GET'
+        assert sample['status'] == 200
+        assert sample['size'] == len(response.content)
+        assert sample['sql_count'] >= 2
+        assert sample['serializer_ms'] > 0
+        assert sample['wall_ms'] >= sample['sql_ms']
+
+    def test_detail_serializer_time(self, settings, get_auth_client, user, board_participant, goal_factory, record):
+        """Время сериализации замеряется в представлениях, классы DRF не изменяются"""
+        settings.PROFILING_SAMPLE_RATE = 1
+        board_participant.user, board_participant.role = user, BoardParticipant.Role.owner
+        board_participant.save()
+        goal = goal_factory(category__board=board_participant.board)
+        get_auth_client.get(reverse('apps.goals:goal', kwargs={'pk': goal.pk}))
+
+        assert record.call_args.args[0]['serializer_ms'] > 0
+        assert serializers.Serializer.data.fget.__module__ == 'rest_framework.serializers'
+        assert serializers.ListSerializer.data.fget.__module__ == 'rest_framework.serializers'
+        assert timed_serializer_class(GoalSerializer) is timed_serializer_class(GoalSerializer)
+        assert issubclass(timed_serializer_class(GoalSerializer), GoalSerializer)
+
+    def test_duplicate_queries(self, settings, record):
+        settings.PROFILING_SAMPLE_RATE = 1
+
+        def view(request):
+            for pk in (1, 1, 2):
+                User.objects.filter(pk=pk).exists()
+            return HttpResponse('ok')
+
+        ProfilingMiddleware(view)(RequestFactory().get('/'))
+
+        sample = record.call_args.args[0]
+        assert sample['sql_count'] == 3
+        assert sample['duplicates'] == 1
+        assert sample['similar'] == 3
+        assert sample['similar_sql'].startswith('SELECT')
+
+
+class TestProfileReport:
+    @staticmethod
+    def sample(view: str, wall_ms: float, sql_count: int = 1) -> dict:
+        return {'view': view, 'method': 'GET', 'path': '/', 'status': 200, 'wall_ms': wall_ms,
+                'sql_count': sql_count, 'sql_ms': 1.0, 'serializer_ms': 0.5, 'size': 100,
+                'duplicates': 0, 'similar': sql_count, 'similar_sql': 'SELECT 1' if sql_count > 1 else None}
+
+    def test_ranking(self, tmp_path, capsys):
+        log = tmp_path / 'profiling.log'
+        # Быстрое, но частое представление тратит больше времени сервера, чем редкое медленное
+        samples = [self.sample('SlowView', 50)] + [self.sample('HotView', 10, sql_count=5)] * 10
+        log.write_text('\n'.join(json.dumps(sample) for sample in samples[:6]) + '\nnot json\n')
+        (tmp_path / 'profiling.log.1').write_text('\n'.join(json.dumps(sample) for sample in samples[6:]))
+
+        call_command('profile_report', file=str(log))
+        lines = capsys.readouterr().out.splitlines()
+
+        assert lines[1].split()[:4] == ['HotView', 'GET', '10', '100.0']
+        assert lines[2].strip() == '5x SELECT 1'
+        assert lines[3].split()[:4] == ['SlowView', 'GET', '1', '50.0']
+
+        call_command('profile_report', file=str(log), sort='p95')
+        assert capsys.readouterr().out.splitlines()[1].startswith('SlowView')
@@ -0,0 +1,161 @@
+from unittest.mock import patch
+
+import pytest
+from django.urls import URLPattern, reverse
+
+from apps.bot.models import TgUser
+from apps.bot.urls import urlpatterns as bot_urls
+from apps.core.middleware import get_query_budget
+from apps.core.urls import urlpatterns as core_urls
+from apps.goals.models import ArchiveJob, BoardParticipant, Goal
+from apps.goals.urls import urlpatterns as goals_urls
+from tests.factories import GoalCategoryFactory, GoalCommentFactory, GoalFactory
+
+PASSWORD = 'Str0ng-password'
+
+
+def view_methods(pattern: URLPattern) -> list[str]:
+    view_class = pattern.callback.view_class
+    return [method.upper() for method in view_class.http_method_names
+            if method not in ('head', 'options', 'trace') and hasattr(view_class, method)]
+
+
+@pytest.mark.parametrize('pattern', [*goals_urls, *core_urls, *bot_urls], ids=lambda pattern: pattern.name)
+def test_every_route_has_budget(pattern):
+    """У каждого представления объявлен бюджет SQL-запросов для всех его методов"""
+    for method in view_methods(pattern):
+        assert get_query_budget(pattern.callback.view_class, method) is not None, f'{pattern.name} {method}'
+
+
+@pytest.mark.django_db
+class TestRouteBudgets:
+    """Запрос к каждому маршруту: при превышении бюджета middleware выбрасывает QueryBudgetExceeded"""
+
+    @pytest.fixture
+    def data(self, user, board, board_participant_factory, goal_category, user_factory):
+        """Несколько строк в каждом списке и связи: N+1 в представлении превышает бюджет"""
+        user.set_password(PASSWORD)
+        user.save()
+        board_participant_factory(board=board, user=user, role=BoardParticipant.Role.owner)
+        participants = [board_participant_factory(board=board, role=role)
+                        for role in (BoardParticipant.Role.writer, BoardParticipant.Role.reader)]
+        for role in (BoardParticipant.Role.writer, BoardParticipant.Role.reader):
+            other = board_participant_factory(user=user, role=role).board
+            board_participant_factory.create_batch(2, board=other, role=BoardParticipant.Role.reader)
+        categories = [goal_category, *GoalCategoryFactory.create_batch(2, board=board, user=user)]
+        goals = [GoalFactory(category=category, user=user, status=Goal.Status.to_do)
+                 for category in categories for _ in range(5)]
+        comments = [GoalCommentFactory(goal=goal, user=user) for goal in goals[:5] for _ in range(3)]
+        return {
+            'board': board,
+            'category': goal_category,
+            'goal': goals[0],
+            'comment': comments[0],
+            'participants': participants,
+            'new_user': user_factory(username='budget_new_user'),
+            'job': ArchiveJob.objects.create(board=board, user=user),
+            'tg_user': TgUser.objects.create(telegram_chat_id=1, telegram_user_ud='1', verification_code='code'),
+        }
+
+    @pytest.fixture(autouse=True)
+    def debug(self, settings):
+        settings.DEBUG = True
+        settings.BOT_WEBHOOK_SECRET = 'secret'
+
+    @pytest.mark.parametrize('name, method, kwargs, body', [
+        ('create_board', 'post', None, lambda data: {'title': 'board'}),
+        ('board_list', 'get', None, None),
+        ('board_list', 'get', None, lambda data: {'limit': 1}),
+        ('board', 'get', 'board', None),
+        ('board', 'patch', 'board', lambda data: {'title': 'new'}),
+        ('board', 'put', 'board', lambda data: {'title': 'new', 'participants': [
+            {'user': data['participants'][0].user.username, 'role': BoardParticipant.Role.reader},
+            {'user': data['new_user'].username, 'role': BoardParticipant.Role.writer},
+        ]}),
+        ('board', 'delete', 'board', None),
+        ('board_summary', 'get', 'board', None),
+        ('archive_job', 'get', 'job', None),
+        ('create_category', 'post', None, lambda data: {'title': 'category', 'board': data['board'].id}),
+        ('category_list', 'get', None, None),
+        ('category_list', 'get', None, lambda data: {'limit': 2}),
+        ('category_list', 'get', None, lambda data: {'pagination': 'cursor', 'limit': 2}),
+        ('goal_category', 'get', 'category', None),
+        ('goal_category', 'patch', 'category', lambda data: {'title': 'new'}),
+        ('goal_category', 'delete', 'category', None),
+        ('create_goal', 'post', None, lambda data: {'title': 'goal', 'category': data['category'].id}),
+        ('goal_list', 'get', None, None),
+        ('goal_list', 'get', None, lambda data: {'limit': 2}),
+        ('goal_list', 'get', None, lambda data: {'pagination': 'cursor', 'limit': 2}),
+        ('goal_list', 'get', None, lambda data: {'search': data['goal'].title, 'status__in': '1,2',
+                                                 'category__in': f'{data["category"].id},0'}),
+        ('goal_list', 'get', None, lambda data: {'category': data['category'].id, 'limit': 2}),
+        ('goal', 'get', 'goal', None),
+        ('goal', 'patch', 'goal', lambda data: {'title': 'new'}),
+        ('goal', 'delete', 'goal', None),
+        ('batch_create_goal', 'post', None,
+         lambda data: {'goals': [{'title': f'goal {index}', 'category': data['category'].id} for index in range(5)]}),
+        ('batch_update_goal', 'patch', None,
+         lambda data: {'goals': [{'id': goal_id, 'status': 2} for goal_id in data['category'].goals.values_list('id', flat=True)]}),
+        ('batch_archive_goal', 'post', None, lambda data: {'ids': list(data['category'].goals.values_list('id', flat=True))}),
+        ('create_comment', 'post', None, lambda data: {'text': 'comment', 'goal': data['goal'].id}),
+        ('comment_list', 'get', None, None),
+        ('comment_list', 'get', None, lambda data: {'goal': data['goal'].id, 'limit': 2}),
+        ('comment', 'get', 'comment', None),
+        ('comment', 'patch', 'comment', lambda data: {'text': 'new'}),
+        ('comment', 'delete', 'comment', None),
+        ('profile', 'get', None, None),
+        ('profile', 'patch', None, lambda data: {'first_name': 'Name'}),
+        ('profile', 'delete', None, None),
+        ('update_password', 'patch', None, lambda data: {'old_password': PASSWORD, 'new_password': PASSWORD + '1'}),
+        ('bot_verify', 'patch', None, lambda data: {'verification_code': 'code'}),
+    ])
+    def test_route(self, client, user, data, name, method, kwargs, body):
+        # Вход через сессию, как у клиентов: загрузка сессии и пользователя входит в бюджет
+        client.force_login(user)
+        namespace = 'apps.bot' if name.startswith('bot_') else 'apps.core' if name in (
+            'profile', 'update_password') else 'apps.goals'
+        url = reverse(f'{namespace}:{name}', kwargs={'pk': data[kwargs].pk} if kwargs else None)
+        with patch('apps.bot.views.TgClient'):
+            response = getattr(client, method)(url, data=body(data) if body else None, format='json')
+
+        assert response.status_code < 400, response.content
+        assert int(response['X-Query-Count']) <= int(response['X-Query-Budget'])
+
+    @pytest.mark.parametrize('name, kwargs', [('board', 'board'), ('goal_category', 'category')])
+    def test_async_archive(self, settings, client, user, data, name, kwargs):
+        """Удаление с архивированием фоновой задачей: подсчет целей и создание задачи"""
+        settings.GOALS_ARCHIVE_ASYNC = True
+        client.force_login(user)
+        response = client.delete(reverse(f'apps.goals:{name}', kwargs={'pk': data[kwargs].pk}))
+
+        assert response.status_code == 202
+        assert int(response['X-Query-Count']) <= int(response['X-Query-Budget'])
+
+    @pytest.mark.parametrize('name, body', [
+        ('signup', {'username': 'new_user', 'password': PASSWORD, 'password_repeat': PASSWORD}),
+        ('login', {'username': 'budget_user', 'password': PASSWORD}),
+    ])
+    def test_anonymous_route(self, client, user_factory, name, body):
+        user = user_factory(username='budget_user')
+        user.set_password(PASSWORD)
+        user.save()
+        response = client.post(reverse(f'apps.core:{name}'), data=body, format='json')
+
+        assert response.status_code < 400, response.content
+        assert int(response['X-Query-Count']) <= int(response['X-Query-Budget'])
+
+    def test_webhook(self, client):
+        update = {
+            'update_id': 1000,
+            'message': {
+                'message_id': 1,
+                'from': {'id': 1, 'is_bot': False, 'first_name': 'Test'},
+                'chat': {'id': 1, 'type': 'private'},
+                'date': 0,
+                'text': '/goals',
+            },
+        }
+        response = client.post(reverse('apps.bot:bot_webhook'), data=update, format='json',
+                               HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN='secret')
+        assert response.status_code == 200
+        assert int(response['X-Query-Count']) <= int(response['X-Query-Budget'])
@@ -0,0 +1,180 @@
+import random
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.urls import reverse
+
+from apps.bot.management._dispatcher import process_update
+from apps.bot.models import TgUser
+from apps.bot.tg.dc import UpdateObj
+from apps.core import routers
+from apps.core.db import observe_queries
+from apps.core.middleware import PRIMARY_PIN_COOKIE
+from apps.goals.models import BoardParticipant, Goal
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = {'replica_1': 3, 'replica_2': 1}
+    routers._lag_checks.clear()
+    yield settings.DATABASE_REPLICAS
+    routers._lag_checks.clear()
+
+
+@pytest.fixture
+def lag():
+    with patch('apps.core.routers.replica_lag', return_value=0.0) as replica_lag:
+        yield replica_lag
+
+
+class TestReplicaRouter:
+    router = routers.ReplicaRouter()
+
+    def test_outside_scope(self, replicas, lag):
+        """Вне области (команды, миграции) чтения остаются на мастере"""
+        assert self.router.db_for_read(Goal) is None
+        lag.assert_not_called()
+
+    def test_replica_sticks_to_scope(self, replicas, lag):
+        with routers.replica_scope():
+            replica = self.router.db_for_read(Goal)
+            assert replica in replicas
+            assert all(self.router.db_for_read(Goal) == replica for _ in range(10))
+
+    def test_primary_after_write(self, replicas, lag):
+        """После записи чтения в той же области идут на мастер"""
+        with routers.replica_scope() as scope:
+            assert self.router.db_for_read(Goal) in replicas
+            assert self.router.db_for_write(Goal) == DEFAULT_DB_ALIAS
+            assert self.router.db_for_read(Goal) == DEFAULT_DB_ALIAS
+        assert scope.written
+
+    @pytest.mark.django_db
+    def test_primary_in_transaction(self, replicas, lag):
+        with routers.replica_scope(), transaction.atomic():
+            assert self.router.db_for_read(Goal) == DEFAULT_DB_ALIAS
+
+    def test_weighted_choice(self, replicas, lag):
+        random.seed(1)
+        chosen = [routers.choose_replica() for _ in range(4000)]
+        assert 2.5 < chosen.count('replica_1') / chosen.count('replica_2') < 3.5
+
+    @pytest.mark.parametrize('value', [30.0, None], ids=['lagging', 'unavailable'])
+    def test_lag_guard(self, settings, replicas, lag, value):
+        """Отстающая или недоступная реплика исключается, без актуальных реплик - чтение с мастера"""
+        settings.POSTGRES_REPLICA_MAX_LAG = 5
+        lag.side_effect = lambda alias: value if alias == 'replica_1' else 0.0
+        assert {routers.choose_replica() for _ in range(20)} == {'replica_2'}
+
+        lag.side_effect = lambda alias: value
+        routers._lag_checks.clear()
+        with routers.replica_scope():
+            assert self.router.db_for_read(Goal) == DEFAULT_DB_ALIAS
+
+    def test_lag_checked_once_per_interval(self, settings, replicas, lag):
+        settings.POSTGRES_REPLICA_LAG_CHECK_INTERVAL = 60
+        for _ in range(5):
+            routers.choose_replica()
+        assert lag.call_count == len(replicas)
+
+    @pytest.mark.django_db
+    def test_replica_lag_query(self):
+        """Сервер не в режиме восстановления (тестовая БД) считается актуальным"""
+        assert routers.replica_lag(DEFAULT_DB_ALIAS) == 0.0
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReplicaReads:
+    """Реплика - второе соединение с тестовой БД: транзакционный тест, чтобы оно видело данные"""
+
+    @pytest.fixture
+    def replica(self, settings):
+        connections.settings['replica_1'] = {**connection.settings_dict}
+        settings.DATABASE_REPLICAS = {'replica_1': 1}
+        routers._lag_checks.clear()
+        yield
+        routers._lag_checks.clear()
+        connections['replica_1'].close()
+        del connections['replica_1']
+        del connections.settings['replica_1']
+
+    @pytest.fixture
+    def goal(self, user, board_participant, goal_category, goal_factory):
+        board_participant.role = BoardParticipant.Role.owner
+        board_participant.save()
+        return goal_factory(category=goal_category, user=user, status=Goal.Status.to_do)
+
+    @staticmethod
+    def request(method, *args, **kwargs):
+        aliases = []
+
+        def observer(execute, sql, params, many, context):
+            aliases.append(context['connection'].alias)
+            return execute(sql, params, many, context)
+
+        with observe_queries(observer):
+            return method(*args, **kwargs), aliases
+
+    def test_list_reads_from_replica(self, client, user, goal, replica):
+        client.force_login(user)
+        response, aliases = self.request(client.get, reverse('apps.goals:goal_list'))
+        assert response.status_code == 200
+        assert response.json()[0]['id'] == goal.pk
+        assert set(aliases) == {'replica_1'}
+        assert PRIMARY_PIN_COOKIE not in response.cookies
+
+    def test_write_pins_client_to_primary(self, client, user, goal, replica):
+        """Изменяющий запрос читает и пишет на мастер, следующие запросы клиента читают с мастера"""
+        client.force_login(user)
+        url = reverse('apps.goals:goal', kwargs={'pk': goal.pk})
+        response, aliases = self.request(client.patch, url, data={'title': 'new'}, format='json')
+        assert response.status_code == 200
+        assert set(aliases) == {DEFAULT_DB_ALIAS}
+        assert PRIMARY_PIN_COOKIE in response.cookies
+
+        response, aliases = self.request(client.get, reverse('apps.goals:goal_list'))
+        assert response.json()[0]['title'] == 'new'
+        assert set(aliases) == {DEFAULT_DB_ALIAS}
+
+    @staticmethod
+    def bot_update(update_id: int, text: str) -> UpdateObj:
+        return UpdateObj.parse_obj({
+            'update_id': update_id,
+            'message': {
+                'message_id': update_id,
+                'from': {'id': 10, 'is_bot': False, 'first_name': 'Test'},
+                'chat': {'id': 10, 'type': 'private'},
+                'date': 0,
+                'text': text,
+            },
+        })
+
+    def test_bot_reads_state_from_primary(self, user, goal, replica):
+        """Обновления одного чата видят состояние, записанное предыдущим обновлением: оно читается с мастера"""
+        TgUser.objects.create(telegram_chat_id=10, telegram_user_ud='10', user=user)
+        aliases = []
+        for update_id, text in enumerate((f'/{goal.category.title}', 'Цель из бота')):
+            aliases += self.request(process_update, self.bot_update(update_id, text), tg_client=MagicMock())[1]
+
+        assert Goal.objects.filter(title='Цель из бота', category=goal.category).exists()
+        assert set(aliases) == {DEFAULT_DB_ALIAS}
+
+    def test_bot_lists_read_from_replica(self, user, goal, replica):
+        """Списки целей (/goals) и категорий (/create) бот читает с реплики, TgUser и состояние - с мастера"""
+        TgUser.objects.create(telegram_chat_id=10, telegram_user_ud='10', user=user)
+        queries = []
+
+        def observer(execute, sql, params, many, context):
+            queries.append((context['connection'].alias, sql))
+            return execute(sql, params, many, context)
+
+        tg_client = MagicMock()
+        with observe_queries(observer):
+            for update_id, text in enumerate(('/goals', '/create')):
+                process_update(self.bot_update(update_id, text), tg_client=tg_client)
+
+        replica_tables = {sql.split(' FROM ')[1].split()[0] for alias, sql in queries if alias == 'replica_1'}
+        assert replica_tables == {'"goals_goal"', '"goals_goalcategory"'}
+        assert all('"bot_tguser"' not in sql for alias, sql in queries if alias == 'replica_1')
+        assert goal.title in tg_client.send_message.call_args_list[0].kwargs['text']
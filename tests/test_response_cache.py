@@ -0,0 +1,93 @@
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.goals.models import BoardParticipant, Goal, GoalCategory
+from tests.factories import BoardFactory, BoardParticipantFactory, GoalCategoryFactory, GoalFactory
+from tests.test_metrics import sample
+
+
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+    url = reverse('apps.goals:goal_list')
+
+    @pytest.fixture(autouse=True)
+    def enable_cache(self, settings):
+        settings.GOALS_LIST_CACHE = 'local'
+        caches['local'].clear()
+        caches['default'].clear()
+
+    @pytest.fixture
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user, role=BoardParticipant.Role.owner)
+        category = GoalCategoryFactory(board=board, user=user)
+        GoalFactory.create_batch(3, category=category, user=user, status=Goal.Status.to_do)
+        return category
+
+    def test_hit_and_invalidation(self, get_auth_client, category):
+        """Повторный запрос отдается из кеша, запись на доске меняет ее версию"""
+        before = {result: sample('todolist_list_cache_requests_total', view='GoalListView', result=result)
+                  for result in ('hit', 'miss')}
+        first = get_auth_client.get(self.url)
+        assert first['X-Cache'] == 'MISS'
+
+        with CaptureQueriesContext(connection) as queries:
+            second = get_auth_client.get(self.url)
+        assert second['X-Cache'] == 'HIT'
+        assert second.json() == first.json()
+        # Только загрузка ролей пользователя
+        assert len(queries) == 1
+
+        get_auth_client.patch(reverse('apps.goals:goal', kwargs={'pk': first.data[0]['id']}), data={'title': 'new'})
+        third = get_auth_client.get(self.url)
+        assert third['X-Cache'] == 'MISS'
+        assert 'new' in [goal['title'] for goal in third.data]
+        assert sample('todolist_list_cache_requests_total', view='GoalListView', result='hit') == before['hit'] + 1
+        assert sample('todolist_list_cache_requests_total', view='GoalListView', result='miss') == before['miss'] + 2
+
+    def test_not_modified_from_cache(self, get_auth_client, category):
+        """Условный запрос проверяется по ETag из кеша"""
+        etag = get_auth_client.get(self.url)['ETag']
+        response = get_auth_client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['X-Cache'] == 'HIT'
+
+    def test_key_depends_on_params(self, get_auth_client, category):
+        get_auth_client.get(self.url)
+        assert get_auth_client.get(self.url, {'ordering': 'created'})['X-Cache'] == 'MISS'
+
+    def test_bulk_write_invalidates(self, get_auth_client, category):
+        """Пакетные операции без сигналов тоже меняют версию доски"""
+        goals = get_auth_client.get(self.url).data
+        get_auth_client.post(reverse('apps.goals:batch_archive_goal'), data={'ids': [goals[0]['id']]}, format='json')
+        response = get_auth_client.get(self.url)
+        assert response['X-Cache'] == 'MISS'
+        assert len(response.data) == 2
+
+    def test_other_board_write_keeps_cache(self, get_auth_client, category):
+        """Запись на доске, где пользователь не участник, не сбрасывает его кеш"""
+        get_auth_client.get(self.url)
+        GoalFactory(status=Goal.Status.to_do)
+        assert get_auth_client.get(self.url)['X-Cache'] == 'HIT'
+
+    @pytest.mark.parametrize('moved', ['goal', 'category'])
+    def test_move_invalidates_old_board(self, get_auth_client, category, moved):
+        """Перенос цели или категории на другую доску меняет версию и прежней доски"""
+        get_auth_client.get(self.url)
+        other = GoalCategoryFactory()
+        if moved == 'goal':
+            goal = Goal.objects.filter(category=category).first()
+            goal.category = other
+            goal.save()
+            expected = 2
+        else:
+            category = GoalCategory.objects.get(pk=category.pk)
+            category.board = other.board
+            category.save()
+            expected = 0
+        response = get_auth_client.get(self.url)
+        assert response['X-Cache'] == 'MISS'
+        assert len(response.data) == expected
@@ -0,0 +1,78 @@
+import logging
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.goals.models import Goal
+from tests.factories import GoalCommentFactory, GoalFactory
+
+logger = logging.getLogger('main')
+
+
+@pytest.mark.django_db
+class TestFullTextSearch:
+    goal_url = reverse('apps.goals:goal_list')
+    comment_url = reverse('apps.goals:comment_list')
+
+    @pytest.fixture
+    def goals(self, user, board_participant, goal_category):
+        return [
+            GoalFactory(user=user, category=goal_category, status=Goal.Status.to_do,
+                        title='Купить билеты', description='Поезд до Казани'),
+            GoalFactory(user=user, category=goal_category, status=Goal.Status.to_do,
+                        title='Прочитать книгу', description='Купить новую книгу о поездах'),
+            GoalFactory(user=user, category=goal_category, status=Goal.Status.to_do,
+                        title='Починить велосипед', description=None),
+        ]
+
+    def test_search_goals_stemming(self, get_auth_client, goals):
+        """Поиск находит словоформы, цели с совпадением в названии идут первыми"""
+        response = get_auth_client.get(self.goal_url, {'search': 'купил'})
+        assert response.status_code == 200
+        assert [goal['id'] for goal in response.data] == [goals[0].id, goals[1].id]
+
+    def test_search_goals_with_ordering(self, get_auth_client, goals):
+        """Явная сортировка клиента имеет приоритет над релевантностью"""
+        response = get_auth_client.get(self.goal_url, {'search': 'поезд', 'ordering': '-title'})
+        assert [goal['id'] for goal in response.data] == [goals[1].id, goals[0].id]
+
+    def test_search_updated_goal(self, get_auth_client, goals):
+        """Поисковый вектор обновляется при изменении цели"""
+        goals[2].title = 'Купить велосипед'
+        goals[2].save()
+        response = get_auth_client.get(self.goal_url, {'search': 'велосипеды'})
+        assert [goal['id'] for goal in response.data] == [goals[2].id]
+        assert 'search_vector' not in response.data[0]
+
+    def test_vector_not_rebuilt_without_text_changes(self, goals):
+        """Массовое изменение статуса и приоритета не пересчитывает поисковый вектор"""
+        Goal.objects.filter(pk=goals[0].pk).update(search_vector=None)
+        Goal.objects.filter(pk=goals[0].pk).update(status=Goal.Status.in_progress, priority=Goal.Priority.critical)
+        assert Goal.objects.get(pk=goals[0].pk).search_vector is None
+
+        Goal.objects.filter(pk=goals[0].pk).update(title='Купить билеты на самолет')
+        assert Goal.objects.get(pk=goals[0].pk).search_vector is not None
+
+    def test_search_comments(self, get_auth_client, user, goals):
+        """Поиск по тексту комментариев"""
+        comment = GoalCommentFactory(goal=goals[0], user=user, text='Билеты куплены на вечерний поезд')
+        GoalCommentFactory(goal=goals[0], user=user, text='Напомнить позже')
+        response = get_auth_client.get(self.comment_url, {'search': 'билет'})
+        assert response.status_code == 200
+        assert [item['id'] for item in response.data] == [comment.id]
+
+    @pytest.mark.parametrize('lean', [True, False], ids=['lean', 'full'])
+    def test_vector_not_loaded(self, get_auth_client, settings, user, goals, lean):
+        """Списки и карточки целей и комментариев без поиска не читают колонку search_vector"""
+        settings.GOALS_LEAN_LISTS = lean
+        comment = GoalCommentFactory(goal=goals[0], user=user)
+        urls = (self.goal_url, reverse('apps.goals:goal', args=[goals[0].pk]),
+                self.comment_url, reverse('apps.goals:comment', args=[comment.pk]))
+
+        with CaptureQueriesContext(connection) as context:
+            for url in urls:
+                assert get_auth_client.get(url).status_code == 200
+
+        assert not [query['sql'] for query in context.captured_queries if 'search_vector' in query['sql']]
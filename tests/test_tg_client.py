@@ -0,0 +1,87 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from apps.bot.tg.client import TgClient
+
+
+def make_response(status_code: int, data: dict) -> MagicMock:
+    response = MagicMock(status_code=status_code)
+    response.json.return_value = data
+    return response
+
+
+@pytest.fixture
+def tg_client() -> TgClient:
+    client = TgClient('token', connect_timeout=1, read_timeout=2, max_retries=2)
+    client.session = MagicMock()
+    return client
+
+
+class TestTgClient:
+    message = {
+        'message_id': 1,
+        'from': {'id': 1, 'is_bot': True, 'first_name': 'bot'},
+        'chat': {'id': 1, 'type': 'private'},
+        'date': 0,
+        'text': 'Hi',
+    }
+
+    def test_send_message_uses_session_and_timeouts(self, tg_client):
+        """Запросы идут через общую сессию с таймаутами на соединение и чтение"""
+        tg_client.session.request.return_value = make_response(200, {'ok': True, 'result': self.message})
+        response = tg_client.send_message(chat_id=1, text='Hi')
+
+        assert response.ok
+        tg_client.session.request.assert_called_once_with(
+            'POST', 'https://api.telegram.org/bottoken/sendMessage', timeout=(1, 2),
+            data={'chat_id': 1, 'text': 'Hi', 'parse_mode': 'HTML'},
+        )
+        assert tg_client.stats.snapshot()['sendMessage']['count'] == 1
+
+    def test_get_updates_read_timeout_covers_long_poll(self, tg_client):
+        """Таймаут чтения getUpdates больше времени long polling"""
+        tg_client.session.request.return_value = make_response(200, {'ok': True, 'result': []})
+        tg_client.get_updates(offset=5, timeout=60)
+        assert tg_client.session.request.call_args.kwargs['timeout'] == (1, 62)
+
+    @patch('apps.bot.tg.client.time.sleep')
+    def test_retry_after_on_429(self, sleep, tg_client):
+        """При 429 запрос повторяется после паузы retry_after из ответа"""
+        tg_client.session.request.side_effect = [
+            make_response(429, {'ok': False, 'error_code': 429, 'parameters': {'retry_after': 3}}),
+            make_response(200, {'ok': True, 'result': self.message}),
+        ]
+        response = tg_client.send_message(chat_id=1, text='Hi')
+
+        assert response.ok
+        sleep.assert_called_once_with(3)
+        stats = tg_client.stats.snapshot()['sendMessage']
+        assert (stats['count'], stats['errors']) == (2, 1)
+
+    @patch('apps.bot.tg.client.time.sleep')
+    def test_retry_after_gives_up(self, sleep, tg_client):
+        """После исчерпания повторов возвращается ответ с ошибкой"""
+        tg_client.session.request.return_value = make_response(
+            429, {'ok': False, 'error_code': 429, 'parameters': {'retry_after': 1}}
+        )
+        response = tg_client.send_message(chat_id=1, text='Hi')
+
+        assert not response.ok
+        assert tg_client.session.request.call_count == 3
+
+    def test_retries_are_safe_for_post(self):
+        """5xx и таймауты чтения повторяются только для GET, ошибки соединения - для всех методов"""
+        retry = TgClient('token', max_retries=2).session.get_adapter('https://api.telegram.org').max_retries
+        assert retry.total == 2 and retry.connect is None
+        assert retry.read == 0
+        assert retry.is_retry('GET', 502)
+        assert not retry.is_retry('POST', 502)
+
+    def test_network_error_is_counted(self, tg_client):
+        """Сетевые ошибки учитываются в статистике и пробрасываются"""
+        tg_client.session.request.side_effect = requests.ConnectTimeout
+        with pytest.raises(requests.ConnectTimeout):
+            tg_client.get_updates()
+        assert tg_client.stats.snapshot()['getUpdates']['errors'] == 1
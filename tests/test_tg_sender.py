@@ -0,0 +1,75 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+from apps.bot.tg.dc import SendMessageResponse
+from apps.bot.tg.sender import MessageQueue, TokenBucket
+
+
+def make_client(delay: float = 0) -> MagicMock:
+    client = MagicMock()
+    client.sent = []
+    client.sent_at = []
+    lock = threading.Lock()
+
+    def send_message(chat_id: int, text: str, parse_mode: str = 'HTML') -> SendMessageResponse:
+        time.sleep(delay)
+        with lock:
+            client.sent.append((chat_id, text))
+            client.sent_at.append(time.monotonic())
+        return SendMessageResponse(ok=True)
+
+    client.send_message.side_effect = send_message
+    return client
+
+
+class TestTokenBucket:
+
+    def test_rate(self):
+        """Токены восстанавливаются со скоростью rate и не копятся больше capacity"""
+        bucket = TokenBucket(rate=2, capacity=2, now=0)
+        bucket.consume(0)
+        bucket.consume(0)
+        assert bucket.delay(0) == 0.5
+        assert bucket.delay(0.5) == 0
+        assert bucket.is_full(10)
+        assert bucket.tokens == 2
+
+
+class TestMessageQueue:
+
+    def test_merges_consecutive_messages(self):
+        """Сообщения одному чату, накопившиеся в очереди, отправляются одним запросом"""
+        client = make_client()
+        queue = MessageQueue(client, chat_rate=100, global_rate=100)
+        queue.send_message(1, 'first')
+        queue.send_message(1, None)
+        queue.send_message(2, 'other chat')
+        queue.send_message(1, 'second')
+        queue.start().stop(timeout=5)
+
+        assert sorted(client.sent) == [(1, 'first\n\nsecond'), (2, 'other chat')]
+
+    def test_merge_respects_length_limit(self):
+        """Объединенное сообщение не превышает лимит длины Telegram"""
+        client = make_client()
+        queue = MessageQueue(client, chat_rate=100, global_rate=100)
+        for _ in range(3):
+            queue.send_message(1, 'x' * 2000)
+        queue.start().stop(timeout=5)
+
+        assert [len(text) for _, text in client.sent] == [4002, 2000]
+
+    def test_chat_rate_limit(self):
+        """Сообщения одному чату отправляются не чаще chat_rate в секунду и по порядку"""
+        client = make_client(delay=0.01)
+        queue = MessageQueue(client, chat_rate=20, global_rate=100).start()
+        for number in range(3):
+            queue.send_message(1, str(number))
+            time.sleep(0.03)
+        queue.stop(timeout=5)
+
+        intervals = [later - earlier for earlier, later in zip(client.sent_at, client.sent_at[1:])]
+        assert intervals and min(intervals) >= 0.045
+        assert ''.join(text.replace('\n\n', '') for _, text in client.sent) == '012'
+        assert queue.pending() == 0
@@ -50,6 +50,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'django_filters',
     # apps
@@ -68,6 +69,10 @@ if DEBUG:
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'apps.core.middleware.MetricsMiddleware',
+    'apps.core.middleware.ProfilingMiddleware',
+    'apps.core.middleware.QueryBudgetMiddleware',
+    'apps.core.middleware.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -99,6 +104,20 @@ WSGI_APPLICATION = 'todolist.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# Режим сервера: wsgi или asgi (см. gunicorn.conf.py)
+SERVER_MODE = env('SERVER_MODE', default='wsgi')
+
+# Соединения с БД: время жизни в секундах (0 - новое соединение на каждый запрос), проверка соединения
+# перед переиспользованием, таймаут подключения и TCP keepalive.
+# POSTGRES_PGBOUNCER - подключение через PgBouncer в режиме transaction pooling: без серверных курсоров,
+# которые не переживают смену серверного соединения между транзакциями.
+# В режиме ASGI соединение привязано к потоку запроса и не переиспользуется, поэтому CONN_MAX_AGE всегда 0
+POSTGRES_CONN_MAX_AGE = env.int('POSTGRES_CONN_MAX_AGE', default=60)
+POSTGRES_CONN_HEALTH_CHECKS = env.bool('POSTGRES_CONN_HEALTH_CHECKS', default=True)
+POSTGRES_CONNECT_TIMEOUT = env.int('POSTGRES_CONNECT_TIMEOUT', default=5)
+POSTGRES_KEEPALIVES_IDLE = env.int('POSTGRES_KEEPALIVES_IDLE', default=60)
+POSTGRES_PGBOUNCER = env.bool('POSTGRES_PGBOUNCER', default=False)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -107,7 +126,61 @@ DATABASES = {
         'PASSWORD': env('POSTGRES_PASSWORD'),
         'HOST': env('POSTGRES_HOST'),
         'PORT': env.int('POSTGRES_PORT'),
+        'CONN_MAX_AGE': 0 if SERVER_MODE == 'asgi' else POSTGRES_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': POSTGRES_CONN_HEALTH_CHECKS,
+        'DISABLE_SERVER_SIDE_CURSORS': POSTGRES_PGBOUNCER,
+        'OPTIONS': {
+            'connect_timeout': POSTGRES_CONNECT_TIMEOUT,
+            'keepalives': 1,
+            'keepalives_idle': POSTGRES_KEEPALIVES_IDLE,
+        },
+    }
+}
+
+# Реплики для чтения через запятую: host[:port[:вес]] (POSTGRES_REPLICAS=replica1:5432:3,replica2:5432:1),
+# имя БД и пользователь - как у мастера. Реплика, отстающая больше POSTGRES_REPLICA_MAX_LAG секунд
+# или недоступная, исключается до следующей проверки (раз в POSTGRES_REPLICA_LAG_CHECK_INTERVAL секунд).
+# После записи клиент читает с мастера POSTGRES_REPLICA_PIN_SECONDS секунд
+POSTGRES_REPLICAS = env.list('POSTGRES_REPLICAS', default=[])
+POSTGRES_REPLICA_MAX_LAG = env.float('POSTGRES_REPLICA_MAX_LAG', default=5)
+POSTGRES_REPLICA_LAG_CHECK_INTERVAL = env.float('POSTGRES_REPLICA_LAG_CHECK_INTERVAL', default=5)
+POSTGRES_REPLICA_PIN_SECONDS = env.int('POSTGRES_REPLICA_PIN_SECONDS', default=15)
+
+# Алиас реплики -> вес при выборе
+DATABASE_REPLICAS = {}
+for number, replica in enumerate(POSTGRES_REPLICAS, start=1):
+    host, port, weight = (replica.split(':') + ['', ''])[:3]
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': int(port or DATABASES['default']['PORT']),
+        'OPTIONS': {**DATABASES['default']['OPTIONS']},
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICAS[f'replica_{number}'] = int(weight or 1)
+
+DATABASE_ROUTERS = ['apps.core.routers.ReplicaRouter']
+
+# Превышение бюджета SQL-запросов представления (query_budget): исключение вместо записи в лог (для тестов)
+QUERY_BUDGET_RAISE = env.bool('QUERY_BUDGET_RAISE', default=False)
+
+# Профилирование запросов: доля запросов в выборке (0 - выключено, 0.01 - каждый сотый), файл замеров
+PROFILING_SAMPLE_RATE = env.float('PROFILING_SAMPLE_RATE', default=0.0)
+PROFILING_LOG = env.str('PROFILING_LOG', default='profiling.log')
+
+# Метрики Prometheus (/metrics). Для gunicorn с несколькими воркерами задается PROMETHEUS_MULTIPROC_DIR
+METRICS_ENABLED = env.bool('METRICS_ENABLED', default=True)
+# Адреса и подсети, с которых Prometheus может читать /metrics. Запросы через nginx (X-Forwarded-For) отклоняются
+METRICS_ALLOWED_IPS = env.list('METRICS_ALLOWED_IPS', default=['127.0.0.1', '::1'])
+
+# Кеши: default из CACHE_URL (например redis://...), local - LRU-кеш в памяти процесса
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'local',
+        'OPTIONS': {'MAX_ENTRIES': env.int('LOCAL_CACHE_MAX_ENTRIES', default=10000)},
+    },
 }
 
 # Password validation
@@ -145,6 +218,9 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR.joinpath('static')
 
+# Конфигурация полнотекстового поиска Postgres (стемминг под LANGUAGE_CODE)
+SEARCH_CONFIG = 'russian'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
@@ -180,6 +256,50 @@ SPECTACULAR_SETTINGS = {
 }
 
 BOT_TOKEN = os.environ.get('BOT_TOKEN')
+# Количество потоков обработки обновлений в runbot (1 - последовательная обработка)
+BOT_WORKERS = env.int('BOT_WORKERS', default=1)
+# HTTP-клиент API Telegram: таймауты (сек), число повторов и размер пула keep-alive соединений
+TG_CONNECT_TIMEOUT = env.float('TG_CONNECT_TIMEOUT', default=5.0)
+TG_READ_TIMEOUT = env.float('TG_READ_TIMEOUT', default=30.0)
+TG_MAX_RETRIES = env.int('TG_MAX_RETRIES', default=3)
+TG_POOL_SIZE = env.int('TG_POOL_SIZE', default=10)
+# Очередь исходящих сообщений бота и лимиты Telegram (сообщений в секунду на чат и на бота).
+# Лимиты считаются в памяти процесса, ответы отправляет один процесс runbot (webhook только сохраняет обновления)
+BOT_SEND_QUEUE = env.bool('BOT_SEND_QUEUE', default=True)
+BOT_CHAT_RATE = env.float('BOT_CHAT_RATE', default=1.0)
+BOT_GLOBAL_RATE = env.float('BOT_GLOBAL_RATE', default=30.0)
+# Секрет заголовка X-Telegram-Bot-Api-Secret-Token для webhook (без него webhook отключен),
+# срок хранения update_id для отбрасывания повторных доставок и пауза runbot при пустой очереди webhook
+BOT_WEBHOOK_SECRET = env('BOT_WEBHOOK_SECRET', default='')
+BOT_WEBHOOK_DEDUP_DAYS = env.int('BOT_WEBHOOK_DEDUP_DAYS', default=2)
+BOT_WEBHOOK_POLL_INTERVAL = env.float('BOT_WEBHOOK_POLL_INTERVAL', default=0.5)
+# Хранилище состояния диалогов бота (apps.bot.state_store.DatabaseChatStateStore или CacheChatStateStore),
+# время жизни состояния в секундах и алиас кеша для CacheChatStateStore
+BOT_STATE_STORE = env('BOT_STATE_STORE', default='apps.bot.state_store.DatabaseChatStateStore')
+BOT_STATE_TTL = env.int('BOT_STATE_TTL', default=3600)
+BOT_STATE_CACHE = env('BOT_STATE_CACHE', default='default')
+# Порт HTTP-сервера метрик Prometheus процесса runbot (0 - не запускается)
+BOT_METRICS_PORT = env.int('BOT_METRICS_PORT', default=0)
+
+# Время жизни межзапросного кеша ролей участников досок в секундах (0 - кеш отключен).
+# Кеш сбрасывается сигналами BoardParticipant, поэтому при нескольких воркерах нужен общий бэкенд CACHES
+BOARD_ROLES_CACHE_TIMEOUT = env.int('BOARD_ROLES_CACHE_TIMEOUT', default=0)
+# Архивирование категорий и целей удаленной доски/категории фоновой задачей пачками заданного размера.
+# Выполняющаяся задача без прогресса GOALS_ARCHIVE_STALE_AFTER секунд считается прерванной и берется заново
+GOALS_ARCHIVE_ASYNC = env.bool('GOALS_ARCHIVE_ASYNC', default=False)
+GOALS_ARCHIVE_BATCH_SIZE = env.int('GOALS_ARCHIVE_BATCH_SIZE', default=1000)
+GOALS_ARCHIVE_STALE_AFTER = env.int('GOALS_ARCHIVE_STALE_AFTER', default=600)
+# Максимальное количество целей в одном запросе пакетных операций goal/batch_*
+GOALS_BATCH_MAX_SIZE = env.int('GOALS_BATCH_MAX_SIZE', default=500)
+# Кеш ответов списков целей, категорий и комментариев: алиас CACHES (local или default), пусто - кеш отключен.
+# Версии досок хранятся в GOALS_BOARD_VERSION_CACHE, при нескольких воркерах это должен быть общий бэкенд
+GOALS_LIST_CACHE = env('GOALS_LIST_CACHE', default='')
+GOALS_LIST_CACHE_TIMEOUT = env.int('GOALS_LIST_CACHE_TIMEOUT', default=300)
+GOALS_BOARD_VERSION_CACHE = env('GOALS_BOARD_VERSION_CACHE', default='default')
+# Сериализация списков целей и категорий через .values() без экземпляров моделей
+GOALS_LEAN_LISTS = env.bool('GOALS_LEAN_LISTS', default=True)
+# Асинхронные представления списков (по умолчанию в режиме asgi)
+GOALS_ASYNC_LISTS = env.bool('GOALS_ASYNC_LISTS', default=SERVER_MODE == 'asgi')
 
 # Определение пути к файлу лога
 current_date = datetime.now().strftime('%Y-%m-%d-%H-%M')
@@ -193,6 +313,10 @@ LOGGING = {
         'main_format': {
             'format': '{asctime} - {levelname} - {module} - {filename} - {message}',
             'style': '{'
+        },
+        'profiling_format': {
+            'format': '{message}',
+            'style': '{'
         }
     },
     'handlers': {
@@ -208,6 +332,14 @@ LOGGING = {
             'filename': 'log.log',
             'maxBytes': 1000 * 1024 * 10,  # 10 Mb
             'backupCount': 5  # Keep up to 5 backup files
+        },
+        'profiling_file': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'formatter': 'profiling_format',
+            'filename': PROFILING_LOG,
+            'maxBytes': 1000 * 1024 * 10,  # 10 Mb
+            'backupCount': 5,
+            'delay': True
         }
     },
     'loggers': {
@@ -215,6 +347,11 @@ LOGGING = {
             'handlers': ['file'],
             'level': 'DEBUG',
             'propagate': True
+        },
+        'profiling': {
+            'handlers': ['profiling_file'],
+            'level': 'INFO',
+            'propagate': False
         }
     }
 }
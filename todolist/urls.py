@@ -5,6 +5,7 @@ from django.contrib import admin
 from django.urls import include, path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
+from apps.core.views import MetricsView
 from todolist import settings
 
 urlpatterns = [
@@ -13,6 +14,7 @@ urlpatterns = [
     path('oauth/', include('social_django.urls', namespace='social')),
     path('goals/', include(('apps.goals.urls', 'apps.goals'))),
     path('bot/', include(('apps.bot.urls', 'apps.bot'))),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 
     path('docs/schema', SpectacularAPIView.as_view(), name='schema'),
     path('docs/swagger', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger')